@@ -1,69 +1,82 @@
-import os
-import json
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from concurrent.futures import ThreadPoolExecutor
+from financeiro.clientes_google import garantir_token, gspread_cliente, id_planilha
+from financeiro.metricas import etapa, propagar
+from financeiro.sheets_sync import SYNC_DIFERENCIAL
+from financeiro.uploader import com_retry, envio_pendente
 
-# 🔐 Lê o segredo e salva como credentials.json
-gdrive_credentials = os.getenv("GDRIVE_SERVICE_ACCOUNT")
-with open("credentials.json", "w") as f:
-    json.dump(json.loads(gdrive_credentials), f)
+# 📌 Autenticação com Google (cliente e token compartilhados, IDs em financeiro/clientes_google.py)
+client = gspread_cliente()
+garantir_token()
 
-# 📌 Autenticação com Google
-scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-creds = ServiceAccountCredentials.from_json_keyfile_name("credentials.json", scope)
-client = gspread.authorize(creds)
+# Abas resetadas em cada planilha (None = primeira aba)
+abas_por_planilha = {
+    "FInanceiro_contas_a_receber_Teste": [None],
+    "Financeiro_contas_a_pagar_Teste": [None],
+    "Financeiro_Completo_Teste": [None, "Dados_Pivotados"]
+}
 
-# === IDs das planilhas ===
-planilhas_ids = {
-    "FInanceiro_contas_a_receber_Teste": "120tvbJbgjXpk-Rgnfty7EX2CKV6EeKzN3M5bm1LzyuU",
-    "Financeiro_contas_a_pagar_Teste": "1baVf2FOz9badHhOH2RuMLnrPS3ubIIYFGhweHB0chUI",
-    "Financeiro_Completo_Teste": "1pY0ru6ClQdWg2FBOg4RJfEsRVKlkyVS2aEWE2001JPM"
+# Formato aplicado ao resetar as células
+formato_reset = {
+    "numberFormat": {"type": "TEXT"},  # Força formato texto
+    "backgroundColor": {"red": 1, "green": 1, "blue": 1},  # Branco
+    "textFormat": {
+        "bold": False,
+        "italic": False,
+        "foregroundColor": {"red": 0, "green": 0, "blue": 0}
+    }
 }
 
-def limpar_aba_completa(aba, nome_aba):
-    """Limpa conteúdo E formatação de uma aba"""
-    print(f"  🗑️ Limpando conteúdo de {nome_aba}...")
-    aba.clear()
-    
-    print(f"  🎨 Removendo formatação de {nome_aba}...")
-    aba.format('A:ZZ', {
-        "numberFormat": {"type": "TEXT"},  # Força formato texto
-        "backgroundColor": {"red": 1, "green": 1, "blue": 1},  # Branco
-        "textFormat": {
-            "bold": False,
-            "italic": False,
-            "foregroundColor": {"red": 0, "green": 0, "blue": 0}
+def pedido_reset(propriedades):
+    """repeatCell que apaga valores E formatação no intervalo usado da aba (até ZZ)"""
+    grade = propriedades.get("gridProperties", {})
+    return {
+        "repeatCell": {
+            "range": {
+                "sheetId": propriedades["sheetId"],
+                "startRowIndex": 0,
+                "endRowIndex": grade.get("rowCount", 1000),
+                "startColumnIndex": 0,
+                "endColumnIndex": min(grade.get("columnCount", 26), 702)  # A:ZZ
+            },
+            "cell": {"userEnteredFormat": formato_reset},
+            "fields": "userEnteredValue,userEnteredFormat.numberFormat,userEnteredFormat.backgroundColor,userEnteredFormat.textFormat"
         }
-    })
-    print(f"  ✅ {nome_aba} - Conteúdo e formatação removidos")
+    }
 
-print("🗑️ Iniciando exclusão COMPLETA de todas as linhas das planilhas...")
+def limpar_planilha(nome_planilha):
+    """Limpa conteúdo E formatação de todas as abas da planilha em um único batchUpdate"""
+    planilha_id = id_planilha(nome_planilha)
+    with etapa("limpeza", planilha=nome_planilha):
+        metadados = com_retry(client.http_client.fetch_sheet_metadata, planilha_id, {"fields": "sheets.properties"},
+                              api="sheets_leitura")
+        abas = [aba["properties"] for aba in metadados["sheets"]]
 
-# 1. Limpa TUDO de Contas a Receber
-print("\n📋 Limpando: Financeiro_contas_a_receber_Teste")
-planilha_receber = client.open_by_key(planilhas_ids["Financeiro_contas_a_receber_Teste"])
-aba_receber = planilha_receber.sheet1
-limpar_aba_completa(aba_receber, "Contas a Receber")
+        pedidos = []
+        for nome_aba in abas_por_planilha[nome_planilha]:
+            propriedades = abas[0] if nome_aba is None else next((a for a in abas if a["title"] == nome_aba), None)
+            if propriedades is None:
+                print(f"  ⚠️ {nome_planilha}: aba '{nome_aba}' não encontrada")
+                continue
+            # Chaves do checkpoint: DestinoGspread usa o título, DestinoApi sem aba usa "primeira_aba"
+            chaves = [f"{planilha_id}_{propriedades['title']}"] + ([f"{planilha_id}_primeira_aba"] if nome_aba is None else [])
+            if any(envio_pendente(chave) for chave in chaves):
+                print(f"  ↩️ {nome_planilha}: aba '{propriedades['title']}' com envio interrompido; mantida para a retomada")
+                continue
+            pedidos.append(pedido_reset(propriedades))
 
-# 2. Limpa TUDO de Contas a Pagar
-print("\n📋 Limpando: Financeiro_contas_a_pagar_Teste")
-planilha_pagar = client.open_by_key(planilhas_ids["Financeiro_contas_a_pagar_Teste"])
-aba_pagar = planilha_pagar.sheet1
-limpar_aba_completa(aba_pagar, "Contas a Pagar")
+        if pedidos:
+            com_retry(client.http_client.batch_update, planilha_id, {"requests": pedidos})
+    print(f"  ✅ {nome_planilha} - {len(pedidos)} aba(s) com conteúdo e formatação removidos")
 
-# 3. Limpa TUDO de Financeiro Completo - Aba principal (sheet1)
-print("\n📋 Limpando: Financeiro_Completo_Teste (sheet1)")
-planilha_completo = client.open_by_key(planilhas_ids["Financeiro_Completo_Teste"])
-aba_completo = planilha_completo.sheet1
-limpar_aba_completa(aba_completo, "Financeiro Completo - Principal")
+if SYNC_DIFERENCIAL:
+    # As abas são atualizadas por diferença em A1/A2/A6; limpar aqui forçaria a regravação completa
+    print("🔁 Sincronização por diferença ativa (SHEETS_SYNC_DIFERENCIAL=1): limpeza das planilhas ignorada")
+else:
+    print("🗑️ Iniciando exclusão COMPLETA de todas as linhas das planilhas...")
 
-# 4. Limpa TUDO de Financeiro Completo - Aba Dados_Pivotados (se existir)
-print("\n📋 Limpando: Financeiro_Completo_Teste (Dados_Pivotados)")
-try:
-    aba_pivotada = planilha_completo.worksheet("Dados_Pivotados")
-    limpar_aba_completa(aba_pivotada, "Dados Pivotados")
-except:
-    print("  ⚠️ Aba 'Dados_Pivotados' não encontrada")
+    # Uma chamada batchUpdate por planilha, as três em paralelo
+    with ThreadPoolExecutor(max_workers=len(abas_por_planilha)) as executor:
+        list(executor.map(propagar(limpar_planilha), abas_por_planilha))
 
-print("\n🎉 Limpeza completa concluída com sucesso!")
-print("⚠️ ATENÇÃO: Conteúdo e formatação removidos. Células resetadas para formato TEXTO")
+    print("\n🎉 Limpeza completa concluída com sucesso!")
+    print("⚠️ ATENÇÃO: Conteúdo e formatação removidos. Células resetadas para formato TEXTO")
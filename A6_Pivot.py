@@ -1,38 +1,45 @@
-import os
-import json
-import gspread
 import pandas as pd
-from gspread_dataframe import get_as_dataframe, set_with_dataframe
-from oauth2client.service_account import ServiceAccountCredentials
-
-# 🔐 Lê o segredo e salva como credentials.json
-gdrive_credentials = os.getenv("GDRIVE_SERVICE_ACCOUNT")
-with open("credentials.json", "w") as f:
-    json.dump(json.loads(gdrive_credentials), f)
-
-# 📌 Autenticação com Google
-scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-creds = ServiceAccountCredentials.from_json_keyfile_name("credentials.json", scope)
-client = gspread.authorize(creds)
-
-# === IDs das planilhas ===
-planilhas_ids = {
-    "FInanceiro_contas_a_receber_Teste": "120tvbJbgjXpk-Rgnfty7EX2CKV6EeKzN3M5bm1LzyuU",
-    "Financeiro_contas_a_pagar_Teste": "1baVf2FOz9badHhOH2RuMLnrPS3ubIIYFGhweHB0chUI",
-    "Financeiro_Completo_Teste": "1pY0ru6ClQdWg2FBOg4RJfEsRVKlkyVS2aEWE2001JPM"
+from financeiro.clientes_google import abrir_planilha, id_planilha
+from financeiro.analitico import atualizar_base_analitica
+from financeiro.banco import DB_URL, gravar_lancamentos, gravar_centros_de_custo
+from financeiro.artefatos import ler_artefato
+from financeiro.leitura_sheets import ler_planilhas
+from financeiro.metricas import etapa
+from financeiro.sheets import DestinoGspread
+from financeiro.transformacoes import limpar_consolidado, colunas_centro_de_custo, despivotar_centros_de_custo, formatar_para_gravacao
+from financeiro.sheets_sync import SYNC_DIFERENCIAL, sincronizar_aba
+from financeiro.uploader import com_retry, enviar_em_blocos
+
+# Artefato local gravado pela extração (A1/A2) para cada planilha
+artefatos_por_planilha = {
+    "FInanceiro_contas_a_receber_Teste": "REVENUE",
+    "Financeiro_contas_a_pagar_Teste": "EXPENSE"
 }
 
-# === Função para abrir e ler planilha por ID ===
-def ler_planilha_por_id(nome_arquivo):
-    planilha = client.open_by_key(planilhas_ids[nome_arquivo])
-    aba = planilha.sheet1
-    df = get_as_dataframe(aba).dropna(how="all")
-    return df
+# === Função para ler as planilhas de origem ===
+def ler_planilhas_de_origem(nomes):
+    # Usa o DataFrame tipado da extração quando for recente; as que faltarem são lidas do Sheets juntas
+    dados, faltantes = {}, []
+    for nome_arquivo in nomes:
+        df = ler_artefato(artefatos_por_planilha[nome_arquivo])
+        if df is not None:
+            print(f"  ⚡ {nome_arquivo}: {len(df)} registros lidos do artefato local")
+            dados[nome_arquivo] = df
+        else:
+            faltantes.append(nome_arquivo)
+
+    if faltantes:
+        # batchGet em paralelo com valores crus (sem get_as_dataframe nem reinterpretação de formatos)
+        dados.update(ler_planilhas({nome: id_planilha(nome) for nome in faltantes}))
+    return dados
 
 # Lê os dados das planilhas principais
 print("📥 Lendo planilhas de contas a receber e contas a pagar...")
-df_receber = ler_planilha_por_id("FInanceiro_contas_a_receber_Teste")
-df_pagar = ler_planilha_por_id("Financeiro_contas_a_pagar_Teste")
+with etapa("leitura") as medida:
+    dados = ler_planilhas_de_origem(["FInanceiro_contas_a_receber_Teste", "Financeiro_contas_a_pagar_Teste"])
+    df_receber = dados["FInanceiro_contas_a_receber_Teste"]
+    df_pagar = dados["Financeiro_contas_a_pagar_Teste"]
+    medida.linhas_saida = len(df_receber) + len(df_pagar)
 
 # Adiciona a coluna tipo
 df_receber["tipo"] = "Receita"
@@ -42,102 +49,11 @@ df_pagar["tipo"] = "Despesa"
 print("🔗 Consolidando dados de receitas e despesas...")
 df_completo = pd.concat([df_receber, df_pagar], ignore_index=True)
 
-# === CONVERSÃO DAS DATAS PARA FORMATO YYYY-MM-DD ===
-campos_data = ['lastAcquittanceDate', 'financialEvent.competenceDate', 'dueDate']
-
-print("📅 Convertendo campos de data para formato YYYY-MM-DD...")
-for campo in campos_data:
-    if campo in df_completo.columns:
-        df_completo[campo] = pd.to_datetime(
-            df_completo[campo], 
-            format='mixed',
-            dayfirst=True,
-            errors='coerce'
-        )
-        df_completo[campo] = df_completo[campo].dt.strftime('%Y-%m-%d')
-        df_completo[campo] = df_completo[campo].replace('NaT', '')
-
-# Corrige valores da coluna categoriesRatio.value com base na condição
-if 'categoriesRatio.value' in df_completo.columns and 'paid' in df_completo.columns:
-    print("💰 Corrigindo valores de categoriesRatio.value...")
-    df_completo['categoriesRatio.value'] = df_completo.apply(
-        lambda row: row['paid'] if pd.notna(row['categoriesRatio.value']) and pd.notna(row['paid']) and row['categoriesRatio.value'] > row['paid'] else row['categoriesRatio.value'],
-        axis=1
-    )
-
-# === TRATAMENTO PARA REGISTROS SEM CENTRO DE CUSTO ===
-print("\n🔍 Verificando registros sem centro de custo...")
-
-# Identifica todas as colunas de Centro de Custo e seus respectivos valores
-colunas_centro_custo = [col for col in df_completo.columns if col.startswith("Centro de Custo ") and not col.startswith("Valor no Centro de Custo ")]
-colunas_valor_cc = [col for col in df_completo.columns if col.startswith("Valor no Centro de Custo ")]
-
-print(f"  Encontradas {len(colunas_centro_custo)} colunas de centro de custo para processar")
-
-if len(colunas_centro_custo) > 0 and 'paid' in df_completo.columns:
-    total_registros_com_valor = 0
-    total_apenas_cc_preenchido = 0
-    
-    # Cria uma máscara para rastrear linhas já processadas (apenas para o cenário "centro + valor")
-    linhas_com_valor_preenchido = pd.Series([False] * len(df_completo), index=df_completo.index)
-    
-    # Itera sobre cada par de colunas Centro de Custo / Valor
-    for i, col_centro in enumerate(colunas_centro_custo, start=1):
-        # Encontra a coluna de valor correspondente
-        col_valor = f"Valor no Centro de Custo {i}"
-        
-        # Verifica se a coluna de valor existe
-        if col_valor not in df_completo.columns:
-            print(f"  ⚠️ Coluna '{col_valor}' não encontrada, pulando...")
-            continue
-        
-        # Normaliza a coluna de centro de custo
-        df_completo[col_centro] = df_completo[col_centro].astype(str).str.strip()
-        
-        # Máscara para centro de custo vazio
-        mask_centro_vazio = (df_completo[col_centro].isna()) | (df_completo[col_centro] == '') | (df_completo[col_centro] == 'nan')
-        
-        # Máscara para valor vazio
-        mask_valor_vazio = (df_completo[col_valor].isna()) | (df_completo[col_valor] == '') | (df_completo[col_valor] == 0)
-        
-        # Caso 1: Centro vazio E valor vazio - preenche ambos (SOMENTE NO CENTRO 1 E SE NÃO FOI PREENCHIDO ANTES)
-        if i == 1:  # Apenas para Centro de Custo 1
-            mask_ambos_vazios = mask_centro_vazio & mask_valor_vazio & (~linhas_com_valor_preenchido)
-            registros_ambos = mask_ambos_vazios.sum()
-            
-            if registros_ambos > 0:
-                df_completo.loc[mask_ambos_vazios, col_centro] = 'Sem Centro de Custo'
-                df_completo.loc[mask_ambos_vazios, col_valor] = df_completo.loc[mask_ambos_vazios, 'paid']
-                total_registros_com_valor += registros_ambos
-                
-                # Marca essas linhas como já tendo recebido valor
-                linhas_com_valor_preenchido = linhas_com_valor_preenchido | mask_ambos_vazios
-                
-                print(f"  ✅ '{col_centro}': {registros_ambos} registros preenchidos (centro + valor copiado de 'paid')")
-        
-        # Caso 2: Centro vazio MAS valor existe - preenche apenas o centro
-        # Para Centro 1: aplica normalmente
-        # Para Centros 2+: SÓ aplica se o valor NÃO estiver vazio (ou seja, pula se ambos estiverem vazios)
-        mask_so_centro_vazio = mask_centro_vazio & (~mask_valor_vazio)
-        registros_so_centro = mask_so_centro_vazio.sum()
-        
-        if registros_so_centro > 0:
-            df_completo.loc[mask_so_centro_vazio, col_centro] = 'Sem Centro de Custo'
-            total_apenas_cc_preenchido += registros_so_centro
-            print(f"  ✅ '{col_centro}': {registros_so_centro} registros preenchidos (apenas centro, valor mantido)")
-    
-    # Resumo final
-    print(f"\n  📊 Resumo do tratamento:")
-    print(f"    Registros com centro + valor preenchidos (apenas Centro 1): {total_registros_com_valor}")
-    print(f"    Registros com apenas centro preenchido (todos os centros): {total_apenas_cc_preenchido}")
-    
-else:
-    print("  ⚠️ Colunas necessárias não encontradas para tratamento de centro de custo")
-
-
-
-
-
+# === LIMPEZA: DATAS EM DATETIME, RATEIO DE CATEGORIA E REGISTROS SEM CENTRO DE CUSTO ===
+with etapa("limpeza") as medida:
+    medida.linhas_entrada = len(df_completo)
+    limpar_consolidado(df_completo)
+    medida.linhas_saida = len(df_completo)
 
 # Estatísticas finais
 print(f"\n📊 Resumo dos dados processados:")
@@ -151,97 +67,75 @@ if 'Centro de Custo 1' in df_completo.columns:
 
 # 📄 Abrir a planilha de saída e escrever UMA ÚNICA VEZ
 print("\n📤 Atualizando planilha consolidada...")
-planilha_saida = client.open_by_key(planilhas_ids["Financeiro_Completo_Teste"])
-aba_saida = planilha_saida.sheet1
-
-# Limpa a aba e sobrescreve
-aba_saida.clear()
-set_with_dataframe(aba_saida, df_completo)
+planilha_saida = com_retry(abrir_planilha, id_planilha("Financeiro_Completo_Teste"), api="sheets_leitura")
+aba_saida = planilha_saida.primeira_aba
+
+with etapa("escrita_consolidado") as medida:
+    medida.linhas_entrada = len(df_completo)
+    # As datas ficam em datetime64 no DataFrame e só viram texto na gravação
+    saida = formatar_para_gravacao(df_completo)
+    if SYNC_DIFERENCIAL:
+        # Envia apenas as linhas alteradas desde a última publicação
+        sincronizar_aba(DestinoGspread(aba_saida), saida, chave="id", value_input_option="USER_ENTERED")
+    else:
+        # Limpa a aba e sobrescreve em blocos
+        enviar_em_blocos(DestinoGspread(aba_saida), saida, value_input_option="USER_ENTERED")
 
 print("✅ Planilha consolidada atualizada com sucesso!")
 print(f"📋 Total de colunas exportadas: {len(df_completo.columns)}")
 
+# Base analítica local particionada por ano/mês para o IA.py
+print("\n🗂️ Atualizando base analítica local...")
+with etapa("base_analitica") as medida:
+    medida.linhas_entrada = len(df_completo)
+    atualizar_base_analitica(df_completo)
+
 # === NOVA ETAPA: PIVOTAGEM DOS CENTROS DE CUSTO ===
 print("\n🔄 Iniciando pivotagem dos centros de custo...")
 
 # Identifica as colunas de centro de custo e valor
-colunas_centro_custo = [col for col in df_completo.columns if col.startswith("Centro de Custo ") and not col.startswith("Valor no Centro de Custo ")]
-colunas_valor = [col for col in df_completo.columns if col.startswith("Valor no Centro de Custo ")]
+colunas_centro_custo, colunas_valor = colunas_centro_de_custo(df_completo)
 
 print(f"  Encontradas {len(colunas_centro_custo)} colunas de centro de custo")
 print(f"  Encontradas {len(colunas_valor)} colunas de valor")
 
 if len(colunas_centro_custo) > 0 and len(colunas_valor) > 0:
-    # Cria lista com todas as outras colunas que não são centro de custo
-    colunas_id = [col for col in df_completo.columns if col not in colunas_centro_custo + colunas_valor]
-    
-    # Adiciona índice único para facilitar o merge
-    df_completo_indexed = df_completo.reset_index(drop=False)
-    df_completo_indexed = df_completo_indexed.rename(columns={'index': 'row_id'})
-    
-    # Atualiza colunas_id para incluir row_id
-    colunas_id_merge = ['row_id'] + colunas_id
-    
-    # Melt dos centros de custo
-    df_melted_cc = pd.melt(
-        df_completo_indexed,
-        id_vars=colunas_id_merge,
-        value_vars=colunas_centro_custo,
-        var_name='Centro_de_Custo_Temp',
-        value_name='Centro_de_Custo_Unificado'
-    )
-    
-    # Melt dos valores
-    df_melted_valor = pd.melt(
-        df_completo_indexed,
-        id_vars=colunas_id_merge,
-        value_vars=colunas_valor,
-        var_name='Valor_Temp',
-        value_name='paid_new'
-    )
-    
-    # Extrai o número do centro de custo de cada coluna para fazer o match
-    df_melted_cc['num'] = df_melted_cc['Centro_de_Custo_Temp'].str.extract(r'(\d+)$').astype(int)
-    df_melted_valor['num'] = df_melted_valor['Valor_Temp'].str.extract(r'(\d+)$').astype(int)
-    
-    # Junta os dois dataframes pelo row_id e número do centro de custo
-    df_final = df_melted_cc.merge(
-        df_melted_valor[['row_id', 'num', 'paid_new']],
-        on=['row_id', 'num'],
-        how='left'
-    )
-    
-    # Remove colunas temporárias
-    df_final = df_final.drop(columns=['Centro_de_Custo_Temp', 'row_id', 'num'])
-    
-    # Converte valores negativos em positivos
-    if 'paid_new' in df_final.columns:
-        df_final['paid_new'] = pd.to_numeric(df_final['paid_new'], errors='coerce')
-        df_final['paid_new'] = df_final['paid_new'].abs()
-        print("  ✅ Valores negativos convertidos para positivos")
-
-    # Remove linhas com NaN na coluna Centro_de_Custo_Unificado
-    df_final = df_final.dropna(subset=['Centro_de_Custo_Unificado'])
-
-    # Remove strings vazias e 'nan' como string
-    df_final = df_final[
-        (df_final['Centro_de_Custo_Unificado'].astype(str).str.strip() != '') & 
-        (df_final['Centro_de_Custo_Unificado'].astype(str).str.strip() != 'nan')
-    ]
-
+    # Uma passada: descarta slots vazios antes de montar as linhas e pareia centro/valor pelo número do slot
+    with etapa("pivotagem") as medida:
+        medida.linhas_entrada = len(df_completo)
+        df_final = despivotar_centros_de_custo(df_completo)
+        medida.linhas_saida = len(df_final)
+    print("  ✅ Valores negativos convertidos para positivos")
     print(f"  ✅ Linhas com NaN removidas. Total de registros após limpeza: {len(df_final)}")
     
     # Cria nova aba ou atualiza aba existente
     try:
-        aba_pivotada = planilha_saida.worksheet("Dados_Pivotados")
-        aba_pivotada.clear()
+        aba_pivotada = com_retry(planilha_saida.worksheet, "Dados_Pivotados", api="sheets_leitura")
+        if not SYNC_DIFERENCIAL:
+            com_retry(aba_pivotada.clear)
     except:
-        aba_pivotada = planilha_saida.add_worksheet(title="Dados_Pivotados", rows=len(df_final)+1, cols=len(df_final.columns))
+        aba_pivotada = com_retry(planilha_saida.add_worksheet, "Dados_Pivotados", len(df_final)+1, len(df_final.columns))
     
-    set_with_dataframe(aba_pivotada, df_final)
+    with etapa("escrita_pivotada") as medida:
+        medida.linhas_entrada = len(df_final)
+        saida = formatar_para_gravacao(df_final)
+        if SYNC_DIFERENCIAL:
+            # Um mesmo id aparece uma vez por centro de custo
+            sincronizar_aba(DestinoGspread(aba_pivotada), saida, chave=["id", "Centro_de_Custo_Unificado"], value_input_option="USER_ENTERED")
+        else:
+            enviar_em_blocos(DestinoGspread(aba_pivotada), saida, value_input_option="USER_ENTERED")
     print("✅ Planilha pivotada criada/atualizada com sucesso!")
     print(f"📋 Total de colunas na planilha pivotada: {len(df_final.columns)}")
 else:
     print("⚠️ Nenhuma coluna de centro de custo encontrada para pivotagem")
 
+# Espelho relacional opcional (upsert por id) para consultas fora do Sheets
+if DB_URL:
+    print("\n🗄️ Gravando consolidado e centros de custo no banco...")
+    with etapa("banco") as medida:
+        medida.linhas_entrada = len(df_completo)
+        gravar_lancamentos(df_completo)
+        if len(colunas_centro_custo) > 0 and len(colunas_valor) > 0:
+            gravar_centros_de_custo(df_final)
+
 print("\n🎉 Processamento concluído com sucesso!")
@@ -1,25 +1,27 @@
-import json
 import pandas as pd
 from openai import OpenAI
 import os
 from datetime import datetime
-import gspread
-from gspread_dataframe import set_with_dataframe
-from oauth2client.service_account import ServiceAccountCredentials
-from google.oauth2.service_account import Credentials
+from financeiro.analitico import ler_base_analitica
+from financeiro.banco import ler_lancamentos
+from financeiro.cache_ia import gerar_resposta
+from financeiro.clientes_google import abrir_planilha, id_planilha
+from financeiro.datas import converter_inicio_iso
+from financeiro.kpis import calcular_kpis, colunas_kpis
+from financeiro.metricas import etapa
+from financeiro.uploader import com_retry
 
 deepseek_api_key = os.getenv("DEEPSEEK_API_KEY")
-client = OpenAI(api_key=deepseek_api_key, base_url="https://api.deepseek.com")
+# DEEPSEEK_BASE_URL permite apontar para um servidor local compatível (ver benchmarks/servidor_llm.py)
+deepseek_base_url = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
+client = OpenAI(api_key=deepseek_api_key, base_url=deepseek_base_url)
 
 # URL da planilha Google Sheets exportada como CSV
-sheet_id = "1pY0ru6ClQdWg2FBOg4RJfEsRVKlkyVS2aEWE2001JPM"
+sheet_id = id_planilha("Financeiro_Completo_Teste")
 sheet_csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
 
 SHEET_ID2 = "19FNiQsewbr8K3CjiaXA-QQhktcrgopHSmidZjGWpHuQ"  # ID da planilha de destino
 
-# Ler a planilha
-df = pd.read_csv(sheet_csv_url)
-
 # Limpar valores monetários
 def limpar_valores(col):
     return (
@@ -30,118 +32,66 @@ def limpar_valores(col):
            .pipe(pd.to_numeric, errors="coerce")
     )
 
-df['paid'] = limpar_valores(df['paid'])
-
 # Converter coluna de data
-# Conversão de datas com parsing manual para evitar problemas de formatação
+# Trecho até o terceiro "-" exatamente AAAA-MM-DD; o parse roda uma vez por valor distinto
 def parse_data_segura(coluna):
-    datas = pd.to_datetime(
-        coluna.apply(lambda x: '-'.join(x.split('-')[:3]) if isinstance(x, str) and '-' in x else None),
-        format='%Y-%m-%d',
-        errors='coerce'
-    )
-    return datas
+    return converter_inicio_iso(coluna)
 
-df['lastAcquittanceDate'] = parse_data_segura(df['lastAcquittanceDate'])
-df['dueDate'] = parse_data_segura(df['dueDate'])
-
-# Filtrar apenas registros do ano corrente
 ano_corrente = datetime.today().year
-df = df[df['lastAcquittanceDate'].dt.year == ano_corrente]
-
-# Criar colunas auxiliares
-df['AnoMes'] = df['lastAcquittanceDate'].dt.to_period('M')
-df['Trimestre'] = df['lastAcquittanceDate'].dt.to_period('Q')
-df['AnoMes_Caixa'] = df['lastAcquittanceDate'].dt.to_period('M')
-df['Trimestre_Caixa'] = df['lastAcquittanceDate'].dt.to_period('Q')
-
-# Resumo trimestral: valores pagos
-resumo_trimestral = df.groupby(['Trimestre', 'tipo'])[['paid']].sum().unstack(fill_value=0)
-
-# Variação mensal por categoria
-resumo_mensal_categoria = df.groupby(['AnoMes', 'categoriesRatio.category'])['paid'].sum().unstack(fill_value=0)
-variacao_mensal_pct = resumo_mensal_categoria.pct_change().fillna(0)
-categorias_com_alta = (variacao_mensal_pct > 0.3).apply(lambda row: row[row > 0.3].to_dict(), axis=1).to_dict()
-
-# Valores totais
-total_recebido = df[df['tipo'] == 'Receita']['paid'].sum()
-total_pago = df[df['tipo'] == 'Despesa']['paid'].sum()
-total_pendente_despesa = df[
-    (df['tipo'] == 'Despesa') & (df['status'] == 'OVERDUE')
-]['paid'].sum()
-total_pendente_receita = df[
-    (df['tipo'] == 'Receita') & (df['status'] == 'OVERDUE')
-]['paid'].sum()
-saldo_liquido = total_recebido - total_pago
-top_categorias = df['categoriesRatio.category'].value_counts().head(3).to_dict()
-
-# ================= CÁLCULOS COMPLEMENTARES ===================
-
-# Filtrar transações realizadas
-hoje = pd.to_datetime(datetime.today().date())
-df_realizadas = df[df['lastAcquittanceDate'] <= hoje].copy()
-
-df_realizadas['valor_ajustado'] = df_realizadas.apply(
-    lambda row: abs(row['paid']) if row['tipo'] == 'Receita' else -abs(row['paid']),
-    axis=1
-)
-
-# Fluxo de Caixa
-fluxo_caixa = df_realizadas.groupby('AnoMes_Caixa')['valor_ajustado'].sum().reset_index()
-fluxo_caixa['saldo_acumulado'] = fluxo_caixa['valor_ajustado'].cumsum()
-
-# Receitas e despesas por mês
-df_receitas = df_realizadas[df_realizadas['tipo'].str.lower() == 'Receita']
-df_despesas = df_realizadas[df_realizadas['tipo'].str.lower() == 'Despesa']
-
-receitas_mensais = df_receitas.groupby('AnoMes')['paid'].sum().reset_index()
-despesas_mensais = df_despesas.groupby('AnoMes')['paid'].sum().reset_index()
-
-# Rentabilidade
-rentabilidade = pd.merge(
-    receitas_mensais,
-    despesas_mensais,
-    on='AnoMes',
-    how='outer',
-    suffixes=('_receita', '_despesa')
-).fillna(0)
-
-rentabilidade['lucro'] = rentabilidade['paid_receita'] - rentabilidade['paid_despesa']
-rentabilidade['margem_lucro'] = rentabilidade['lucro'] / rentabilidade['paid_receita'].replace(0, pd.NA)
-
-# Pendências e vencidos
-df_pendentes = df[(df['paid'] > 0) & (df['dueDate'] <= hoje) & (df['status'] == 'OVERDUE')]
-
-# Inadimplência
-total_vencido = df_pendentes[df_pendentes['tipo'] == 'Receita']['paid'].sum()
-inadimplencia = total_vencido / total_recebido if total_recebido else 0
+
+# Ler só as partições do ano corrente da base analítica local (já tipada); sem ela, consulta o banco (DB_URL)
+# e, por último, exporta a planilha como CSV
+with etapa("leitura") as medida:
+    df = ler_base_analitica(colunas_kpis, ano_corrente)
+    if df is not None:
+        print(f"⚡ {len(df)} registros de {ano_corrente} lidos da base analítica local")
+    else:
+        try:
+            df = ler_lancamentos(colunas_kpis, ano_corrente)
+        except Exception as e:
+            print(f"⚠️ Falha ao consultar o banco, lendo a planilha: {e}")
+        if df is not None:
+            print(f"🗄️ {len(df)} registros de {ano_corrente} lidos do banco")
+    if df is None:
+        df = com_retry(pd.read_csv, sheet_csv_url, api="sheets_leitura")
+        df['paid'] = limpar_valores(df['paid'])
+        df['lastAcquittanceDate'] = parse_data_segura(df['lastAcquittanceDate'])
+        df['dueDate'] = parse_data_segura(df['dueDate'])
+        print(f"📄 {len(df)} registros lidos da planilha (CSV)")
+    medida.linhas_saida = len(df)
+
+# Todas as métricas em uma única passada agrupada (ver financeiro/kpis.py)
+with etapa("kpis") as medida:
+    medida.linhas_entrada = len(df)
+    kpis = calcular_kpis(df, ano=ano_corrente)
+    medida.linhas_saida = kpis.linhas
 
 # Prompt detalhado
 prompt = f"""
 Você é um analista financeiro sênior. Recebi um extrato financeiro com as seguintes informações agregadas:
 
 1. Visão geral:
-- Total recebido (entradas): R$ {total_recebido:,.2f}
-- Total pago (saídas): R$ {total_pago:,.2f}
-- Receita pendente (Receita): R$ {total_pendente_receita:,.2f}
-- Despesa pendente (Despesa): R$ {total_pendente_despesa:,.2f}
-- Saldo líquido (entradas - saídas): R$ {saldo_liquido:,.2f}
+- Total recebido (entradas): R$ {kpis.total_recebido:,.2f}
+- Total pago (saídas): R$ {kpis.total_pago:,.2f}
+- Receita pendente (Receita): R$ {kpis.total_pendente_receita:,.2f}
+- Despesa pendente (Despesa): R$ {kpis.total_pendente_despesa:,.2f}
+- Saldo líquido (entradas - saídas): R$ {kpis.saldo_liquido:,.2f}
 
-2. Top 3 categorias mais frequentes: {top_categorias}
+2. Top 3 categorias mais frequentes: {kpis.top_categorias}
 
 3. Resumo trimestral (valores pagos e pendentes por tipo de transação):
-{resumo_trimestral.to_string()}
+{kpis.resumo_trimestral.to_string()}
 
 4. Categorias com aumentos mensais significativos (acima de 30% de um mês para o outro):
-{categorias_com_alta}
+{kpis.categorias_com_alta}
 
 5. Fluxo de caixa mensal, me de também o mês a mês:
-{fluxo_caixa.to_string(index=False)}
+{kpis.fluxo_caixa.to_string(index=False)}
 
 6. Rentabilidade mensal (lucro e margem de lucro):
-{rentabilidade[['AnoMes', 'lucro', 'margem_lucro']].to_string(index=False)}
+{kpis.rentabilidade[['AnoMes', 'lucro', 'margem_lucro']].to_string(index=False)}
 
-7. Inadimplência (proporção de valores vencidos sobre receitas realizadas): {inadimplencia:.2%}
+7. Inadimplência (proporção de valores vencidos sobre receitas realizadas): {kpis.inadimplencia:.2%}
 
 8. faça um resumo executivo.
 
@@ -154,36 +104,27 @@ Por favor, me forneça:
 Seja objetivo, claro e direto.
 """
 
-# Chamar a IA
-response = client.chat.completions.create(
-    model="deepseek-chat",
-    messages=[
-        {"role": "system", "content": "Você é um analista financeiro experiente."},
-        {"role": "user", "content": prompt}
-    ],
-    temperature=1.0
-)
+# Chamar a IA (ou reaproveitar a resposta se os agregados não mudaram)
+with etapa("insights"):
+    conteudo_ia = gerar_resposta(
+        client,
+        "deepseek-chat",
+        [
+            {"role": "system", "content": "Você é um analista financeiro experiente."},
+            {"role": "user", "content": prompt}
+        ],
+        temperatura=1.0
+    )
 
 # Mostrar insights
 #print("=== INSIGHTS GERADOS ===")
-#print(response.choices[0].message.content)
-
-# Credenciais do serviço
-json_secret = os.getenv("GDRIVE_SERVICE_ACCOUNT")
-creds_dict = json.loads(json_secret)
-creds = Credentials.from_service_account_info(creds_dict, scopes=["https://www.googleapis.com/auth/spreadsheets"])
+#print(conteudo_ia)
 
-# Acessar a planilha
-gc = gspread.authorize(creds)
-spreadsheet = gc.open_by_key("19FNiQsewbr8K3CjiaXA-QQhktcrgopHSmidZjGWpHuQ")
-worksheet = spreadsheet.get_worksheet(0)  # primeira aba
-
-# Limpar todo o conteúdo anterior
-worksheet.clear()
+# Acessar a planilha (cliente e token compartilhados)
+spreadsheet = com_retry(abrir_planilha, SHEET_ID2, api="sheets_leitura")
+worksheet = spreadsheet.primeira_aba
 
 # Processar conteúdo da IA
-conteudo_ia = response.choices[0].message.content
-
 blocos = conteudo_ia.split("####")
 dados = []
 
@@ -196,5 +137,8 @@ for bloco in blocos:
         resultado = bloco.split("**", 2)[-1].strip()
         dados.append([titulo, resultado])
 
-# Escrever na planilha
-worksheet.update(dados, "A1")
+# Limpar todo o conteúdo anterior e escrever na planilha
+with etapa("escrita") as medida:
+    medida.linhas_entrada = len(dados)
+    com_retry(worksheet.clear)
+    com_retry(worksheet.update, dados, "A1")
@@ -1,25 +1,69 @@
 import os
-import time
+import sys
 import glob
-import subprocess
+import runpy
 
 # Caminho onde estão os scripts
 caminho_scripts = "./"  # ajuste aqui se estiverem em outro diretório
 
-# Lista todos os arquivos com o padrão especificado
-arquivos = glob.glob(os.path.join(caminho_scripts, "A*.py"))
+# Scripts de extração executados no próprio processo (credenciais e sessão compartilhadas)
+scripts_extracao = {
+    "A1_Contas_a_pagar.py": "EXPENSE",
+    "A2_Contas_a_receber.py": "REVENUE"
+}
 
-# Ordena os arquivos em ordem alfabética (funciona para nomes padronizados como os seus)
-arquivos.sort()
+# Roda contas a pagar e a receber em paralelo
+EXTRACAO_CONCORRENTE = os.getenv("EXTRACAO_CONCORRENTE", "1") == "1"
 
-# Executa os scripts um por um
-for arquivo in arquivos:
-    print(f"\nExecutando: {arquivo}")
-    try:
-        resultado = subprocess.run(["python", arquivo], check=True)
-        print(f"✔️ Finalizado com sucesso: {arquivo}")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Erro ao executar {arquivo}: {e}")
-    time.sleep(10)
+sys.path.insert(0, os.path.abspath(caminho_scripts))
 
-print("\nTodos os scripts foram processados.")
+from financeiro.metricas import etapa  # noqa: E402
+
+
+def executar_scripts():
+    """Executa os scripts A*.py em ordem, todos no mesmo processo; devolve os que falharam"""
+    # Lista todos os arquivos com o padrão especificado
+    arquivos = glob.glob(os.path.join(caminho_scripts, "A*.py"))
+
+    # Ordena os arquivos em ordem alfabética (funciona para nomes padronizados como os seus)
+    arquivos.sort()
+
+    extracao_executada = False
+    falhas = []
+
+    # Executa os scripts um por um, todos no mesmo processo
+    for arquivo in arquivos:
+        nome = os.path.basename(arquivo)
+
+        if nome in scripts_extracao:
+            if extracao_executada:
+                continue
+            extracao_executada = True
+
+            tipos = [tipo for script, tipo in scripts_extracao.items()
+                     if os.path.join(caminho_scripts, script) in arquivos]
+            print(f"\nExecutando extração: {', '.join(tipos)}")
+            try:
+                from financeiro.extracao import extrair_todos
+                with etapa("extracao_contas"):
+                    extrair_todos(tipos, concorrente=EXTRACAO_CONCORRENTE)
+                print(f"✔️ Extração finalizada com sucesso: {', '.join(tipos)}")
+            except Exception as e:
+                print(f"❌ Erro na extração: {e}")
+                falhas.append("extracao_contas")
+        else:
+            print(f"\nExecutando: {arquivo}")
+            try:
+                with etapa(os.path.splitext(nome)[0]):
+                    runpy.run_path(arquivo, run_name="__main__")
+                print(f"✔️ Finalizado com sucesso: {arquivo}")
+            except Exception as e:
+                print(f"❌ Erro ao executar {arquivo}: {e}")
+                falhas.append(nome)
+
+    print("\nTodos os scripts foram processados.")
+    return falhas
+
+
+if __name__ == "__main__":
+    executar_scripts()
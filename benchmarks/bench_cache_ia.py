@@ -0,0 +1,43 @@
+"""Verifica acertos e falhas do cache de respostas da IA contra o servidor local.
+
+Uso: python -m benchmarks.bench_cache_ia [--latencia 2.0]
+"""
+import os
+import time
+import argparse
+import tempfile
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--latencia", type=float, default=2.0)
+args = parser.parse_args()
+
+# Cache isolado para não misturar com o .cache do projeto
+os.environ["FINANCEIRO_CACHE_DIR"] = tempfile.mkdtemp(prefix="cache_ia_")
+
+from openai import OpenAI  # noqa: E402
+
+from benchmarks.servidor_llm import iniciar_servidor  # noqa: E402
+from financeiro.cache_ia import gerar_resposta  # noqa: E402
+
+servidor = iniciar_servidor(latencia=args.latencia)
+client = OpenAI(api_key="local", base_url=servidor.url)
+
+
+def pedir(prompt):
+    inicio = time.perf_counter()
+    conteudo = gerar_resposta(client, "deepseek-chat", [{"role": "user", "content": prompt}], temperatura=1.0)
+    return conteudo, time.perf_counter() - inicio
+
+
+primeira, t_falha = pedir("agregados A")
+segunda, t_acerto = pedir("agregados A")
+_, t_novo = pedir("agregados B")
+
+assert primeira == segunda, "resposta do cache diferente da original"
+assert servidor.chamadas == 2, f"esperadas 2 chamadas ao endpoint, houve {servidor.chamadas}"
+
+print(f"falha (chama endpoint): {t_falha:.2f}s")
+print(f"acerto (cache):         {t_acerto:.4f}s")
+print(f"agregados alterados:    {t_novo:.2f}s")
+print(f"chamadas ao endpoint:   {servidor.chamadas}")
+servidor.shutdown()
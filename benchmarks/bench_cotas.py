@@ -0,0 +1,99 @@
+"""Mede o limitador de cotas (financeiro.cotas) contra uma API simulada que devolve 429.
+
+A API aceita no máximo ``limite`` chamadas em qualquer janela de ``periodo``
+segundos (a cota por minuto do Sheets, em escala de tempo reduzida). Várias
+threads fazem o mesmo número de chamadas de três jeitos:
+
+- pausa fixa: cada thread espera um intervalo fixo antes de cada chamada,
+  como o ``time.sleep`` entre scripts do Update_contas (429 com backoff);
+- só backoff: chamadas livres, repetindo cada 429 com backoff exponencial;
+- limitador: token bucket compartilhado com backoff adaptativo.
+
+Uso: python -m benchmarks.bench_cotas [--chamadas 300] [--limite 30] [--periodo 1.5] [--threads 8]
+"""
+import io
+import time
+import argparse
+import threading
+from collections import deque
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
+
+from financeiro import cotas
+
+
+class _Resposta:
+    status_code = 429
+    headers = {}
+
+
+class Erro429(Exception):
+    response = _Resposta()
+
+
+class ApiSimulada:
+    """No máximo ``limite`` chamadas aceitas em qualquer janela de ``periodo`` segundos"""
+
+    def __init__(self, limite, periodo, latencia=0.01):
+        self.limite, self.periodo, self.latencia = limite, periodo, latencia
+        self.aceitas = deque()
+        self.rejeitadas = 0
+        self._trava = threading.Lock()
+
+    def chamar(self):
+        time.sleep(self.latencia)
+        with self._trava:
+            agora = time.monotonic()
+            while self.aceitas and agora - self.aceitas[0] >= self.periodo:
+                self.aceitas.popleft()
+            if len(self.aceitas) >= self.limite:
+                self.rejeitadas += 1
+                raise Erro429()
+            self.aceitas.append(agora)
+
+
+def rodar(estrategia, chamadas, limite, periodo, threads):
+    api = ApiSimulada(limite, periodo)
+    # Backoff na mesma escala de tempo da cota (1s num minuto real ≈ periodo/60)
+    escala = periodo / 60
+    cotas.BACKOFF_BASE_S, cotas.ESPERA_MAXIMA, cotas.TENTATIVAS = escala, 64 * escala, 50
+    if estrategia == "limitador":
+        cotas.definir_cota("bench", limite, periodo)
+    else:
+        cotas.definir_cota("bench", 0)
+
+    def uma_chamada(_):
+        if estrategia == "pausa fixa":
+            # Intervalo que, somando as threads, fica exatamente na cota
+            time.sleep(threads * periodo / limite)
+        cotas.chamar("bench", api.chamar)
+
+    inicio = time.perf_counter()
+    # Sem as linhas "nova tentativa em ..." de cada 429
+    with redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(uma_chamada, range(chamadas)))
+    duracao = time.perf_counter() - inicio
+    return duracao, api.rejeitadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chamadas", type=int, default=300)
+    parser.add_argument("--limite", type=int, default=30, help="chamadas aceitas por período")
+    parser.add_argument("--periodo", type=float, default=1.5, help="segundos que representam um minuto")
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    # Teto teórico: a primeira janela inteira de uma vez e depois ``limite`` por período
+    ideal = max(0.0, (args.chamadas - args.limite) / args.limite * args.periodo)
+    print(f"{args.chamadas} chamadas, cota de {args.limite} a cada {args.periodo}s, {args.threads} threads "
+          f"(mínimo teórico ≈ {ideal:.1f}s)")
+    print(f"{'estratégia':<12} {'tempo':>8} {'429':>6} {'chamadas/período':>18}")
+    for estrategia in ("pausa fixa", "só backoff", "limitador"):
+        duracao, rejeitadas = rodar(estrategia, args.chamadas, args.limite, args.periodo, args.threads)
+        vazao = args.chamadas / duracao * args.periodo
+        print(f"{estrategia:<12} {duracao:7.2f}s {rejeitadas:>6} {vazao:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
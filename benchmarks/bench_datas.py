@@ -0,0 +1,106 @@
+"""Compara as conversões de data antigas de cada script com financeiro.datas.
+
+Para cada ponto do pipeline (leitura da exportação no A1/A2, texto para o
+Sheets, limpeza do A6, leitura do CSV no IA) confere que o resultado é
+idêntico ao código anterior e mede o tempo: a primeira chamada interpreta os
+valores distintos, as seguintes (outro status, outro script no mesmo
+processo) já os encontram no cache.
+
+Uso: python -m benchmarks.bench_datas [--linhas 100000 1000000]
+"""
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from financeiro.datas import FORMATO_ISO, MISTO, converter_datas, converter_inicio_iso, formatar_datas, limpar_cache
+from financeiro.esquema import FORMATO_DATA_EXPORTACAO, FORMATO_DATA_PLANILHA
+
+
+# ===================== Versões anteriores (referência) =====================
+def exportacao_original(serie):
+    """esquema.converter_data"""
+    return pd.to_datetime(serie, format=FORMATO_DATA_EXPORTACAO, errors="coerce")
+
+
+def texto_original(serie):
+    """esquema.para_texto"""
+    return serie.dt.strftime(FORMATO_DATA_PLANILHA).astype(str)
+
+
+def limpeza_a6_original(serie):
+    """transformacoes.normalizar_datas (antes da gravação)"""
+    datas = pd.to_datetime(serie, format='mixed', dayfirst=True, errors='coerce')
+    return datas.dt.strftime('%Y-%m-%d').replace('NaT', '')
+
+
+def ia_original(serie):
+    """IA.parse_data_segura"""
+    texto = serie.where(serie.map(lambda x: isinstance(x, str)))
+    return pd.to_datetime(texto.str.extract(r'^([^-]*-[^-]*-[^-]*)', expand=False), format='%Y-%m-%d', errors='coerce')
+
+
+# ===================== Versões atuais =====================
+def exportacao_atual(serie):
+    return converter_datas(serie, FORMATO_DATA_EXPORTACAO)
+
+
+def texto_atual(serie):
+    return formatar_datas(serie, FORMATO_DATA_PLANILHA, np.nan).astype(str)
+
+
+def limpeza_a6_atual(serie):
+    return formatar_datas(converter_datas(serie, MISTO), FORMATO_ISO, np.nan)
+
+
+def ia_atual(serie):
+    return converter_inicio_iso(serie)
+
+
+def gerar_coluna(n, formato, seed=42):
+    """Datas de ~7 anos em texto, com 10% de vazios e alguns valores inválidos"""
+    rng = np.random.default_rng(seed)
+    datas = pd.Series(pd.Timestamp("2019-01-01") + pd.to_timedelta(rng.integers(0, 2500, n), unit="D"))
+    texto = datas.dt.strftime(formato).astype(object)
+    texto[rng.random(n) < 0.1] = np.nan
+    texto[rng.random(n) < 0.001] = "sem data"
+    return texto
+
+
+def cronometrar(funcao, serie):
+    inicio = time.perf_counter()
+    resultado = funcao(serie)
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for n in args.linhas:
+        dd_mm = gerar_coluna(n, "%d/%m/%Y")
+        iso = gerar_coluna(n, "%Y-%m-%d", seed=7)
+        casos = [
+            ("exportação A1/A2 (dd/mm/aaaa)", exportacao_original, exportacao_atual, dd_mm),
+            ("texto para o Sheets", texto_original, texto_atual, exportacao_original(dd_mm)),
+            ("limpeza A6 (misto)", limpeza_a6_original, limpeza_a6_atual, dd_mm),
+            ("limpeza A6 (já datetime)", limpeza_a6_original, limpeza_a6_atual, exportacao_original(dd_mm)),
+            ("CSV do IA (AAAA-MM-DD)", ia_original, ia_atual, iso),
+        ]
+        print(f"\n📦 {n:,} linhas")
+        print(f"  {'conversão':<30} {'antes':>8} {'1ª vez':>8} {'em cache':>9}  resultado")
+        for nome, original, atual, serie in casos:
+            tempo_antes, antes = cronometrar(original, serie)
+            limpar_cache()
+            tempo_primeira, depois = cronometrar(atual, serie)
+            # Outra coluna com os mesmos valores (o próximo status, o A2 depois do A1)
+            tempo_cache, _ = cronometrar(atual, serie.copy())
+            iguais = antes.reset_index(drop=True).equals(depois.reset_index(drop=True).astype(antes.dtype))
+            print(f"  {nome:<30} {tempo_antes:7.3f}s {tempo_primeira:7.3f}s {tempo_cache:8.3f}s  "
+                  f"{'✅ idêntico' if iguais else '❌ diferente'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Mede o financeiro.empresas com várias empresas contra o servidor local.
+
+Cada empresa tem as próprias planilhas no servidor simulado (benchmarks.servidores_locais)
+e roda o fluxo completo num processo, com Conta Azul e Google redirecionados. Compara
+as empresas uma depois da outra (``--paralelo 1``, como as cópias rodadas em
+sequência) com todas ao mesmo tempo, dividindo a mesma cota do Google. Uma empresa
+com configuração quebrada (token ausente) é incluída para conferir que as outras
+terminam normalmente.
+
+Com a cota padrão (60 chamadas de escrita por minuto para a service account)
+as empresas juntas ficam presas à cota, em paralelo ou não; ``--cota`` simula
+uma cota maior (ou service accounts separadas) para ver o ganho do paralelismo.
+
+Uso: python -m benchmarks.bench_empresas [--empresas 3] [--linhas 10000] [--latencia-ms 20] [--cota 60]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+from benchmarks.bench_pipeline import PASTA_DADOS, credenciais_locais
+from benchmarks.dados_sinteticos import gerar_exportacoes
+from benchmarks.servidores_locais import iniciar_servidor
+
+nomes_planilhas = ["FInanceiro_contas_a_receber_Teste", "Financeiro_contas_a_pagar_Teste", "Financeiro_Completo_Teste"]
+
+
+def configuracao(n_empresas):
+    empresas = [{
+        "nome": f"empresa{i}",
+        "contaazul_token": f"token-{i}",
+        "google_pasta_id": f"pasta-{i}",
+        "planilhas": {nome: f"empresa{i}-{nome}" for nome in nomes_planilhas},
+    } for i in range(n_empresas)]
+    empresas.append({"nome": "quebrada", "contaazul_token": "$TOKEN_INEXISTENTE", "google_pasta_id": "pasta-x"})
+    return {"empresas": empresas}
+
+
+def rodar(paralelo, n_empresas, exportacoes, latencia):
+    servidor = iniciar_servidor(exportacoes, latencia=latencia)
+    pasta = tempfile.mkdtemp(prefix="bench_empresas_")
+    try:
+        # O diretório de cache precisa estar no ambiente antes de importar o financeiro
+        os.environ["FINANCEIRO_CACHE_DIR"] = pasta
+        from financeiro import armazenamento, empresas
+        armazenamento.CACHE_DIR = empresas.CACHE_DIR = pasta
+        empresas.comando_fluxo = [sys.executable, "-c", (
+            "import sys; from benchmarks.pipeline_local import redirecionar; redirecionar(sys.argv[1]); "
+            "from financeiro.empresas import executar_fluxo; executar_fluxo()"), servidor.url]
+
+        inicio = time.perf_counter()
+        resultados = empresas.executar_empresas(configuracao(n_empresas), paralelo=paralelo)
+        duracao = time.perf_counter() - inicio
+        # Linhas gravadas na planilha consolidada de cada empresa
+        consolidadas = {chave.split("-")[0]: linhas for chave, linhas in servidor.resumo().items()
+                        if "Financeiro_Completo_Teste" in chave and "Dados_Pivotados" not in chave}
+        return duracao, resultados, consolidadas, dict(servidor.chamadas)
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--empresas", type=int, default=3)
+    parser.add_argument("--linhas", type=int, default=10_000)
+    parser.add_argument("--latencia-ms", type=float, default=20, help="latência simulada por chamada de API")
+    parser.add_argument("--cota", type=int, default=60, help="chamadas por minuto de leitura e de escrita no Sheets")
+    args = parser.parse_args()
+
+    # Antes de importar o financeiro.cotas (o balde compartilhado fica neste processo)
+    os.environ.update({
+        "COTA_SHEETS_LEITURA": str(args.cota),
+        "COTA_SHEETS_ESCRITA": str(args.cota),
+        "GDRIVE_SERVICE_ACCOUNT": credenciais_locais(),
+        "CONTAAZUL_INCREMENTAL": "0",
+    })
+    exportacoes = gerar_exportacoes(args.linhas, pasta=PASTA_DADOS)
+
+    tempos = {}
+    for paralelo in (1, args.empresas):
+        print(f"\n=== {args.empresas} empresas + 1 quebrada, {paralelo} ao mesmo tempo, cota {args.cota}/min ===")
+        duracao, resultados, consolidadas, chamadas = rodar(paralelo, args.empresas, exportacoes,
+                                                            args.latencia_ms / 1000)
+        tempos[paralelo] = duracao
+        ok = sorted(nome for nome, resultado in resultados.items() if resultado["situacao"] == "ok")
+        print(f"tempo total: {duracao:.2f}s | concluídas: {ok} | "
+              f"quebrada: {resultados['quebrada']['situacao']}")
+        print(f"linhas na consolidada de cada empresa: {consolidadas}")
+        print(f"chamadas às APIs simuladas: {chamadas}")
+
+    print(f"\n🏁 em sequência {tempos[1]:.2f}s → em paralelo {tempos[args.empresas]:.2f}s "
+          f"({tempos[1] / tempos[args.empresas]:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
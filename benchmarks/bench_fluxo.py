@@ -0,0 +1,159 @@
+"""Compara a extração consolidada (concat + transformar) com a extração em fluxo por status.
+
+Cada status é gravado em Parquet e relido sob demanda, como se chegasse do
+Conta Azul. Confere que a planilha gravada pelo enviar_em_fluxo (cabeçalho e
+células) é a mesma do caminho consolidado (ids repetidos entre status e
+centros de custo variando por status incluídos) e mede o pico de memória
+de cada caminho num processo separado (ru_maxrss).
+
+Uso: python -m benchmarks.bench_fluxo [--linhas 100000 1000000]
+"""
+import os
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import threading
+import multiprocessing
+
+import pandas as pd
+
+from benchmarks.dados_sinteticos import gerar_linhas, proporcao_por_status
+from benchmarks.servidores_locais import Aba, _intervalo
+from financeiro.contaazul import status_list
+from financeiro.esquema import para_texto
+from financeiro.extracao import colunas_derivadas, consolidar, transformar, transformar_em_fluxo
+from financeiro.sheets import valores_celula
+from financeiro.uploader import enviar_em_fluxo
+
+
+def gravar_status(n_linhas, pasta):
+    """Um Parquet por status; 2% dos ids de cada status repetem ids do status anterior"""
+    anterior = None
+    for i, status in enumerate(status_list):
+        n = max(1, int(n_linhas * proporcao_por_status.get(status, 0.03)))
+        linhas = gerar_linhas(n, status, n_centros=4 if status == "PENDING" else 3, seed=42 + i)
+        df = pd.DataFrame(linhas, columns=next(linhas))
+        if anterior is not None:
+            repetidos = min(len(anterior), len(df)) // 50
+            df.loc[:repetidos - 1, "id"] = anterior[:repetidos]
+        anterior = df["id"].tolist()
+        df["status"] = status
+        df.to_parquet(os.path.join(pasta, f"{status}.parquet"), index=False)
+
+
+def ler_status(pasta):
+    for status in status_list:
+        yield status, pd.read_parquet(os.path.join(pasta, f"{status}.parquet"))
+
+
+def caminho_consolidado(pasta):
+    df = transformar(consolidar([df for _, df in ler_status(pasta)]), verboso=False)
+    return len(para_texto(df))
+
+
+def caminho_em_fluxo(pasta):
+    linhas = 0
+    for df in transformar_em_fluxo(ler_status(pasta)):
+        # Cada lote é descartado depois de convertido, como após o envio ao Sheets
+        linhas += len(para_texto(df))
+    return linhas
+
+
+class DestinoMemoria:
+    """Destino do uploader gravando numa aba do servidor local, sem HTTP"""
+    thread_safe = True
+
+    def __init__(self):
+        self.aba = Aba(0, "Dados", 0, valores_completos=True)
+        self._trava = threading.Lock()
+
+    def intervalo(self, a1):
+        return f"'Dados'!{a1}"
+
+    def atualizar_lote(self, dados, value_input_option):
+        with self._trava:
+            for item in dados:
+                _, linha, _, coluna = _intervalo(item["range"])
+                self.aba.gravar(linha, coluna, item["values"])
+
+    def limpar_tudo(self):
+        self.aba.limpar()
+
+    def garantir_grade(self, linhas, colunas):
+        grade = self.aba.propriedades["gridProperties"]
+        grade["rowCount"], grade["columnCount"] = max(linhas, grade["rowCount"]), max(colunas, grade["columnCount"])
+
+    def inserir_colunas(self, posicao, quantidade):
+        with self._trava:
+            self.aba.inserir_colunas(posicao, quantidade)
+
+    def grade(self):
+        """Cabeçalho e linhas gravadas, completadas com vazio até a largura do cabeçalho"""
+        cabecalho = self.aba.cabecalho
+        linhas = [self.aba.linhas[numero] for numero in sorted(self.aba.linhas) if numero > 1]
+        return cabecalho, [celulas + [""] * (len(cabecalho) - len(celulas)) for celulas in linhas]
+
+
+def conferir(pasta):
+    """A planilha gravada em fluxo (cabeçalho, e células ordenadas por id) é a do caminho consolidado?"""
+    consolidado = para_texto(transformar(consolidar([df for _, df in ler_status(pasta)]), verboso=False))
+    destino = DestinoMemoria()
+    em_texto = (para_texto(df) for df in transformar_em_fluxo(ler_status(pasta)))
+    enviar_em_fluxo(destino, em_texto, max_linhas=5_000, colunas_no_fim=colunas_derivadas)
+
+    cabecalho, linhas = destino.grade()
+    if cabecalho != list(consolidado.columns):
+        print(f"cabeçalho diferente:\n  consolidado: {list(consolidado.columns)}\n  em fluxo:    {cabecalho}")
+        return False
+    esperado = valores_celula(consolidado).astype(object).sort_values("id", ignore_index=True)
+    em_fluxo = pd.DataFrame(linhas, columns=cabecalho, dtype=object).sort_values("id", ignore_index=True)
+    return esperado.equals(em_fluxo)
+
+
+def _medir_no_processo(funcao, args, fila):
+    antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    duracao = time.perf_counter() - inicio
+    fila.put((resultado, duracao, antes / 1024, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+def medir(funcao, *args):
+    """Resultado, tempo, memória inicial e pico de memória (MB) de ``funcao`` num interpretador novo.
+
+    O processo principal fica pequeno: o ru_maxrss do filho herda o pico do pai.
+    """
+    contexto = multiprocessing.get_context("spawn")
+    fila = contexto.Queue()
+    processo = contexto.Process(target=_medir_no_processo, args=(funcao, args, fila))
+    processo.start()
+    resultado = fila.get()
+    processo.join()
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for n in args.linhas:
+        pasta = tempfile.mkdtemp(prefix="bench_fluxo_")
+        try:
+            medir(gravar_status, n, pasta)
+            linhas, tempo_c, base_c, pico_c = medir(caminho_consolidado, pasta)
+            _, tempo_f, base_f, pico_f = medir(caminho_em_fluxo, pasta)
+            iguais, *_ = medir(conferir, pasta)
+
+            print(f"\n=== {n} linhas ({linhas} únicas) ===")
+            print(f"consolidado: {tempo_c:6.2f}s  pico {pico_c:8.1f} MB (antes: {base_c:.1f} MB)")
+            print(f"em fluxo:    {tempo_f:6.2f}s  pico {pico_f:8.1f} MB (antes: {base_f:.1f} MB)")
+            print(f"resultado idêntico: {'✅' if iguais else '❌'}")
+        finally:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
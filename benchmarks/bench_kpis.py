@@ -0,0 +1,101 @@
+"""Compara os cálculos originais do IA.py (vários filtros + apply linha a linha) com financeiro.kpis.
+
+Uso: python -m benchmarks.bench_kpis [--linhas 100000 1000000]
+"""
+import time
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.dados_sinteticos import gerar_transacoes_ia
+from financeiro.kpis import calcular_kpis
+
+
+def kpis_original(df, hoje):
+    """Cópia dos cálculos do IA.py antes do motor de KPIs (referência)"""
+    df = df[df['lastAcquittanceDate'].dt.year == hoje.year].copy()
+    df['AnoMes'] = df['lastAcquittanceDate'].dt.to_period('M')
+    df['Trimestre'] = df['lastAcquittanceDate'].dt.to_period('Q')
+    df['AnoMes_Caixa'] = df['lastAcquittanceDate'].dt.to_period('M')
+    df['Trimestre_Caixa'] = df['lastAcquittanceDate'].dt.to_period('Q')
+    resumo_trimestral = df.groupby(['Trimestre', 'tipo'])[['paid']].sum().unstack(fill_value=0)
+    resumo_mensal_categoria = df.groupby(['AnoMes', 'categoriesRatio.category'])['paid'].sum().unstack(fill_value=0)
+    variacao_mensal_pct = resumo_mensal_categoria.pct_change().fillna(0)
+    categorias_com_alta = (variacao_mensal_pct > 0.3).apply(lambda row: row[row > 0.3].to_dict(), axis=1).to_dict()
+    total_recebido = df[df['tipo'] == 'Receita']['paid'].sum()
+    total_pago = df[df['tipo'] == 'Despesa']['paid'].sum()
+    total_pendente_despesa = df[(df['tipo'] == 'Despesa') & (df['status'] == 'OVERDUE')]['paid'].sum()
+    total_pendente_receita = df[(df['tipo'] == 'Receita') & (df['status'] == 'OVERDUE')]['paid'].sum()
+    top_categorias = df['categoriesRatio.category'].value_counts().head(3).to_dict()
+    df_realizadas = df[df['lastAcquittanceDate'] <= hoje].copy()
+    df_realizadas['valor_ajustado'] = df_realizadas.apply(
+        lambda row: abs(row['paid']) if row['tipo'] == 'Receita' else -abs(row['paid']), axis=1)
+    fluxo_caixa = df_realizadas.groupby('AnoMes_Caixa')['valor_ajustado'].sum().reset_index()
+    fluxo_caixa['saldo_acumulado'] = fluxo_caixa['valor_ajustado'].cumsum()
+    df_receitas = df_realizadas[df_realizadas['tipo'].str.lower() == 'Receita']
+    df_despesas = df_realizadas[df_realizadas['tipo'].str.lower() == 'Despesa']
+    receitas_mensais = df_receitas.groupby('AnoMes')['paid'].sum().reset_index()
+    despesas_mensais = df_despesas.groupby('AnoMes')['paid'].sum().reset_index()
+    rentabilidade = pd.merge(receitas_mensais, despesas_mensais, on='AnoMes', how='outer',
+                             suffixes=('_receita', '_despesa')).fillna(0)
+    df_pendentes = df[(df['paid'] > 0) & (df['dueDate'] <= hoje) & (df['status'] == 'OVERDUE')]
+    total_vencido = df_pendentes[df_pendentes['tipo'] == 'Receita']['paid'].sum()
+    return {
+        "total_recebido": total_recebido, "total_pago": total_pago,
+        "total_pendente_receita": total_pendente_receita, "total_pendente_despesa": total_pendente_despesa,
+        "top_categorias": top_categorias, "resumo_trimestral": resumo_trimestral,
+        "categorias_com_alta": categorias_com_alta, "fluxo_caixa": fluxo_caixa, "rentabilidade": rentabilidade,
+        "inadimplencia": total_vencido / total_recebido if total_recebido else 0,
+    }
+
+
+def rentabilidade_referencia(df, hoje):
+    """Rentabilidade como o IA.py pretendia (comparando 'Receita'/'Despesa' sem .str.lower())"""
+    df = df[(df['lastAcquittanceDate'].dt.year == hoje.year) & (df['lastAcquittanceDate'] <= hoje)]
+    mes = df['lastAcquittanceDate'].dt.to_period('M')
+    tabela = df.groupby([mes, 'tipo'])['paid'].sum().unstack(fill_value=0)
+    return tabela.reindex(columns=['Receita', 'Despesa'], fill_value=0)
+
+
+def conferir(original, novo, df, hoje):
+    for campo in ["total_recebido", "total_pago", "total_pendente_receita", "total_pendente_despesa", "inadimplencia"]:
+        assert np.isclose(original[campo], getattr(novo, campo)), campo
+    assert set(original["top_categorias"].items()) == set(novo.top_categorias.items()), "top_categorias"
+    pd.testing.assert_frame_equal(original["resumo_trimestral"], novo.resumo_trimestral, check_names=False)
+    pd.testing.assert_frame_equal(original["fluxo_caixa"], novo.fluxo_caixa, check_dtype=False)
+    # O original marcava as categorias com True; o motor devolve a variação
+    assert {m: set(c) for m, c in original["categorias_com_alta"].items()} == \
+           {m: set(c) for m, c in novo.categorias_com_alta.items()}, "categorias_com_alta"
+    assert original["rentabilidade"].empty, "original deveria ter rentabilidade vazia (.str.lower())"
+    referencia = rentabilidade_referencia(df, hoje)
+    assert np.allclose(referencia['Receita'].to_numpy(), novo.rentabilidade['paid_receita'].to_numpy())
+    assert np.allclose(referencia['Despesa'].to_numpy(), novo.rentabilidade['paid_despesa'].to_numpy())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    # "Hoje" no meio do ano para haver transações futuras (não realizadas)
+    hoje = pd.Timestamp(datetime.today().year, 7, 15)
+    print(f"{'linhas':>10} | {'original':>10} | {'motor':>8} | ganho")
+    for n in args.linhas:
+        df = gerar_transacoes_ia(n, ano=hoje.year)
+
+        inicio = time.perf_counter()
+        original = kpis_original(df, hoje)
+        t_original = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        novo = calcular_kpis(df, hoje=hoje)
+        t_novo = time.perf_counter() - inicio
+
+        conferir(original, novo, df, hoje)
+        print(f"{n:>10} | {t_original:>9.2f}s | {t_novo:>7.2f}s | {t_original / t_novo:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
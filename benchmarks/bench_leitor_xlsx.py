@@ -0,0 +1,54 @@
+"""Compara as engines de leitura XLSX em exportações sintéticas.
+
+Uso: python -m benchmarks.bench_leitor_xlsx [--linhas 10000 100000 500000] [--repeticoes 1]
+"""
+import time
+import argparse
+
+import pandas as pd
+
+from benchmarks.dados_sinteticos import gerar_xlsx
+from financeiro.leitor_xlsx import engines, calamine_disponivel, ler_xlsx
+
+
+def medir(conteudo, engine, repeticoes):
+    melhor, df = float("inf"), None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        df = ler_xlsx(conteudo, engine)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument("--repeticoes", type=int, default=1)
+    args = parser.parse_args()
+
+    nomes = [e for e in engines if e != "calamine" or calamine_disponivel()]
+    if not calamine_disponivel():
+        print("⚠️ python-calamine não instalado; engine calamine ignorada")
+
+    for n in args.linhas:
+        print(f"\n📦 Gerando exportação sintética com {n:,} linhas...")
+        conteudo = gerar_xlsx(n)
+        print(f"  {len(conteudo) / 1024 / 1024:.1f} MB")
+
+        referencia, tempo_referencia = None, None
+        for engine in ["openpyxl"] + [e for e in nomes if e != "openpyxl"]:
+            tempo, df = medir(conteudo, engine, args.repeticoes)
+            if referencia is None:
+                referencia, tempo_referencia = df, tempo
+                igual = "referência"
+            else:
+                try:
+                    pd.testing.assert_frame_equal(referencia, df)
+                    igual = "idêntico"
+                except AssertionError as e:
+                    igual = f"DIFERENTE: {str(e).splitlines()[0]}"
+            print(f"  {engine:<20} {tempo:8.2f}s  {tempo_referencia / tempo:5.1f}x  {igual}")
+
+
+if __name__ == "__main__":
+    main()
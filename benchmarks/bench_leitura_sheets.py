@@ -0,0 +1,111 @@
+"""Compara a leitura antiga das planilhas de origem do A6 com a leitura em paralelo via batchGet.
+
+Publica contas a receber e a pagar sintéticas no servidor local (com todas
+as células guardadas) e lê as duas planilhas de dois jeitos:
+
+- antigo: uma planilha depois da outra, ``get_all_values`` do gspread e
+  inferência de tipos do pandas (o que o ``get_as_dataframe`` fazia);
+- novo: ``financeiro.leitura_sheets.ler_planilhas`` (janelas em paralelo,
+  valores crus e esquema fixo).
+
+Confere que ids, datas e valores batem e mostra o tempo de cada caminho.
+
+Uso: python -m benchmarks.bench_leitura_sheets [--linhas 20000 100000] [--latencia-ms 20]
+"""
+import os
+import time
+import argparse
+
+from pandas.io.parsers import TextParser
+
+from benchmarks.bench_pipeline import credenciais_locais
+from benchmarks.dados_sinteticos import gerar_consolidado
+from benchmarks.pipeline_local import redirecionar
+from benchmarks.servidores_locais import iniciar_servidor
+
+ids_origem = {"receber": "bench-leitura-receber", "pagar": "bench-leitura-pagar"}
+
+
+def publicar(gc, n_linhas):
+    """Grava metade das linhas sintéticas em cada planilha, como texto (RAW)"""
+    from financeiro.sheets import DestinoGspread
+    from financeiro.uploader import enviar_em_blocos
+
+    df = gerar_consolidado(n_linhas).drop(columns="tipo")
+    metade = len(df) // 2
+    for nome, parte in (("receber", df.iloc[:metade]), ("pagar", df.iloc[metade:])):
+        enviar_em_blocos(DestinoGspread(gc.open_by_key(ids_origem[nome]).sheet1), parte.reset_index(drop=True),
+                         value_input_option="RAW")
+
+
+def ler_antigo(gc):
+    """Caminho anterior: leitura sequencial das abas inteiras e tipos inferidos pelo pandas"""
+    from financeiro.esquema import aplicar_esquema
+
+    resultado = {}
+    for nome, spreadsheet_id in ids_origem.items():
+        valores = gc.open_by_key(spreadsheet_id).sheet1.get_all_values()
+        df = TextParser(valores, header=0).read().dropna(how="all")
+        resultado[nome] = aplicar_esquema(df)
+    return resultado
+
+
+def ler_novo():
+    from financeiro.leitura_sheets import ler_planilhas
+
+    return ler_planilhas(ids_origem)
+
+
+def iguais(antigo, novo):
+    """Mesmos ids, datas e valores (em ordem) nas duas leituras?"""
+    from financeiro.esquema import colunas_data, colunas_valor
+
+    for nome in ids_origem:
+        a, b = antigo[nome], novo[nome]
+        if len(a) != len(b) or list(a.columns) != list(b.columns):
+            return False
+        if not a["id"].astype(str).reset_index(drop=True).equals(b["id"].astype(str).reset_index(drop=True)):
+            return False
+        for coluna in a.columns:
+            if coluna in colunas_data or coluna in colunas_valor:
+                if not a[coluna].reset_index(drop=True).equals(b[coluna].reset_index(drop=True)):
+                    return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[20_000, 100_000])
+    parser.add_argument("--latencia-ms", type=float, default=20, help="latência simulada por chamada de API")
+    args = parser.parse_args()
+
+    # As credenciais precisam existir antes de importar o financeiro.clientes_google
+    os.environ["GDRIVE_SERVICE_ACCOUNT"] = credenciais_locais()
+    for n in args.linhas:
+        servidor = iniciar_servidor({}, latencia=args.latencia_ms / 1000, valores_completos=True)
+        try:
+            redirecionar(servidor.url)
+            from financeiro.clientes_google import gspread_cliente
+
+            gc = gspread_cliente()
+            publicar(gc, n)
+
+            inicio = time.perf_counter()
+            antigo = ler_antigo(gc)
+            tempo_antigo = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            novo = ler_novo()
+            tempo_novo = time.perf_counter() - inicio
+
+            print(f"\n=== {n} linhas ===")
+            print(f"sequencial (gspread + inferência): {tempo_antigo:6.2f}s")
+            print(f"batchGet em paralelo + esquema:    {tempo_novo:6.2f}s")
+            print(f"resultado idêntico: {'✅' if iguais(antigo, novo) else '❌'}")
+        finally:
+            servidor.shutdown()
+            servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Mede o fluxo completo do Update_contas.py (A0 → A1/A2 → A6) sem Conta Azul nem Google reais.
+
+Gera exportações sintéticas, sobe o servidor local (benchmarks.servidores_locais)
+e roda o pipeline num subprocesso com os hosts externos redirecionados. Os tempos
+por etapa vêm do log de métricas (financeiro.metricas) e são comparados com a
+linha de base salva; etapas mais lentas que a tolerância são marcadas como regressão.
+
+Uso: python -m benchmarks.bench_pipeline [--linhas 10000 100000 1000000] [--latencia-ms 20]
+                                         [--tolerancia 0.25] [--salvar-baseline]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+import rsa
+
+from benchmarks.dados_sinteticos import gerar_exportacoes
+from benchmarks.servidores_locais import iniciar_servidor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(RAIZ, "benchmarks", "baseline_pipeline.json")
+# XLSX sintéticos reaproveitados entre execuções (gerar 1M linhas leva minutos)
+PASTA_DADOS = os.path.join(RAIZ, ".cache", "benchmarks", "exportacoes")
+
+# Diferenças menores que isso (em segundos) não contam como regressão
+FOLGA_SEGUNDOS = 1.0
+
+
+def credenciais_locais():
+    """Service account com chave RSA descartável (o token é emitido pelo servidor local)"""
+    # rsa já vem com o google-auth
+    _, chave = rsa.newkeys(1024)
+    pem = chave.save_pkcs1().decode()
+    return json.dumps({
+        "type": "service_account",
+        "project_id": "benchmark-local",
+        "private_key_id": "local",
+        "private_key": pem,
+        "client_email": "benchmark@benchmark-local.iam.gserviceaccount.com",
+        "client_id": "0",
+        "token_uri": "https://oauth2.googleapis.com/token",
+    })
+
+
+def etapas_da_execucao(caminho_log, execucao):
+    """Duração das etapas de primeiro e segundo nível registradas pelo pipeline"""
+    etapas, falhas = {}, []
+    with open(caminho_log, encoding="utf-8") as f:
+        for linha in f:
+            registro = json.loads(linha)
+            if registro["execucao"] != execucao or registro["etapa"].count(".") > 2:
+                continue
+            rotulos = ",".join(v for k, v in sorted(registro["rotulos"].items()) if k in ("tipo", "planilha"))
+            nome = f"{registro['etapa']}[{rotulos}]" if rotulos else registro["etapa"]
+            etapas[nome] = registro["duracao_s"]
+            if not registro["sucesso"]:
+                falhas.append(f"{nome}: {registro['erro']}")
+    return etapas, falhas
+
+
+def executar(n_linhas, latencia, credenciais):
+    exportacoes = gerar_exportacoes(n_linhas, pasta=PASTA_DADOS)
+    servidor = iniciar_servidor(exportacoes, latencia=latencia)
+    pasta = tempfile.mkdtemp(prefix="bench_pipeline_")
+    execucao = f"bench-{n_linhas}-{int(time.time())}"
+    ambiente = {
+        **os.environ,
+        "GDRIVE_SERVICE_ACCOUNT": credenciais,
+        "FINANCEIRO_CACHE_DIR": os.path.join(pasta, "cache"),
+        "METRICAS_LOG": os.path.join(pasta, "metricas.jsonl"),
+        "METRICAS_EXECUCAO": execucao,
+        "CONTAAZUL_INCREMENTAL": "0",
+        "CONTAAZUL_TOKEN": "token-local",
+        "PYTHONPATH": RAIZ,
+    }
+    try:
+        inicio = time.perf_counter()
+        with open(os.path.join(pasta, "saida.log"), "w") as saida:
+            processo = subprocess.run([sys.executable, "-m", "benchmarks.pipeline_local", servidor.url],
+                                      cwd=RAIZ, env=ambiente, stdout=saida, stderr=subprocess.STDOUT)
+        total = time.perf_counter() - inicio
+        etapas, falhas = etapas_da_execucao(ambiente["METRICAS_LOG"], execucao)
+        if processo.returncode != 0:
+            falhas.append(f"processo terminou com código {processo.returncode} (log em {pasta})")
+        return {
+            "total_s": round(total, 2),
+            "etapas_s": round(sum(v for k, v in etapas.items() if "." not in k.split("[")[0]), 2),
+            "etapas": etapas,
+            "chamadas": dict(servidor.chamadas),
+            "abas": servidor.resumo(),
+            "falhas": falhas,
+            "pasta": pasta,
+        }
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def comparar(resultado, referencia, tolerancia):
+    """Lista de (etapa, atual, base) para as etapas acima de base × (1 + tolerância) + folga"""
+    regressoes = []
+    atuais = {"etapas_s": resultado["etapas_s"], **resultado["etapas"]}
+    base = {"etapas_s": referencia.get("etapas_s"), **referencia.get("etapas", {})}
+    for nome, atual in atuais.items():
+        anterior = base.get(nome)
+        if anterior is not None and atual > anterior * (1 + tolerancia) + FOLGA_SEGUNDOS:
+            regressoes.append((nome, atual, anterior))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--latencia-ms", type=float, default=20, help="latência simulada por chamada de API")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="piora relativa aceita por etapa")
+    parser.add_argument("--salvar-baseline", action="store_true", help="grava os tempos medidos como nova base")
+    parser.add_argument("--manter-arquivos", action="store_true", help="não apaga logs e cache temporários")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(BASELINE):
+        with open(BASELINE, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    credenciais = credenciais_locais()
+    houve_problema = False
+    for n in args.linhas:
+        print(f"\n=== {n} linhas ===")
+        resultado = executar(n, args.latencia_ms / 1000, credenciais)
+
+        referencia = baseline.get(str(n), {})
+        print(f"{'etapa':<55} {'atual':>9} {'base':>9}")
+        for nome, segundos in sorted(resultado["etapas"].items()):
+            anterior = referencia.get("etapas", {}).get(nome)
+            print(f"{nome:<55} {segundos:>8.2f}s {anterior if anterior is not None else '-':>8}")
+        print(f"{'soma das etapas':<55} {resultado['etapas_s']:>8.2f}s "
+              f"{referencia.get('etapas_s', '-'):>8}")
+        print(f"{'tempo total do processo':<55} {resultado['total_s']:>8.2f}s")
+        print(f"chamadas às APIs simuladas: {resultado['chamadas']}")
+        print(f"linhas gravadas por aba: {resultado['abas']}")
+
+        for falha in resultado["falhas"]:
+            houve_problema = True
+            print(f"❌ {falha}")
+        for nome, atual, anterior in comparar(resultado, referencia, args.tolerancia):
+            houve_problema = True
+            print(f"⚠️ REGRESSÃO em {nome}: {atual:.2f}s (base {anterior:.2f}s)")
+
+        if args.salvar_baseline and not resultado["falhas"]:
+            baseline[str(n)] = {k: resultado[k] for k in ("total_s", "etapas_s", "etapas")}
+        if not args.manter_arquivos and not resultado["falhas"]:
+            shutil.rmtree(resultado["pasta"], ignore_errors=True)
+
+    if args.salvar_baseline:
+        with open(BASELINE, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"\n💾 Linha de base salva em {BASELINE}")
+
+    sys.exit(1 if houve_problema else 0)
+
+
+if __name__ == "__main__":
+    main()
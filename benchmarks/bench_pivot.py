@@ -0,0 +1,105 @@
+"""Compara memória (pico de RSS) e tempo do unpivot de centros de custo: melt + merge vs. passada única.
+
+Antes de medir, confere numa amostra o DataFrame das duas versões e as células
+que o A6 grava na aba Dados_Pivotados (limpeza + pivotagem + texto da gravação)
+contra o A6 original, lendo o texto das planilhas e o DataFrame já tipado.
+
+Uso: python -m benchmarks.bench_pivot [--linhas 200000 1000000] [--centros 5]
+"""
+import io
+import sys
+import time
+import argparse
+import resource
+import multiprocessing
+from contextlib import redirect_stdout
+
+import pandas as pd
+
+from benchmarks.bench_transformacoes import celulas_gravadas, limpeza_original
+from benchmarks.dados_sinteticos import gerar_consolidado
+from financeiro.esquema import aplicar_esquema
+from financeiro.transformacoes import despivotar_centros_de_custo, formatar_para_gravacao, limpar_consolidado
+
+
+def pivot_original(df_completo):
+    """Cópia da pivotagem do A6_Pivot.py antes da otimização (referência)"""
+    colunas_centro_custo = [col for col in df_completo.columns if col.startswith("Centro de Custo ") and not col.startswith("Valor no Centro de Custo ")]
+    colunas_valor = [col for col in df_completo.columns if col.startswith("Valor no Centro de Custo ")]
+    colunas_id = [col for col in df_completo.columns if col not in colunas_centro_custo + colunas_valor]
+    df_completo_indexed = df_completo.reset_index(drop=False).rename(columns={'index': 'row_id'})
+    colunas_id_merge = ['row_id'] + colunas_id
+    df_melted_cc = pd.melt(df_completo_indexed, id_vars=colunas_id_merge, value_vars=colunas_centro_custo,
+                           var_name='Centro_de_Custo_Temp', value_name='Centro_de_Custo_Unificado')
+    df_melted_valor = pd.melt(df_completo_indexed, id_vars=colunas_id_merge, value_vars=colunas_valor,
+                              var_name='Valor_Temp', value_name='paid_new')
+    df_melted_cc['num'] = df_melted_cc['Centro_de_Custo_Temp'].str.extract(r'(\d+)$').astype(int)
+    df_melted_valor['num'] = df_melted_valor['Valor_Temp'].str.extract(r'(\d+)$').astype(int)
+    df_final = df_melted_cc.merge(df_melted_valor[['row_id', 'num', 'paid_new']], on=['row_id', 'num'], how='left')
+    df_final = df_final.drop(columns=['Centro_de_Custo_Temp', 'row_id', 'num'])
+    df_final['paid_new'] = pd.to_numeric(df_final['paid_new'], errors='coerce').abs()
+    df_final = df_final.dropna(subset=['Centro_de_Custo_Unificado'])
+    df_final = df_final[
+        (df_final['Centro_de_Custo_Unificado'].astype(str).str.strip() != '') &
+        (df_final['Centro_de_Custo_Unificado'].astype(str).str.strip() != 'nan')
+    ]
+    return df_final
+
+
+def aba_pivotada_original(df):
+    """Células da Dados_Pivotados no A6 original: limpeza com datas em texto e depois o melt"""
+    return celulas_gravadas(pivot_original(limpeza_original(df.copy())))
+
+
+def aba_pivotada_atual(df):
+    """Células da Dados_Pivotados hoje: limpeza tipada, passada única e datas formatadas só na gravação"""
+    return celulas_gravadas(formatar_para_gravacao(despivotar_centros_de_custo(limpar_consolidado(df.copy()))))
+
+
+variantes = {"melt + merge": pivot_original, "passada única": despivotar_centros_de_custo}
+
+
+def _pico_rss_mb():
+    fator = 1024 * 1024 if sys.platform == "darwin" else 1024  # ru_maxrss é bytes no macOS, KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * fator / 1024 / 1024
+
+
+def _medir(nome, n, centros, fila):
+    # Processo novo por variante: o pico de RSS não é contaminado pela outra
+    df = gerar_consolidado(n, centros)
+    base = _pico_rss_mb()
+    inicio = time.perf_counter()
+    resultado = variantes[nome](df)
+    fila.put((time.perf_counter() - inicio, _pico_rss_mb() - base, len(resultado)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[200_000, 1_000_000])
+    parser.add_argument("--centros", type=int, default=5)
+    args = parser.parse_args()
+
+    # Confere a equivalência numa amostra menor
+    amostra = gerar_consolidado(20_000, args.centros)
+    pd.testing.assert_frame_equal(pivot_original(amostra), despivotar_centros_de_custo(amostra))
+    # Sem as mensagens de progresso da limpeza
+    with redirect_stdout(io.StringIO()):
+        gravado = aba_pivotada_original(amostra)
+        pd.testing.assert_frame_equal(gravado, aba_pivotada_atual(amostra))
+        pd.testing.assert_frame_equal(gravado, aba_pivotada_atual(aplicar_esquema(amostra.copy())))
+    print("✅ Resultados e células gravadas idênticos na amostra de 20.000 linhas")
+
+    contexto = multiprocessing.get_context("spawn")
+    for n in args.linhas:
+        print(f"\n📦 {n:,} linhas, {args.centros} centros de custo")
+        for nome in variantes:
+            fila = contexto.Queue()
+            processo = contexto.Process(target=_medir, args=(nome, n, args.centros, fila))
+            processo.start()
+            tempo, pico, linhas = fila.get()
+            processo.join()
+            print(f"  {nome:<15} {tempo:7.2f}s  pico +{pico:8.1f} MB  ({linhas:,} linhas geradas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Compara a limpeza original do A6 (apply linha a linha) com financeiro.transformacoes.
+
+Além do DataFrame, confere as células que o A6 grava no Financeiro_Completo
+(``valores_celula``) contra as da versão original, tanto lendo o texto das
+planilhas quanto o DataFrame já tipado (artefato da extração ou leitura com
+esquema), em que 'Data movimento' chega como datetime64.
+
+Uso: python -m benchmarks.bench_transformacoes [--linhas 100000 1000000]
+"""
+import time
+import argparse
+
+import pandas as pd
+
+from benchmarks.dados_sinteticos import gerar_consolidado
+from financeiro.esquema import aplicar_esquema
+from financeiro.sheets import valores_celula
+from financeiro.transformacoes import formatar_para_gravacao, limpar_consolidado
+
+
+def limpeza_original(df_completo):
+    """Cópia da limpeza do A6_Pivot.py antes da vetorização (referência)"""
+    campos_data = ['lastAcquittanceDate', 'financialEvent.competenceDate', 'dueDate']
+    for campo in campos_data:
+        if campo in df_completo.columns:
+            df_completo[campo] = pd.to_datetime(df_completo[campo], format='mixed', dayfirst=True, errors='coerce')
+            df_completo[campo] = df_completo[campo].dt.strftime('%Y-%m-%d')
+            df_completo[campo] = df_completo[campo].replace('NaT', '')
+
+    if 'categoriesRatio.value' in df_completo.columns and 'paid' in df_completo.columns:
+        df_completo['categoriesRatio.value'] = df_completo.apply(
+            lambda row: row['paid'] if pd.notna(row['categoriesRatio.value']) and pd.notna(row['paid']) and row['categoriesRatio.value'] > row['paid'] else row['categoriesRatio.value'],
+            axis=1
+        )
+
+    colunas_centro_custo = [col for col in df_completo.columns if col.startswith("Centro de Custo ") and not col.startswith("Valor no Centro de Custo ")]
+    if len(colunas_centro_custo) > 0 and 'paid' in df_completo.columns:
+        linhas_com_valor_preenchido = pd.Series([False] * len(df_completo), index=df_completo.index)
+        for i, col_centro in enumerate(colunas_centro_custo, start=1):
+            col_valor = f"Valor no Centro de Custo {i}"
+            if col_valor not in df_completo.columns:
+                continue
+            df_completo[col_centro] = df_completo[col_centro].astype(str).str.strip()
+            mask_centro_vazio = (df_completo[col_centro].isna()) | (df_completo[col_centro] == '') | (df_completo[col_centro] == 'nan')
+            mask_valor_vazio = (df_completo[col_valor].isna()) | (df_completo[col_valor] == '') | (df_completo[col_valor] == 0)
+            if i == 1:
+                mask_ambos_vazios = mask_centro_vazio & mask_valor_vazio & (~linhas_com_valor_preenchido)
+                if mask_ambos_vazios.sum() > 0:
+                    df_completo.loc[mask_ambos_vazios, col_centro] = 'Sem Centro de Custo'
+                    df_completo.loc[mask_ambos_vazios, col_valor] = df_completo.loc[mask_ambos_vazios, 'paid']
+                    linhas_com_valor_preenchido = linhas_com_valor_preenchido | mask_ambos_vazios
+            mask_so_centro_vazio = mask_centro_vazio & (~mask_valor_vazio)
+            if mask_so_centro_vazio.sum() > 0:
+                df_completo.loc[mask_so_centro_vazio, col_centro] = 'Sem Centro de Custo'
+    return df_completo
+
+
+def limpeza_e_gravacao(df):
+    """Limpeza atual + formatação das datas que o A6 faz na gravação"""
+    return formatar_para_gravacao(limpar_consolidado(df))
+
+
+def celulas_gravadas(df):
+    """Células enviadas ao Sheets, sem depender do dtype de cada coluna"""
+    return valores_celula(df.reset_index(drop=True))
+
+
+def cronometrar(funcao, df):
+    inicio = time.perf_counter()
+    resultado = funcao(df.copy())
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for n in args.linhas:
+        df = gerar_consolidado(n)
+        print(f"\n📦 {n:,} linhas")
+        tempo_antes, antes = cronometrar(limpeza_original, df)
+        tempo_depois, depois = cronometrar(limpeza_e_gravacao, df)
+        # As datas antigas saíam como str; as novas, como object (mesmos textos e vazios)
+        pd.testing.assert_frame_equal(antes, depois, check_dtype=False)
+        gravado = celulas_gravadas(antes)
+        pd.testing.assert_frame_equal(gravado, celulas_gravadas(depois))
+        # Caminho do artefato: datas, valores e categorias já tipados antes da limpeza
+        tipado = limpeza_e_gravacao(aplicar_esquema(df.copy()))
+        pd.testing.assert_frame_equal(gravado, celulas_gravadas(tipado))
+        print(f"  antes  {tempo_antes:8.2f}s")
+        print(f"  depois {tempo_depois:8.2f}s  ({tempo_antes / tempo_depois:.1f}x, células gravadas idênticas)")
+
+
+if __name__ == "__main__":
+    main()
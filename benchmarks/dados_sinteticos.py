@@ -0,0 +1,177 @@
+import random
+from io import BytesIO
+from datetime import date, timedelta
+
+from openpyxl import Workbook
+
+# Situação exibida pelo Conta Azul para cada status da exportação
+situacao_por_status = {
+    "ACQUITTED": "Quitado",
+    "CONCILIATED": "Conciliado",
+    "PARTIAL": "Parcial",
+    "PENDING": "Em aberto",
+    "OVERDUE": "Atrasado",
+    "LOST": "Perdido",
+    "RENEGOTIATED": "Renegociado",
+}
+
+categorias = ["Aluguel", "Salários", "Impostos", "Fornecedores", "Serviços", "Vendas", "Marketing", "Energia"]
+centros = ["Administrativo", "Comercial", "Operações", "TI", "Financeiro"]
+nomes = [f"Cliente/Fornecedor {i}" for i in range(500)]
+
+
+def gerar_linhas(n_linhas, status="ACQUITTED", n_centros=3, seed=42, id_inicial=0):
+    """Gera linhas no layout da exportação financial-statement-view (cabeçalho + registros)"""
+    rnd = random.Random(seed)
+    inicio = date(2019, 1, 1)
+
+    cabecalho = ["id", "Data original de vencimento", "Data de competência", "Data movimento",
+                 "Valor (R$)", "Categoria 1", "Descrição", "Nome do fornecedor/cliente", "Situação"]
+    for i in range(1, n_centros + 1):
+        cabecalho += [f"Centro de Custo {i}", f"Valor no Centro de Custo {i}"]
+    yield cabecalho
+
+    situacao = situacao_por_status.get(status, "Em aberto")
+    for i in range(n_linhas):
+        vencimento = inicio + timedelta(days=rnd.randint(0, 2500))
+        valor = round(rnd.uniform(10, 50000), 2)
+        pago = situacao in ("Quitado", "Conciliado", "Parcial")
+        linha = [
+            f"{status[:3]}-{id_inicial + i:09d}",
+            vencimento,
+            vencimento - timedelta(days=rnd.randint(0, 30)),
+            vencimento + timedelta(days=rnd.randint(-5, 20)) if pago else None,
+            valor,
+            rnd.choice(categorias),
+            f"Lançamento {id_inicial + i}",
+            rnd.choice(nomes),
+            situacao,
+        ]
+        # Quantidade variável de centros de custo preenchidos por linha
+        preenchidos = rnd.randint(0, n_centros)
+        restante = valor
+        for c in range(1, n_centros + 1):
+            if c <= preenchidos:
+                parte = restante if c == preenchidos else round(restante * rnd.uniform(0.2, 0.8), 2)
+                restante = round(restante - parte, 2)
+                linha += [rnd.choice(centros), parte]
+            else:
+                linha += [None, None]
+        yield linha
+
+
+def gerar_xlsx(n_linhas, status="ACQUITTED", n_centros=3, seed=42, id_inicial=0):
+    """Bytes de um XLSX sintético com ``n_linhas`` registros"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Exportação")
+    for linha in gerar_linhas(n_linhas, status, n_centros, seed, id_inicial):
+        sheet.append(linha)
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def gerar_consolidado(n_linhas, n_centros=3, seed=42):
+    """DataFrame no formato lido pelo A6 (contas a pagar + receber já publicadas no Sheets)"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    inicio = np.datetime64("2019-01-01")
+    vencimento = inicio + rng.integers(0, 2500, n_linhas).astype("timedelta64[D]")
+    pago = rng.random(n_linhas) < 0.6
+
+    def texto_data(datas, vazios=None):
+        serie = pd.Series(pd.to_datetime(datas).strftime("%d/%m/%Y"))
+        return serie.where(~vazios, np.nan) if vazios is not None else serie
+
+    valor = np.round(rng.uniform(10, 50000, n_linhas), 2)
+    movimento = vencimento + rng.integers(-5, 20, n_linhas).astype("timedelta64[D]")
+    df = pd.DataFrame({
+        "id": [f"id-{i:09d}" for i in range(n_linhas)],
+        "status": rng.choice(list(situacao_por_status), n_linhas),
+        "dueDate": texto_data(vencimento),
+        "financialEvent.competenceDate": texto_data(vencimento - rng.integers(0, 30, n_linhas).astype("timedelta64[D]")),
+        # Gravada em dd/mm/aaaa pelo A1/A2 e repassada como está pelo A6
+        "Data movimento": texto_data(movimento, ~pago),
+        "lastAcquittanceDate": texto_data(movimento, ~pago),
+        "paid": valor,
+        # Parte dos rateios vem maior que o total pago (corrigido no A6)
+        "categoriesRatio.value": np.where(rng.random(n_linhas) < 0.1, valor * 1.5, valor),
+        "categoriesRatio.category": rng.choice(categorias, n_linhas),
+        "description": [f"Lançamento {i}" for i in range(n_linhas)],
+        "financialEvent.negotiator.name": rng.choice(nomes, n_linhas),
+        "tipo": rng.choice(["Receita", "Despesa"], n_linhas),
+    })
+
+    preenchidos = rng.integers(0, n_centros + 1, n_linhas)
+    for c in range(1, n_centros + 1):
+        ativo = preenchidos >= c
+        df[f"Centro de Custo {c}"] = pd.Series(rng.choice(centros, n_linhas)).where(ativo, np.nan)
+        df[f"Valor no Centro de Custo {c}"] = pd.Series(np.round(valor / np.maximum(preenchidos, 1), 2)).where(ativo, np.nan)
+    return df
+
+
+def gerar_transacoes_ia(n_linhas, ano=2026, seed=42):
+    """DataFrame tipado com as colunas lidas pelo IA.py, todas no ``ano`` informado"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    inicio = np.datetime64(f"{ano}-01-01")
+    quitacao = inicio + rng.integers(0, 365, n_linhas).astype("timedelta64[D]")
+    valor = np.round(rng.uniform(10, 50000, n_linhas), 2)
+    # Alguns valores ausentes, como linhas sem 'paid' na planilha
+    valor[rng.random(n_linhas) < 0.01] = np.nan
+    return pd.DataFrame({
+        "paid": valor,
+        "tipo": rng.choice(["Receita", "Despesa"], n_linhas),
+        "status": rng.choice(list(situacao_por_status), n_linhas),
+        "lastAcquittanceDate": pd.to_datetime(quitacao),
+        "dueDate": pd.to_datetime(quitacao - rng.integers(-20, 40, n_linhas).astype("timedelta64[D]")),
+        "categoriesRatio.category": pd.Series(rng.choice(categorias, n_linhas)).where(rng.random(n_linhas) > 0.02),
+    })
+
+
+# Participação de cada status no total de lançamentos de um tipo
+proporcao_por_status = {
+    "ACQUITTED": 0.50,
+    "CONCILIATED": 0.15,
+    "PENDING": 0.15,
+    "OVERDUE": 0.10,
+    "PARTIAL": 0.04,
+    "LOST": 0.03,
+    "RENEGOTIATED": 0.03,
+}
+
+# Faixa de ids de cada tipo (os ids não se repetem entre contas a pagar e a receber)
+id_base_por_tipo = {"EXPENSE": 0, "REVENUE": 500_000_000}
+
+
+def gerar_exportacoes(n_linhas, n_centros=3, seed=42, pasta=None):
+    """Exportações XLSX por (tipo, status) somando ``n_linhas`` lançamentos (metade para cada tipo).
+
+    Gerar XLSX grandes é lento; com ``pasta`` os bytes ficam salvos em disco e
+    são reaproveitados nas próximas execuções com os mesmos parâmetros.
+    """
+    import os
+
+    exportacoes = {}
+    for tipo, id_base in id_base_por_tipo.items():
+        id_inicial = id_base
+        for i, (status, proporcao) in enumerate(proporcao_por_status.items()):
+            n = max(1, int(n_linhas / 2 * proporcao))
+            caminho = os.path.join(pasta, f"{n_linhas}_{n_centros}_{seed}_{tipo}_{status}.xlsx") if pasta else None
+            if caminho and os.path.exists(caminho):
+                with open(caminho, "rb") as f:
+                    conteudo = f.read()
+            else:
+                conteudo = gerar_xlsx(n, status, n_centros, seed=seed + i + id_base, id_inicial=id_inicial)
+                if caminho:
+                    os.makedirs(pasta, exist_ok=True)
+                    with open(f"{caminho}.tmp", "wb") as f:
+                        f.write(conteudo)
+                    os.replace(f"{caminho}.tmp", caminho)
+            exportacoes[(tipo, status)] = conteudo
+            id_inicial += n
+    return exportacoes
@@ -0,0 +1,49 @@
+"""Executa o Update_contas.py com Conta Azul e Google redirecionados para o servidor local.
+
+Uso (normalmente chamado pelo benchmarks.bench_pipeline):
+    python -m benchmarks.pipeline_local http://127.0.0.1:PORTA
+"""
+import sys
+import runpy
+from urllib.parse import urlsplit
+
+import httplib2
+import requests
+
+# Hosts externos usados pelo pipeline (Conta Azul, token OAuth, Drive e Sheets)
+hosts_redirecionados = {
+    "services.contaazul.com",
+    "oauth2.googleapis.com",
+    "accounts.google.com",
+    "www.googleapis.com",
+    "sheets.googleapis.com",
+}
+
+
+def redirecionar(url_local):
+    """Reescreve as URLs dos hosts externos para ``url_local`` no requests e no httplib2"""
+    raiz = url_local.rstrip("/")
+
+    def reescrever(url):
+        partes = urlsplit(url)
+        if partes.hostname in hosts_redirecionados:
+            return f"{raiz}{partes.path}{'?' + partes.query if partes.query else ''}"
+        return url
+
+    request_original = requests.Session.request
+    http_original = httplib2.Http.request
+
+    def request_local(self, method, url, *args, **kwargs):
+        return request_original(self, method, reescrever(url), *args, **kwargs)
+
+    def http_local(self, uri, *args, **kwargs):
+        return http_original(self, reescrever(uri), *args, **kwargs)
+
+    requests.Session.request = request_local
+    httplib2.Http.request = http_local
+
+
+if __name__ == "__main__":
+    redirecionar(sys.argv[1])
+    sys.argv = ["Update_contas.py"]
+    runpy.run_path("Update_contas.py", run_name="__main__")
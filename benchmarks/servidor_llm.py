@@ -0,0 +1,82 @@
+"""Servidor local compatível com o endpoint /chat/completions da OpenAI/DeepSeek.
+
+Responde com um texto fixo no formato que o IA.py espera (blocos "####" com
+título em negrito) após uma latência simulada, e conta quantas chamadas recebeu.
+
+Uso: python -m benchmarks.servidor_llm [--porta 8766] [--latencia 2.0]
+     DEEPSEEK_BASE_URL=http://127.0.0.1:8766 DEEPSEEK_API_KEY=local python IA.py
+"""
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+resposta_padrao = (
+    "#### **Insights** Receitas estáveis no trimestre.\n"
+    "#### **Sinais de alerta** Despesas vencidas em crescimento.\n"
+    "#### **Resumo executivo** Saúde financeira adequada."
+)
+
+
+class ServidorLLM(ThreadingHTTPServer):
+    def __init__(self, endereco, latencia=0.0, resposta=resposta_padrao):
+        super().__init__(endereco, _Handler)
+        self.latencia = latencia
+        self.resposta = resposta
+        self.chamadas = 0
+        self._trava = threading.Lock()
+
+    @property
+    def url(self):
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        pedido = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with self.server._trava:
+            self.server.chamadas += 1
+        time.sleep(self.server.latencia)
+
+        corpo = json.dumps({
+            "id": f"local-{self.server.chamadas}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": pedido.get("model", "deepseek-chat"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.server.resposta},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def iniciar_servidor(porta=0, latencia=0.0):
+    """Sobe o servidor numa thread e devolve a instância (``servidor.url``, ``servidor.chamadas``)"""
+    servidor = ServidorLLM(("127.0.0.1", porta), latencia=latencia)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--porta", type=int, default=8766)
+    parser.add_argument("--latencia", type=float, default=2.0)
+    args = parser.parse_args()
+    servidor = ServidorLLM(("127.0.0.1", args.porta), latencia=args.latencia)
+    print(f"🤖 Servidor LLM local em {servidor.url}")
+    servidor.serve_forever()
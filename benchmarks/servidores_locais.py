@@ -0,0 +1,307 @@
+"""Servidor local que responde no lugar do Conta Azul e das APIs do Google (token, Drive e Sheets v4).
+
+Atende só o que o pipeline usa: exportação XLSX por tipo/status, token da
+service account, busca de planilha por nome no Drive e as chamadas de
+metadados, leitura, escrita e limpeza do Sheets (googleapiclient e gspread).
+Para caber na memória com milhões de linhas, cada aba guarda apenas o
+cabeçalho, a primeira coluna e contadores do que foi gravado; com
+``valores_completos=True`` guarda todas as células (para testar leituras).
+"""
+import re
+import json
+import time
+import threading
+from urllib.parse import urlsplit, parse_qs, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _numero_coluna(letras):
+    numero = 0
+    for letra in letras:
+        numero = numero * 26 + ord(letra) - 64
+    return numero
+
+
+def _intervalo(a1):
+    """Intervalo A1 → (aba, linha inicial, linha final, coluna inicial); ``'Aba'!A2:K100`` ou só ``'Aba'``"""
+    titulo, _, celulas = a1.rpartition("!") if "!" in a1 else (a1, "", "")
+    titulo = titulo.strip("'").replace("''", "'")
+    m = re.match(r"([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?$", celulas)
+    if not celulas or not m:
+        return titulo, 1, None, 1
+    coluna, linha, _, linha_final = m.groups()
+    linha = int(linha) if linha else 1
+    return titulo, linha, int(linha_final) if linha_final else None, _numero_coluna(coluna or "A")
+
+
+class Aba:
+    def __init__(self, sheet_id, titulo, indice, linhas=1000, colunas=26, valores_completos=False):
+        self.propriedades = {
+            "sheetId": sheet_id, "title": titulo, "index": indice, "sheetType": "GRID",
+            "gridProperties": {"rowCount": linhas, "columnCount": colunas},
+        }
+        self.cabecalho = []
+        self.primeira_coluna = {}
+        # Linha → lista de células (só com valores_completos)
+        self.linhas = {} if valores_completos else None
+        self.celulas_gravadas = 0
+        self.ultima_linha = 0
+
+    def gravar(self, linha, coluna, valores):
+        for deslocamento, valores_linha in enumerate(valores):
+            numero = linha + deslocamento
+            if numero == 1 and coluna == 1:
+                self.cabecalho = list(valores_linha)
+            if coluna == 1 and valores_linha:
+                self.primeira_coluna[numero] = valores_linha[0]
+            if self.linhas is not None:
+                atual = self.linhas.setdefault(numero, [])
+                atual.extend([""] * (coluna - 1 + len(valores_linha) - len(atual)))
+                atual[coluna - 1:coluna - 1 + len(valores_linha)] = valores_linha
+            self.celulas_gravadas += len(valores_linha)
+            self.ultima_linha = max(self.ultima_linha, numero)
+
+    def inserir_colunas(self, posicao, quantidade):
+        """insertDimension: desloca para a direita as células a partir da coluna ``posicao`` (base 0)"""
+        self.propriedades["gridProperties"]["columnCount"] += quantidade
+        for celulas in [self.cabecalho] + list((self.linhas or {}).values()):
+            if len(celulas) > posicao:
+                celulas[posicao:posicao] = [""] * quantidade
+
+    def limpar(self, linha=1, linha_final=None):
+        if linha <= 1 and linha_final is None:
+            self.cabecalho, self.primeira_coluna, self.ultima_linha = [], {}, 0
+            if self.linhas is not None:
+                self.linhas = {}
+            return
+        linha_final = linha_final or self.ultima_linha
+        for numero in range(linha, linha_final + 1):
+            self.primeira_coluna.pop(numero, None)
+            if self.linhas is not None:
+                self.linhas.pop(numero, None)
+        if linha <= 1:
+            self.cabecalho = []
+
+    def ler(self, linha, linha_final, coluna, colunas=False):
+        """Linhas do intervalo (ou colunas, com ``colunas=True``), sem as células vazias do fim"""
+        linha_final = min(linha_final or self.ultima_linha, self.ultima_linha)
+        if self.linhas is not None:
+            linhas = [[str(v) if v is not None else "" for v in self.linhas.get(n, [])][coluna - 1:]
+                      for n in range(linha, linha_final + 1)]
+        elif linha == 1 and linha_final == 1:
+            linhas = [self.cabecalho] if self.cabecalho else []
+        elif coluna != 1:
+            linhas = []
+        else:
+            linhas = [[self.primeira_coluna[n]] if n in self.primeira_coluna else [] for n in range(linha, linha_final + 1)]
+        while linhas and not any(linhas[-1]):
+            linhas.pop()
+        if not colunas:
+            return [self._aparar(valores) for valores in linhas]
+        largura = max((len(valores) for valores in linhas), default=0)
+        return [self._aparar([valores[c] if c < len(valores) else "" for valores in linhas]) for c in range(largura)]
+
+    @staticmethod
+    def _aparar(celulas):
+        fim = len(celulas)
+        while fim and celulas[fim - 1] in ("", None):
+            fim -= 1
+        return list(celulas[:fim])
+
+
+class Planilha:
+    def __init__(self, spreadsheet_id, valores_completos=False):
+        self.id = spreadsheet_id
+        self.valores_completos = valores_completos
+        self.abas = [Aba(0, "Página1", 0, valores_completos=valores_completos)]
+
+    def aba(self, titulo=None):
+        if titulo is None:
+            return self.abas[0]
+        return next((a for a in self.abas if a.propriedades["title"] == titulo), self.abas[0])
+
+    def metadados(self):
+        return {
+            "spreadsheetId": self.id,
+            "properties": {"title": self.id, "locale": "pt_BR", "timeZone": "America/Sao_Paulo"},
+            "sheets": [{"properties": a.propriedades} for a in self.abas],
+        }
+
+    def aplicar(self, pedido):
+        """Um item de spreadsheets.batchUpdate; devolve a resposta correspondente"""
+        if "addSheet" in pedido:
+            propriedades = pedido["addSheet"].get("properties", {})
+            grade = propriedades.get("gridProperties", {})
+            aba = Aba(len(self.abas), propriedades.get("title", f"Aba{len(self.abas)}"), len(self.abas),
+                      grade.get("rowCount", 1000), grade.get("columnCount", 26), self.valores_completos)
+            self.abas.append(aba)
+            return {"addSheet": {"properties": aba.propriedades}}
+        if "appendDimension" in pedido:
+            item = pedido["appendDimension"]
+            grade = self._por_id(item["sheetId"]).propriedades["gridProperties"]
+            chave = "rowCount" if item["dimension"] == "ROWS" else "columnCount"
+            grade[chave] += item["length"]
+        elif "insertDimension" in pedido:
+            intervalo = pedido["insertDimension"]["range"]
+            aba = self._por_id(intervalo["sheetId"])
+            quantidade = intervalo["endIndex"] - intervalo["startIndex"]
+            if intervalo["dimension"] == "COLUMNS":
+                aba.inserir_colunas(intervalo["startIndex"], quantidade)
+            else:
+                aba.propriedades["gridProperties"]["rowCount"] += quantidade
+        elif "updateSheetProperties" in pedido:
+            propriedades = pedido["updateSheetProperties"]["properties"]
+            grade = self._por_id(propriedades["sheetId"]).propriedades["gridProperties"]
+            grade.update(propriedades.get("gridProperties", {}))
+        elif "repeatCell" in pedido:
+            self._por_id(pedido["repeatCell"]["range"]["sheetId"]).limpar()
+        return {}
+
+    def _por_id(self, sheet_id):
+        return next(a for a in self.abas if a.propriedades["sheetId"] == sheet_id)
+
+
+class ServidorLocal(ThreadingHTTPServer):
+    """Estado compartilhado das APIs simuladas; ``url`` é a raiz usada no redirecionamento"""
+
+    daemon_threads = True
+
+    def __init__(self, exportacoes, porta=0, latencia=0.0, valores_completos=False):
+        super().__init__(("127.0.0.1", porta), _Handler)
+        self.exportacoes = exportacoes
+        self.latencia = latencia
+        self.valores_completos = valores_completos
+        self.planilhas = {}
+        self.chamadas = {}
+        self.bytes_recebidos = 0
+        self.trava = threading.Lock()
+
+    @property
+    def url(self):
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def planilha(self, spreadsheet_id):
+        with self.trava:
+            if spreadsheet_id not in self.planilhas:
+                self.planilhas[spreadsheet_id] = Planilha(spreadsheet_id, self.valores_completos)
+            return self.planilhas[spreadsheet_id]
+
+    def contar(self, api, tamanho):
+        with self.trava:
+            self.chamadas[api] = self.chamadas.get(api, 0) + 1
+            self.bytes_recebidos += tamanho
+
+    def resumo(self):
+        """Linhas gravadas por aba (para conferir o resultado do pipeline)"""
+        return {
+            f"{p.id}/{a.propriedades['title']}": a.ultima_linha
+            for p in self.planilhas.values() for a in p.abas if a.ultima_linha
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, corpo, status=200, tipo="application/json"):
+        if not isinstance(corpo, bytes):
+            corpo = json.dumps(corpo).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _corpo(self):
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(tamanho) if tamanho else b""
+
+    def do_GET(self):
+        self._tratar("GET")
+
+    def do_POST(self):
+        self._tratar("POST")
+
+    def do_PUT(self):
+        self._tratar("PUT")
+
+    def _tratar(self, metodo):
+        corpo = self._corpo()
+        partes = urlsplit(self.path)
+        caminho, consulta = unquote(partes.path), parse_qs(partes.query)
+        servidor = self.server
+        time.sleep(servidor.latencia)
+
+        if caminho.endswith("/token"):
+            servidor.contar("token", len(corpo))
+            return self._responder({"access_token": "local", "expires_in": 3600, "token_type": "Bearer"})
+
+        if caminho.endswith("/financial-statement-view/export"):
+            servidor.contar("contaazul", len(corpo))
+            pedido = json.loads(corpo)
+            conteudo = servidor.exportacoes.get((pedido["type"][0], pedido["status"][0]))
+            if conteudo is None:
+                return self._responder({"error": "not found"}, 404)
+            return self._responder(conteudo, tipo="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+        if caminho.startswith("/drive/v3/files"):
+            servidor.contar("drive", len(corpo))
+            nome = re.search(r"name='([^']+)'", consulta.get("q", [""])[0])
+            nome = nome.group(1) if nome else "planilha"
+            servidor.planilha(nome)
+            return self._responder({"files": [{"id": nome, "name": nome}]})
+
+        m = re.match(r"/v4/spreadsheets/([^/:]+)(.*)$", caminho)
+        if m:
+            servidor.contar("sheets", len(corpo))
+            return self._responder(self._sheets(servidor.planilha(m.group(1)), m.group(2), metodo,
+                                                json.loads(corpo) if corpo else {}, consulta))
+
+        self._responder({"error": f"rota não simulada: {metodo} {caminho}"}, 404)
+
+    def _sheets(self, planilha, resto, metodo, corpo, consulta):
+        with self.server.trava:
+            if resto == "":
+                return planilha.metadados()
+            if resto == ":batchUpdate":
+                return {"spreadsheetId": planilha.id, "replies": [planilha.aplicar(p) for p in corpo.get("requests", [])]}
+            if resto == "/values:batchUpdate":
+                for item in corpo.get("data", []):
+                    titulo, linha, _, coluna = _intervalo(item["range"])
+                    planilha.aba(titulo).gravar(linha, coluna, item.get("values", []))
+                return {"spreadsheetId": planilha.id}
+            if resto == "/values:batchClear":
+                for intervalo in corpo.get("ranges", []):
+                    titulo, linha, linha_final, _ = _intervalo(intervalo)
+                    planilha.aba(titulo).limpar(linha, linha_final)
+                return {"spreadsheetId": planilha.id}
+            if resto == "/values:batchGet":
+                faixas = []
+                colunas = consulta.get("majorDimension", ["ROWS"])[0] == "COLUMNS"
+                for intervalo in consulta.get("ranges", []):
+                    titulo, linha, linha_final, coluna = _intervalo(intervalo)
+                    faixas.append({"range": intervalo, "majorDimension": "COLUMNS" if colunas else "ROWS",
+                                   "values": planilha.aba(titulo).ler(linha, linha_final, coluna, colunas)})
+                return {"spreadsheetId": planilha.id, "valueRanges": faixas}
+            m = re.match(r"/values/(.+?)(:clear)?$", resto)
+            if m:
+                titulo, linha, linha_final, coluna = _intervalo(m.group(1))
+                aba = planilha.aba(titulo)
+                if m.group(2):
+                    aba.limpar(linha, linha_final)
+                    return {"spreadsheetId": planilha.id, "clearedRange": m.group(1)}
+                if metodo == "PUT":
+                    aba.gravar(linha, coluna, corpo.get("values", []))
+                    return {"spreadsheetId": planilha.id}
+                return {"range": m.group(1), "majorDimension": "ROWS", "values": aba.ler(linha, linha_final, coluna)}
+        return {}
+
+
+def iniciar_servidor(exportacoes, porta=0, latencia=0.0, valores_completos=False):
+    """Sobe o servidor numa thread e devolve a instância"""
+    servidor = ServidorLocal(exportacoes, porta, latencia, valores_completos)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
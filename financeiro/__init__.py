@@ -0,0 +1 @@
+"""Módulos compartilhados pelos scripts de atualização financeira (Conta Azul → Google)."""
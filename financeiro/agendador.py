@@ -0,0 +1,191 @@
+"""Modo contínuo: roda as atualizações diárias e o IA semanal a partir de uma agenda interna.
+
+O processo fica de pé entre as execuções, então pandas, clientes Google
+autenticados e caches em memória são carregados uma vez só (na primeira
+tarefa que precisar deles). O estado fica em ``.cache/agendador/status.json``.
+
+Uso: python -m financeiro.agendador                  # roda a agenda
+     python -m financeiro.agendador --agora atualizacao
+     python -m financeiro.agendador --verificar      # saúde (código de saída 0/1)
+"""
+import os
+import sys
+import time
+import runpy
+import signal
+import argparse
+import importlib
+import threading
+import traceback
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from financeiro.armazenamento import caminho_cache, ler_json, salvar_json
+
+# ===================== Configurações =====================
+FUSO = ZoneInfo(os.getenv("AGENDADOR_FUSO", "America/Sao_Paulo"))
+# Mesmos horários do workflow (06h, 12h, 16h e 19h BRT; IA às sextas 20h BRT)
+AGENDA_ATUALIZACAO = os.getenv("AGENDADOR_ATUALIZACAO", "06:00,12:00,16:00,19:00")
+AGENDA_IA = os.getenv("AGENDADOR_IA", "sex 20:00")
+BATIMENTO_S = int(os.getenv("AGENDADOR_BATIMENTO_S", "60"))
+
+dias_semana = {"seg": 0, "ter": 1, "qua": 2, "qui": 3, "sex": 4, "sab": 5, "dom": 6}
+
+
+def ler_agenda(texto):
+    """"06:00,12:00" ou "sex 20:00" → lista de (dia da semana ou None, hora, minuto)"""
+    horarios = []
+    for item in texto.split(","):
+        partes = item.strip().split()
+        dia = dias_semana[partes[0].lower()[:3]] if len(partes) == 2 else None
+        hora, minuto = map(int, partes[-1].split(":"))
+        horarios.append((dia, hora, minuto))
+    return horarios
+
+
+def proxima_execucao(horarios, depois):
+    """Primeiro horário da agenda estritamente depois de ``depois``"""
+    candidatos = []
+    for dia, hora, minuto in horarios:
+        for deslocamento in range(8):
+            data = (depois + timedelta(days=deslocamento)).date()
+            if dia is not None and data.weekday() != dia:
+                continue
+            quando = datetime(data.year, data.month, data.day, hora, minuto, tzinfo=FUSO)
+            if quando > depois:
+                candidatos.append(quando)
+                break
+    return min(candidatos)
+
+
+# ===================== Tarefas =====================
+def atualizar_contas():
+    # Importado na primeira execução e mantido em memória nas seguintes
+    update_contas = importlib.import_module("Update_contas")
+    falhas = update_contas.executar_scripts()
+    if falhas:
+        raise RuntimeError(f"Etapas com erro: {', '.join(falhas)}")
+
+
+def gerar_insights():
+    runpy.run_path("IA.py", run_name="__main__")
+
+
+tarefas = {
+    "atualizacao": (atualizar_contas, AGENDA_ATUALIZACAO),
+    "ia": (gerar_insights, AGENDA_IA),
+}
+
+
+# ===================== Estado =====================
+def _caminho_status():
+    return caminho_cache("agendador", "status.json")
+
+
+def executar_tarefa(nome, estado):
+    """Executa uma tarefa registrando início, fim e erro no estado"""
+    from financeiro.metricas import nova_execucao
+
+    funcao, _ = tarefas[nome]
+    execucao = nova_execucao(nome)
+    inicio = datetime.now(FUSO)
+    estado["em_execucao"] = nome
+    salvar_json(_caminho_status(), estado)
+    print(f"\n⏰ [{inicio:%d/%m %H:%M}] Iniciando tarefa '{nome}' ({execucao})")
+
+    erro = None
+    relogio = time.perf_counter()
+    try:
+        funcao()
+    except Exception as e:
+        erro = f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+
+    duracao = time.perf_counter() - relogio
+    estado["em_execucao"] = None
+    estado["ultimas"][nome] = {
+        "execucao": execucao,
+        "inicio": inicio.isoformat(timespec="seconds"),
+        "duracao_s": round(duracao, 1),
+        "sucesso": erro is None,
+        "erro": erro,
+    }
+    print(f"{'✅' if erro is None else '❌'} Tarefa '{nome}' concluída em {duracao:.0f}s")
+    return erro is None
+
+
+def rodar(parar=None):
+    """Laço principal: dorme até o próximo horário, executa e grava o batimento"""
+    parar = parar or threading.Event()
+    agendas = {nome: ler_agenda(agenda) for nome, (_, agenda) in tarefas.items()}
+    agora = datetime.now(FUSO)
+    proximas = {nome: proxima_execucao(agenda, agora) for nome, agenda in agendas.items()}
+    estado = {
+        "pid": os.getpid(),
+        "iniciado_em": agora.isoformat(timespec="seconds"),
+        "em_execucao": None,
+        "ultimas": (ler_json(_caminho_status(), {}) or {}).get("ultimas", {}),
+    }
+    print(f"🗓️ Agendador iniciado (pid {os.getpid()}); próximas: "
+          + ", ".join(f"{n} {q:%d/%m %H:%M}" for n, q in proximas.items()))
+
+    while not parar.is_set():
+        for nome in sorted(proximas, key=proximas.get):
+            if proximas[nome] <= datetime.now(FUSO) and not parar.is_set():
+                executar_tarefa(nome, estado)
+                # Horários perdidos durante uma execução longa não são recuperados
+                proximas[nome] = proxima_execucao(agendas[nome], datetime.now(FUSO))
+
+        estado["batimento"] = datetime.now(FUSO).isoformat(timespec="seconds")
+        estado["proximas"] = {n: q.isoformat(timespec="minutes") for n, q in proximas.items()}
+        salvar_json(_caminho_status(), estado)
+
+        falta = (min(proximas.values()) - datetime.now(FUSO)).total_seconds()
+        parar.wait(max(1, min(BATIMENTO_S, falta)))
+
+    print("🛑 Agendador encerrado")
+
+
+def verificar(max_atraso_s=None):
+    """Saudável se o último batimento é recente e nenhuma tarefa terminou com erro"""
+    max_atraso_s = max_atraso_s or BATIMENTO_S * 3
+    estado = ler_json(_caminho_status())
+    if not estado or "batimento" not in estado:
+        print("❌ Agendador sem status")
+        return False
+    atraso = (datetime.now(FUSO) - datetime.fromisoformat(estado["batimento"])).total_seconds()
+    falhas = [nome for nome, ultima in estado.get("ultimas", {}).items() if not ultima["sucesso"]]
+    # Durante uma tarefa longa o batimento para; o status mostra qual está rodando
+    if atraso > max_atraso_s and not estado.get("em_execucao"):
+        print(f"❌ Último batimento há {atraso:.0f}s")
+        return False
+    if falhas:
+        print(f"⚠️ Última execução com erro: {', '.join(falhas)}")
+        return False
+    print(f"✅ Agendador ativo (pid {estado['pid']}), próximas: {estado.get('proximas')}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agora", choices=list(tarefas), help="executa a tarefa imediatamente e sai")
+    parser.add_argument("--verificar", action="store_true", help="confere o status (para healthcheck)")
+    args = parser.parse_args()
+
+    # Os scripts (Update_contas.py, A*.py, IA.py) ficam na raiz do repositório
+    sys.path.insert(0, os.getcwd())
+
+    if args.verificar:
+        sys.exit(0 if verificar() else 1)
+    if args.agora:
+        estado = {"pid": os.getpid(), "em_execucao": None, "ultimas": {}}
+        sys.exit(0 if executar_tarefa(args.agora, estado) else 1)
+
+    parar = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: parar.set())
+    signal.signal(signal.SIGINT, lambda *_: parar.set())
+    rodar(parar)
+
+
+if __name__ == "__main__":
+    main()
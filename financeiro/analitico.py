@@ -0,0 +1,59 @@
+import os
+import shutil
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from financeiro.armazenamento import CACHE_DIR, caminho_cache, ler_json, salvar_json, compativel_com_arrow
+from financeiro.datas import FORMATO_ISO, converter_datas
+
+# ===================== Configurações =====================
+# Base analítica local particionada por ano/mês de lastAcquittanceDate (lida pelo IA.py)
+PASTA_BASE = os.path.join(CACHE_DIR, "analitico", "financeiro")
+ANALITICO_MAX_HORAS = float(os.getenv("ANALITICO_MAX_HORAS", "36"))
+
+colunas_data = ['lastAcquittanceDate', 'financialEvent.competenceDate', 'dueDate']
+coluna_particao = 'lastAcquittanceDate'
+
+
+def _caminho_meta():
+    return caminho_cache("analitico", "financeiro.json")
+
+
+def atualizar_base_analitica(df_completo):
+    """Regrava a base particionada (ano=/mes=) a partir do consolidado do A6"""
+    df = compativel_com_arrow(df_completo)
+    for campo in colunas_data:
+        if campo in df.columns:
+            df[campo] = converter_datas(df[campo], FORMATO_ISO)
+    if 'paid' in df.columns:
+        df['paid'] = pd.to_numeric(df['paid'], errors='coerce')
+
+    df['ano'] = df[coluna_particao].dt.year.fillna(0).astype('int32')
+    df['mes'] = df[coluna_particao].dt.month.fillna(0).astype('int32')
+
+    # Grava numa pasta temporária e troca no final para nunca deixar a base pela metade
+    temporaria = f"{PASTA_BASE}.tmp"
+    shutil.rmtree(temporaria, ignore_errors=True)
+    df.to_parquet(temporaria, partition_cols=['ano', 'mes'], index=False)
+    shutil.rmtree(PASTA_BASE, ignore_errors=True)
+    os.replace(temporaria, PASTA_BASE)
+
+    salvar_json(_caminho_meta(), {"gerado_em": datetime.now().isoformat(), "linhas": len(df)})
+    print(f"  ✅ Base analítica atualizada: {len(df)} registros em {df[['ano', 'mes']].drop_duplicates().shape[0]} partições")
+
+
+def ler_base_analitica(colunas, ano, max_horas=None):
+    """Lê só as partições do ``ano`` e só as ``colunas`` pedidas; ``None`` se a base não existir ou estiver velha"""
+    max_horas = ANALITICO_MAX_HORAS if max_horas is None else max_horas
+    metadados = ler_json(_caminho_meta())
+    if not metadados or not os.path.isdir(PASTA_BASE):
+        return None
+
+    idade = datetime.now() - datetime.fromisoformat(metadados["gerado_em"])
+    if idade > timedelta(hours=max_horas):
+        print(f"  ⚠️ Base analítica desatualizada ({idade.total_seconds() / 3600:.0f}h)")
+        return None
+
+    df = pd.read_parquet(PASTA_BASE, columns=list(colunas), filters=[("ano", "=", int(ano))])
+    return df
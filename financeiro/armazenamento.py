@@ -0,0 +1,77 @@
+import os
+import json
+import tempfile
+
+# Diretório de estado local (restaurado entre execuções pelo actions/cache no workflow)
+CACHE_DIR = os.getenv("FINANCEIRO_CACHE_DIR", ".cache")
+
+
+def caminho_cache(*partes):
+    """Caminho dentro do diretório de cache, criando as pastas necessárias"""
+    caminho = os.path.join(CACHE_DIR, *partes)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    return caminho
+
+
+def ler_json(caminho, padrao=None):
+    if not os.path.exists(caminho):
+        return padrao
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _temporario(caminho):
+    """Arquivo temporário único ao lado de ``caminho`` (duas threads gravando o mesmo arquivo não se atropelam)"""
+    descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho) or ".",
+                                             prefix=f"{os.path.basename(caminho)}.", suffix=".tmp")
+    os.close(descritor)
+    return temporario
+
+
+def _publicar(temporario, caminho, gravar):
+    """Grava no ``temporario`` e o renomeia para ``caminho``; em erro, remove o temporário"""
+    try:
+        gravar(temporario)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def salvar_json(caminho, dados):
+    """Grava JSON de forma atômica (arquivo temporário + rename)"""
+    def gravar(temporario):
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2, default=str)
+    _publicar(_temporario(caminho), caminho, gravar)
+
+
+def compativel_com_arrow(df):
+    """Cópia com as colunas ``object`` convertidas para texto (preservando vazios).
+
+    Colunas com tipos misturados (ex.: números e textos na mesma coluna do XLSX)
+    não são aceitas pelo Arrow.
+    """
+    df = df.copy()
+    for col in df.select_dtypes(include=["object"]).columns:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def salvar_parquet(df, caminho):
+    """Grava um DataFrame em Parquet de forma atômica"""
+    def gravar(temporario):
+        try:
+            df.to_parquet(temporario, index=False)
+        except Exception:
+            compativel_com_arrow(df).to_parquet(temporario, index=False)
+    _publicar(_temporario(caminho), caminho, gravar)
+
+
+def ler_parquet(caminho):
+    if not os.path.exists(caminho):
+        return None
+    # pandas só é importado aqui para o módulo continuar leve (usado pelo agendador)
+    import pandas as pd
+    return pd.read_parquet(caminho)
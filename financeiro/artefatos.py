@@ -0,0 +1,85 @@
+import os
+import glob
+from datetime import datetime, timedelta
+
+from financeiro.armazenamento import caminho_cache, ler_json, salvar_json, ler_parquet, salvar_parquet
+
+# ===================== Configurações =====================
+# Idade máxima para o A6 aproveitar o artefato local em vez de reler o Google Sheets
+ARTEFATO_MAX_MINUTOS = float(os.getenv("ARTEFATO_MAX_MINUTOS", "120"))
+
+
+def _caminhos(nome):
+    return caminho_cache("artefatos", f"{nome}.parquet"), caminho_cache("artefatos", f"{nome}.json")
+
+
+def salvar_artefato(nome, df, **metadados):
+    """Grava o DataFrame tipado de uma etapa para a próxima etapa ler sem passar pelo Sheets"""
+    caminho_dados, caminho_meta = _caminhos(nome)
+    salvar_parquet(df, caminho_dados)
+    # Metadados por último: só existem quando os dados estão completos
+    salvar_json(caminho_meta, {"gerado_em": datetime.now().isoformat(), "linhas": len(df), **metadados})
+
+
+def salvar_artefato_em_fluxo(nome, lotes, **metadados):
+    """Grava cada DataFrame de ``lotes`` como uma parte do artefato e o repassa adiante.
+
+    Os metadados só são gravados quando ``lotes`` se esgota, então uma
+    execução interrompida no meio não deixa um artefato parcial válido.
+    """
+    caminho_dados, caminho_meta = _caminhos(nome)
+    if os.path.exists(caminho_meta):
+        os.remove(caminho_meta)
+    pasta = os.path.splitext(caminho_dados)[0]
+    for antiga in glob.glob(os.path.join(pasta, "parte-*.parquet")):
+        os.remove(antiga)
+
+    linhas, partes = 0, 0
+    for df in lotes:
+        salvar_parquet(df, caminho_cache("artefatos", nome, f"parte-{partes:04d}.parquet"))
+        linhas += len(df)
+        partes += 1
+        yield df
+    salvar_json(caminho_meta, {"gerado_em": datetime.now().isoformat(), "linhas": linhas, "partes": partes, **metadados})
+
+
+def _ler_partes(nome, partes):
+    import pandas as pd
+    pasta = os.path.splitext(_caminhos(nome)[0])[0]
+    frames = [ler_parquet(os.path.join(pasta, f"parte-{i:04d}.parquet")) for i in range(partes)]
+    if any(df is None for df in frames):
+        return None
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+    # O concat de categorias diferentes vira object; volta a category como no artefato inteiro
+    for coluna in df.columns:
+        if all(isinstance(f[coluna].dtype, pd.CategoricalDtype) for f in frames if coluna in f.columns):
+            df[coluna] = df[coluna].astype("category")
+    return df
+
+
+def ler_artefato(nome, max_minutos=None):
+    """DataFrame do artefato se existir e for recente; senão ``None``"""
+    max_minutos = ARTEFATO_MAX_MINUTOS if max_minutos is None else max_minutos
+    caminho_dados, caminho_meta = _caminhos(nome)
+    metadados = ler_json(caminho_meta)
+    if not metadados:
+        return None
+
+    idade = datetime.now() - datetime.fromisoformat(metadados["gerado_em"])
+    if idade > timedelta(minutes=max_minutos):
+        print(f"  ⚠️ Artefato '{nome}' desatualizado ({idade.total_seconds() / 60:.0f} min)")
+        return None
+
+    try:
+        if "partes" in metadados:
+            df = _ler_partes(nome, metadados["partes"])
+        else:
+            df = ler_parquet(caminho_dados)
+    except Exception as e:
+        print(f"  ⚠️ Erro ao ler artefato '{nome}': {e}")
+        return None
+    if df is None or len(df) != metadados.get("linhas"):
+        return None
+    return df
@@ -0,0 +1,120 @@
+import os
+import time
+import hashlib
+
+import pandas as pd
+
+from financeiro.armazenamento import caminho_cache, ler_parquet, salvar_parquet, CACHE_DIR
+from financeiro.leitor_xlsx import ler_xlsx
+
+# ===================== Configurações =====================
+# Limites do cache local de exportações (o runner tem disco limitado)
+CACHE_MAX_MB = float(os.getenv("CACHE_EXPORTACOES_MAX_MB", "500"))
+CACHE_MAX_DIAS = float(os.getenv("CACHE_EXPORTACOES_MAX_DIAS", "14"))
+
+PASTA = "exportacoes"
+
+
+def hash_conteudo(conteudo):
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def hash_dataframe(df, *extras):
+    """Hash estável do conteúdo de um DataFrame (colunas + valores) e de parâmetros extras"""
+    h = hashlib.sha256()
+    h.update("|".join(map(str, df.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    for extra in extras:
+        h.update(str(extra).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _tocar(*caminhos):
+    # Atualiza o mtime para que a remoção por idade/tamanho funcione como LRU
+    agora = time.time()
+    for caminho in caminhos:
+        if os.path.exists(caminho):
+            os.utime(caminho, (agora, agora))
+
+
+def ler_exportacao(tipo, status, conteudo, parser=None):
+    """Lê os bytes de uma exportação XLSX usando o cache endereçado por conteúdo.
+
+    Se os mesmos bytes já foram lidos antes para este tipo/status, devolve o
+    DataFrame salvo em Parquet sem fazer o parse do XLSX. O hash fica em
+    ``df.attrs['hash_conteudo']``.
+    """
+    digest = hash_conteudo(conteudo)
+    caminho_xlsx = caminho_cache(PASTA, tipo, status, f"{digest}.xlsx")
+    caminho_parquet = caminho_cache(PASTA, tipo, status, f"{digest}.parquet")
+
+    df = None
+    if os.path.exists(caminho_parquet):
+        try:
+            df = ler_parquet(caminho_parquet)
+            _tocar(caminho_xlsx, caminho_parquet)
+            print(f"  ♻️ {status}: exportação inalterada, usando cache ({digest[:12]})")
+        except Exception as e:
+            print(f"  ⚠️ Cache corrompido para {status}, refazendo leitura: {e}")
+            df = None
+
+    if df is None:
+        df = (parser or ler_xlsx)(conteudo)
+        with open(caminho_xlsx, "wb") as f:
+            f.write(conteudo)
+        salvar_parquet(df, caminho_parquet)
+
+    df.attrs["hash_conteudo"] = digest
+    return df
+
+
+def ler_resultado(nome, chave):
+    """Resultado derivado (ex.: frame já transformado) salvo para uma chave de conteúdo"""
+    caminho = caminho_cache(PASTA, "resultados", nome, f"{chave}.parquet")
+    df = ler_parquet(caminho)
+    if df is not None:
+        _tocar(caminho)
+    return df
+
+
+def salvar_resultado(nome, chave, df):
+    salvar_parquet(df, caminho_cache(PASTA, "resultados", nome, f"{chave}.parquet"))
+
+
+def limpar_cache(max_mb=None, max_dias=None):
+    """Remove arquivos mais antigos que ``max_dias`` e, depois, os menos usados até caber em ``max_mb``"""
+    max_mb = CACHE_MAX_MB if max_mb is None else max_mb
+    max_dias = CACHE_MAX_DIAS if max_dias is None else max_dias
+    raiz = os.path.join(CACHE_DIR, PASTA)
+    if not os.path.isdir(raiz):
+        return 0
+
+    arquivos = []
+    for pasta, _, nomes in os.walk(raiz):
+        for nome in nomes:
+            caminho = os.path.join(pasta, nome)
+            estat = os.stat(caminho)
+            arquivos.append((estat.st_mtime, estat.st_size, caminho))
+
+    limite_idade = time.time() - max_dias * 86400
+    removidos = 0
+    restantes = []
+    for mtime, tamanho, caminho in arquivos:
+        if mtime < limite_idade:
+            os.remove(caminho)
+            removidos += 1
+        else:
+            restantes.append((mtime, tamanho, caminho))
+
+    total = sum(tamanho for _, tamanho, _ in restantes)
+    limite_bytes = max_mb * 1024 * 1024
+    for mtime, tamanho, caminho in sorted(restantes):
+        if total <= limite_bytes:
+            break
+        os.remove(caminho)
+        total -= tamanho
+        removidos += 1
+
+    if removidos:
+        print(f"🧹 Cache de exportações: {removidos} arquivos removidos ({total / 1024 / 1024:.1f} MB restantes)")
+    return removidos
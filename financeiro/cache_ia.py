@@ -0,0 +1,87 @@
+import os
+import time
+import json
+import hashlib
+from datetime import datetime
+
+from financeiro.armazenamento import CACHE_DIR, caminho_cache, ler_json, salvar_json
+from financeiro.metricas import contar
+
+# ===================== Configurações =====================
+# Respostas da IA reaproveitadas enquanto os agregados enviados no prompt não mudarem
+CACHE_IA_TTL_HORAS = float(os.getenv("CACHE_IA_TTL_HORAS", "168"))
+CACHE_IA_MAX_ITENS = int(os.getenv("CACHE_IA_MAX_ITENS", "50"))
+CACHE_IA_DESATIVADO = os.getenv("CACHE_IA_DESATIVADO", "0") == "1"
+
+PASTA = "ia"
+
+
+def chave_pedido(modelo, mensagens, temperatura):
+    """Hash estável de tudo que é enviado ao modelo (o prompt já contém os agregados formatados)"""
+    pedido = {"modelo": modelo, "mensagens": mensagens, "temperatura": temperatura}
+    return hashlib.sha256(json.dumps(pedido, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def ler_resposta(chave, ttl_horas=None):
+    ttl_horas = CACHE_IA_TTL_HORAS if ttl_horas is None else ttl_horas
+    caminho = caminho_cache(PASTA, f"{chave}.json")
+    registro = ler_json(caminho)
+    if not registro:
+        return None
+    if time.time() - os.path.getmtime(caminho) > ttl_horas * 3600:
+        os.remove(caminho)
+        return None
+    return registro["conteudo"]
+
+
+def salvar_resposta(chave, modelo, conteudo):
+    salvar_json(caminho_cache(PASTA, f"{chave}.json"), {
+        "modelo": modelo,
+        "gerado_em": datetime.now().isoformat(),
+        "conteudo": conteudo,
+    })
+
+
+def limpar_cache_ia(ttl_horas=None, max_itens=None):
+    """Remove respostas vencidas e, depois, as mais antigas além de ``max_itens``"""
+    ttl_horas = CACHE_IA_TTL_HORAS if ttl_horas is None else ttl_horas
+    max_itens = CACHE_IA_MAX_ITENS if max_itens is None else max_itens
+    raiz = os.path.join(CACHE_DIR, PASTA)
+    if not os.path.isdir(raiz):
+        return 0
+
+    arquivos = sorted(
+        (os.path.getmtime(os.path.join(raiz, nome)), os.path.join(raiz, nome))
+        for nome in os.listdir(raiz) if nome.endswith(".json")
+    )
+    limite_idade = time.time() - ttl_horas * 3600
+    vencidos = [caminho for mtime, caminho in arquivos if mtime < limite_idade]
+    validos = [caminho for mtime, caminho in arquivos if mtime >= limite_idade]
+    excedentes = validos[:max(0, len(validos) - max_itens)]
+
+    for caminho in vencidos + excedentes:
+        os.remove(caminho)
+    return len(vencidos) + len(excedentes)
+
+
+def gerar_resposta(client, modelo, mensagens, temperatura=1.0):
+    """Chama ``client.chat.completions.create`` só quando o mesmo pedido não está no cache"""
+    chave = chave_pedido(modelo, mensagens, temperatura)
+    if not CACHE_IA_DESATIVADO:
+        conteudo = ler_resposta(chave)
+        if conteudo is not None:
+            contar("acertos_cache.ia")
+            print(f"♻️ Agregados inalterados, reaproveitando resposta da IA ({chave[:12]})")
+            return conteudo
+
+    contar("chamadas_api.deepseek")
+    response = client.chat.completions.create(
+        model=modelo,
+        messages=mensagens,
+        temperature=temperatura
+    )
+    conteudo = response.choices[0].message.content
+
+    salvar_resposta(chave, modelo, conteudo)
+    limpar_cache_ia()
+    return conteudo
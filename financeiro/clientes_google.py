@@ -0,0 +1,139 @@
+import os
+import json
+import threading
+from functools import lru_cache
+
+import httplib2
+from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp
+
+from financeiro.armazenamento import caminho_cache, ler_json, salvar_json
+from financeiro.cotas import chamar
+
+# ===================== Configurações =====================
+ESCOPOS = ["https://www.googleapis.com/auth/drive", "https://www.googleapis.com/auth/spreadsheets"]
+TIMEOUT = int(os.getenv("GOOGLE_TIMEOUT", "300"))
+
+# Pasta do Drive com as planilhas do financeiro
+folder_id = os.getenv("GOOGLE_PASTA_ID", "18MfMQN_Z5zaxqlGFbEh9qBTCIz-BbCg_")
+
+# IDs conhecidos (evitam a busca por nome no Drive). PLANILHAS_IDS (JSON) substitui a lista inteira:
+# as planilhas que não estiverem nele são procuradas pelo nome na pasta acima.
+planilhas_ids = {
+    "FInanceiro_contas_a_receber_Teste": "120tvbJbgjXpk-Rgnfty7EX2CKV6EeKzN3M5bm1LzyuU",
+    "Financeiro_contas_a_pagar_Teste": "1baVf2FOz9badHhOH2RuMLnrPS3ubIIYFGhweHB0chUI",
+    "Financeiro_Completo_Teste": "1pY0ru6ClQdWg2FBOg4RJfEsRVKlkyVS2aEWE2001JPM",
+}
+if os.getenv("PLANILHAS_IDS") is not None:
+    planilhas_ids = json.loads(os.getenv("PLANILHAS_IDS"))
+
+_trava = threading.Lock()
+_local = threading.local()
+
+
+# ===================== Credenciais =====================
+@lru_cache(maxsize=None)
+def credenciais():
+    """Credenciais da service account (segredo GDRIVE_SERVICE_ACCOUNT), uma por processo.
+
+    O google-auth só renova o token quando ele expira, então todos os clientes
+    criados a partir daqui reaproveitam o mesmo access token.
+    """
+    info = json.loads(os.getenv("GDRIVE_SERVICE_ACCOUNT"))
+    return service_account.Credentials.from_service_account_info(info, scopes=ESCOPOS)
+
+
+def garantir_token():
+    """Renova o token uma única vez antes de abrir threads (sem isso cada thread renovaria o seu)"""
+    atuais = credenciais()
+    with _trava:
+        if not atuais.valid:
+            from google.auth.transport.requests import Request
+            atuais.refresh(Request())
+    return atuais
+
+
+def http_autorizado():
+    """Transporte httplib2 autenticado da thread atual (o httplib2 não é thread-safe)"""
+    if not hasattr(_local, "http"):
+        _local.http = AuthorizedHttp(credenciais(), http=httplib2.Http(timeout=TIMEOUT))
+    return _local.http
+
+
+def executar(pedido):
+    """Executa um pedido do googleapiclient no transporte da thread atual"""
+    return pedido.execute(http=http_autorizado())
+
+
+# ===================== Clientes =====================
+@lru_cache(maxsize=None)
+def servico(nome, versao):
+    """Cliente googleapiclient montado a partir do documento de discovery embutido no pacote.
+
+    ``static_discovery`` dispensa o download do documento; o objeto é
+    compartilhado e as chamadas devem passar por ``executar``.
+    """
+    from googleapiclient.discovery import build
+    return build(nome, versao, credentials=credenciais(), static_discovery=True, cache_discovery=False)
+
+
+def drive():
+    return servico("drive", "v3")
+
+
+def sheets():
+    return servico("sheets", "v4")
+
+
+@lru_cache(maxsize=None)
+def gspread_cliente():
+    """Cliente gspread (sessão requests com pool de conexões) com as mesmas credenciais"""
+    import gspread
+    return gspread.authorize(credenciais())
+
+
+def abrir_planilha(spreadsheet_id):
+    """Planilha do gspread com a primeira aba em ``planilha.primeira_aba``, numa chamada de metadados só.
+
+    O ``open_by_key`` já busca os metadados com as abas, mas só guarda as
+    propriedades da planilha: o ``sheet1`` buscaria tudo de novo, fora do
+    ``com_retry`` e da cota de quem chamou. Aqui a resposta da abertura é aproveitada.
+    """
+    import gspread
+
+    class PlanilhaComAbas(gspread.Spreadsheet):
+        def fetch_sheet_metadata(self, params=None):
+            metadados = super().fetch_sheet_metadata(params)
+            if "sheets" in metadados:
+                self.primeira_aba = gspread.Worksheet(self, metadados["sheets"][0]["properties"], self.id, self.client)
+            return metadados
+
+    return PlanilhaComAbas(gspread_cliente().http_client, {"id": spreadsheet_id})
+
+
+# ===================== Planilhas =====================
+def _caminho_ids():
+    return caminho_cache("google", "planilhas_ids.json")
+
+
+def id_planilha(nome):
+    """ID da planilha pelo nome: IDs conhecidos, depois o cache local, e só então o Drive"""
+    if nome in planilhas_ids:
+        return planilhas_ids[nome]
+
+    with _trava:
+        conhecidos = ler_json(_caminho_ids(), {})
+    if nome in conhecidos:
+        return conhecidos[nome]
+
+    query = f"name='{nome}' and mimeType='application/vnd.google-apps.spreadsheet' and '{folder_id}' in parents and trashed=false"
+    resultado = chamar("drive", executar, drive().files().list(q=query, spaces='drive', fields="files(id, name)"))
+    arquivos = resultado.get("files", [])
+    if not arquivos:
+        raise Exception(f"Planilha '{nome}' não encontrada na pasta do Drive.")
+
+    with _trava:
+        conhecidos = ler_json(_caminho_ids(), {})
+        conhecidos[nome] = arquivos[0]["id"]
+        salvar_json(_caminho_ids(), conhecidos)
+    return arquivos[0]["id"]
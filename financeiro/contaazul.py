@@ -0,0 +1,168 @@
+import os
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from financeiro.cache_exportacoes import ler_exportacao
+from financeiro.cotas import chamar
+from financeiro.metricas import contar, etapa, propagar
+
+# ===================== Configurações =====================
+export_url = "https://services.contaazul.com/finance-pro-reports/v1/financial-statement-view/export"
+# Token da conta: só pelo ambiente (secret CONTAAZUL_TOKEN do workflow; cada empresa do financeiro.empresas tem o seu)
+TOKEN = os.getenv("CONTAAZUL_TOKEN", "")
+headers = {
+    'x-authorization': TOKEN,
+    'Content-Type': 'application/json',
+    'User-Agent': 'Mozilla/5.0'
+}
+
+# Lista de status para processar
+status_list = ["ACQUITTED", "PARTIAL", "PENDING", "LOST", "RENEGOTIATED", "CONCILIATED", "OVERDUE"]
+
+# Número máximo de downloads simultâneos (1 = sequencial, como antes)
+MAX_WORKERS = int(os.getenv("CONTAAZUL_MAX_WORKERS", "4"))
+TIMEOUT = int(os.getenv("CONTAAZUL_TIMEOUT", "300"))
+
+
+def criar_sessao(max_conexoes=len(status_list), tentativas=5, backoff=2.0):
+    """Sessão HTTP com keep-alive compartilhado e retry com backoff em falhas de conexão.
+
+    429 e 5xx são repetidos por ``financeiro.cotas``, que também controla o ritmo das chamadas.
+    """
+    if not TOKEN:
+        raise Exception("❌ CONTAAZUL_TOKEN não definido: configure o token da conta do Conta Azul no ambiente.")
+    retry = Retry(
+        total=tentativas,
+        backoff_factor=backoff,
+        status_forcelist=[],
+        allowed_methods=frozenset(["POST"]),  # a exportação é idempotente
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_conexoes, max_retries=retry)
+
+    sessao = requests.Session()
+    sessao.mount("https://", adapter)
+    sessao.headers.update(headers)
+    return sessao
+
+
+def _exportar(sessao, payload):
+    response = sessao.post(export_url, data=payload, timeout=TIMEOUT)
+    # Tentativas refeitas pelo Retry do urllib3 dentro da sessão
+    contar("retentativas.contaazul", len(getattr(getattr(response.raw, "retries", None), "history", ()) or ()))
+    response.raise_for_status()
+    return response
+
+
+def baixar_status(sessao, tipo, status_atual, date_from=None, date_to=None):
+    """Baixa e lê a exportação XLSX de um único status (opcionalmente numa janela de datas)"""
+    payload = json.dumps({
+        "dateFrom": date_from,
+        "dateTo": date_to,
+        "quickFilter": "ALL",
+        "search": "",
+        "status": [status_atual],
+        "type": [tipo]
+    })
+
+    response = chamar("contaazul", _exportar, sessao, payload)
+    contar("bytes_baixados", len(response.content))
+
+    # Bytes iguais aos de uma execução anterior reaproveitam o parse salvo em Parquet
+    with etapa("leitura_xlsx", status=status_atual) as medida:
+        df = ler_exportacao(tipo, status_atual, response.content)
+        medida.linhas_saida = len(df)
+    df['status'] = status_atual
+    return df
+
+
+def _baixar_com_tolerancia(sessao, tipo, status_atual, janela=(None, None)):
+    date_from, date_to = janela
+    sufixo = f" ({date_from} → {date_to or 'hoje'})" if date_from else ""
+    print(f"📥 Baixando dados para status: {status_atual}{sufixo}")
+    inicio = time.perf_counter()
+    try:
+        df = baixar_status(sessao, tipo, status_atual, date_from, date_to)
+    except requests.exceptions.RequestException as e:
+        print(f"  ⚠️ Erro ao baixar dados para {status_atual}: {e}")
+        return None
+    except Exception as e:
+        print(f"  ⚠️ Erro ao processar arquivo XLSX para {status_atual}: {e}")
+        return None
+
+    print(f"  ✅ {len(df)} registros baixados para {status_atual} ({time.perf_counter() - inicio:.1f}s)")
+    return df
+
+
+def baixar_exportacoes_por_status(tipo, status=None, janelas=None, max_workers=None, sessao=None):
+    """Baixa as exportações de todos os status em paralelo.
+
+    ``janelas`` mapeia status → (dateFrom, dateTo); status ausentes são baixados
+    sem filtro de data. Retorna ``{status: DataFrame}`` na ordem de ``status``,
+    com ``None`` para os status que falharam.
+    """
+    status = status or status_list
+    janelas = janelas or {}
+    max_workers = max(1, min(max_workers or MAX_WORKERS, len(status)))
+    sessao_propria = sessao is None
+    if sessao_propria:
+        sessao = criar_sessao(max_conexoes=max_workers)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            resultados = list(executor.map(
+                propagar(lambda s: _baixar_com_tolerancia(sessao, tipo, s, janelas.get(s, (None, None)))),
+                status
+            ))
+    finally:
+        if sessao_propria:
+            sessao.close()
+
+    return dict(zip(status, resultados))
+
+
+def iterar_exportacoes(tipo, status=None, max_workers=None, sessao=None):
+    """Gera ``(status, DataFrame)`` na ordem de ``status`` à medida que os downloads terminam.
+
+    No máximo ``max_workers`` exportações ficam baixadas à frente do consumidor,
+    então só alguns status ocupam memória ao mesmo tempo. Status com erro são ignorados.
+    """
+    status = status or status_list
+    max_workers = max(1, min(max_workers or MAX_WORKERS, len(status)))
+    sessao_propria = sessao is None
+    if sessao_propria:
+        sessao = criar_sessao(max_conexoes=max_workers)
+
+    baixar = propagar(lambda s: _baixar_com_tolerancia(sessao, tipo, s))
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pendentes = deque()
+            for indice, status_atual in enumerate(status):
+                pendentes.append((status_atual, executor.submit(baixar, status_atual)))
+                # Entrega o mais antigo quando a janela enche (ou quando não há mais status a pedir)
+                while pendentes and (len(pendentes) >= max_workers or indice == len(status) - 1):
+                    status_pronto, futuro = pendentes.popleft()
+                    df = futuro.result()
+                    del futuro
+                    if df is not None:
+                        yield status_pronto, df
+                    del df
+    finally:
+        if sessao_propria:
+            sessao.close()
+
+
+def baixar_exportacoes(tipo, status=None, max_workers=None, sessao=None):
+    """Baixa o histórico completo de todos os status em paralelo.
+
+    Retorna a lista de DataFrames na mesma ordem de ``status`` (para manter o
+    ``drop_duplicates(keep='first')`` determinístico); status com erro são ignorados.
+    """
+    resultados = baixar_exportacoes_por_status(tipo, status, max_workers=max_workers, sessao=sessao)
+    return [df for df in resultados.values() if df is not None]
@@ -0,0 +1,193 @@
+import os
+import time
+import random
+import threading
+from collections import deque
+from functools import lru_cache
+from multiprocessing.managers import BaseManager
+
+from financeiro.metricas import contar
+
+# ===================== Configurações =====================
+# Chamadas por minuto permitidas em cada API (0 = sem limite, só backoff).
+# Sheets: 60 leituras e 60 escritas por minuto por usuário (a service account conta como usuário).
+cotas_por_minuto = {
+    "sheets_leitura": int(os.getenv("COTA_SHEETS_LEITURA", "60")),
+    "sheets_escrita": int(os.getenv("COTA_SHEETS_ESCRITA", "60")),
+    "drive": int(os.getenv("COTA_DRIVE", "1000")),
+    "contaazul": int(os.getenv("COTA_CONTAAZUL", "60")),
+}
+# Nome usado nos contadores chamadas_api.* e retentativas.*
+grupo_por_api = {"sheets_leitura": "google", "sheets_escrita": "google", "drive": "google", "contaazul": "contaazul"}
+
+TENTATIVAS = int(os.getenv("COTA_TENTATIVAS", "5"))
+# Backoff: BACKOFF_BASE_S * 2^tentativa (+ aleatório), no máximo ESPERA_MAXIMA segundos
+BACKOFF_BASE_S = 1.0
+ESPERA_MAXIMA = 64
+# Após um 429 a capacidade cai pela metade e volta aos poucos (esta fração da cota a cada sucesso)
+RECUPERACAO = 0.05
+CAPACIDADE_MINIMA = 0.05
+# Folga (fração do período) para a diferença entre o envio e o registro da chamada no servidor
+FOLGA = 0.02
+
+# Servidor de cotas de outro processo (definido pelo financeiro.empresas): as APIs compartilhadas
+# usam o balde dele, e a cota vale para todas as empresas juntas (mesma service account)
+COTAS_SERVIDOR = os.getenv("COTAS_SERVIDOR", "")
+COTAS_CHAVE = os.getenv("COTAS_CHAVE", "")
+apis_compartilhadas = [api.strip() for api in os.getenv("COTAS_COMPARTILHADAS", "sheets_leitura,sheets_escrita,drive").split(",")
+                       if api.strip()]
+
+
+class Balde:
+    """Token bucket de uma API, compartilhado entre threads.
+
+    O balde tem ``limite`` fichas e cada ficha gasta volta a ele um ``periodo``
+    depois: a cota inteira pode ser usada de uma vez, mas nenhuma janela de
+    ``periodo`` segundos passa do limite. Um 429 (a cota também é gasta por
+    outros clientes) reduz a capacidade pela metade e pausa todas as threads
+    durante o backoff; cada sucesso devolve um pouco até voltar ao teto.
+    """
+
+    def __init__(self, nome, limite, periodo=60.0):
+        self.nome = nome
+        self.limite = limite
+        self.periodo = periodo * (1 + FOLGA)
+        self.capacidade = float(limite)
+        # Horários (monotonic) em que as fichas foram ou serão gastas, em ordem
+        self.gastas = deque()
+        self.pausa_ate = 0.0
+        self._trava = threading.Lock()
+
+    def reservar(self):
+        """Reserva uma ficha e devolve quantos segundos esperar antes de chamar a API"""
+        with self._trava:
+            agora = time.monotonic()
+            inicio = max(agora, self.pausa_ate, self.gastas[-1] if self.gastas else 0.0)
+            # Fichas gastas há mais de um período já voltaram ao balde
+            while self.gastas and self.gastas[0] <= inicio - self.periodo:
+                self.gastas.popleft()
+            capacidade = max(1, int(self.capacidade))
+            if len(self.gastas) >= capacidade:
+                inicio = max(inicio, self.gastas[len(self.gastas) - capacidade] + self.periodo)
+            self.gastas.append(inicio)
+            return inicio - agora
+
+    def sucesso(self):
+        if self.capacidade < self.limite:
+            with self._trava:
+                self.capacidade = min(self.limite, self.capacidade + self.limite * RECUPERACAO)
+
+    def penalizar(self, espera):
+        """429: metade da capacidade e todas as chamadas pausadas por ``espera`` segundos"""
+        with self._trava:
+            agora = time.monotonic()
+            # Os 429 das outras chamadas já em voo durante a pausa são o mesmo estouro: reduz uma vez só
+            if agora >= self.pausa_ate:
+                self.capacidade = max(self.capacidade / 2, self.limite * CAPACIDADE_MINIMA, 1.0)
+            self.pausa_ate = max(self.pausa_ate, agora + espera)
+
+
+_baldes = {}
+_trava = threading.Lock()
+
+
+def balde(api):
+    """Balde da ``api`` (um por processo, ou o do servidor de cotas); ``None`` quando a API não tem limite"""
+    with _trava:
+        if api not in _baldes:
+            limite = cotas_por_minuto.get(api, 0)
+            if limite <= 0:
+                _baldes[api] = None
+            elif COTAS_SERVIDOR and api in apis_compartilhadas:
+                _baldes[api] = _servidor_cotas().balde(api)
+            else:
+                _baldes[api] = Balde(api, limite)
+        return _baldes[api]
+
+
+def definir_cota(api, limite, periodo=60.0):
+    """Troca a cota da ``api`` (``limite`` chamadas por ``periodo`` segundos; 0 = sem limite)"""
+    with _trava:
+        _baldes[api] = Balde(api, limite, periodo) if limite > 0 else None
+        return _baldes[api]
+
+
+# ===================== Cotas entre processos =====================
+class GerenciadorCotas(BaseManager):
+    """Expõe os baldes de um processo aos outros (reservar/sucesso/penalizar viram chamadas locais por socket)"""
+
+
+GerenciadorCotas.register("balde", callable=balde)
+
+
+def servir_cotas():
+    """Sobe o servidor de cotas numa thread deste processo; devolve as variáveis que os filhos usam para se conectar"""
+    chave = os.urandom(16)
+    servidor = GerenciadorCotas(address=("127.0.0.1", 0), authkey=chave).get_server()
+    threading.Thread(target=servidor.serve_forever, name="servidor-cotas", daemon=True).start()
+    host, porta = servidor.address
+    return {
+        "COTAS_SERVIDOR": f"{host}:{porta}",
+        "COTAS_CHAVE": chave.hex(),
+        "COTAS_COMPARTILHADAS": ",".join(apis_compartilhadas),
+    }
+
+
+@lru_cache(maxsize=None)
+def _servidor_cotas():
+    host, porta = COTAS_SERVIDOR.rsplit(":", 1)
+    gerenciador = GerenciadorCotas(address=(host, int(porta)), authkey=bytes.fromhex(COTAS_CHAVE))
+    gerenciador.connect()
+    return gerenciador
+
+
+# ===================== Chamadas =====================
+def status_http(erro):
+    resposta = getattr(erro, "resp", None) or getattr(erro, "response", None)
+    status = getattr(resposta, "status", None) or getattr(resposta, "status_code", None)
+    # urllib.error.HTTPError (ex.: pd.read_csv de uma URL) traz o status em ``code``
+    if not status and isinstance(getattr(erro, "code", None), int):
+        status = erro.code
+    return int(status) if status else None
+
+
+def _retry_after(erro):
+    resposta = getattr(erro, "resp", None) or getattr(erro, "response", None)
+    cabecalhos = (getattr(resposta, "headers", None) or (resposta if isinstance(resposta, dict) else None)
+                  or getattr(erro, "headers", None) or {})
+    try:
+        return float(cabecalhos.get("retry-after") or cabecalhos.get("Retry-After"))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def chamar(api, funcao, *args):
+    """Executa ``funcao(*args)`` dentro da cota da ``api``, repetindo em 429/5xx com backoff exponencial"""
+    cota = balde(api)
+    grupo = grupo_por_api.get(api, api)
+    for tentativa in range(TENTATIVAS):
+        if cota is not None:
+            espera = cota.reservar()
+            if espera > 0:
+                contar(f"espera_cota_s.{api}", round(espera, 3))
+                time.sleep(espera)
+        contar(f"chamadas_api.{grupo}")
+        try:
+            resultado = funcao(*args)
+        except Exception as e:
+            status = status_http(e)
+            # 429 e 5xx são temporários: espera com backoff exponencial e tenta de novo
+            if tentativa == TENTATIVAS - 1 or not (status == 429 or (status and status >= 500)):
+                raise
+            espera = min(_retry_after(e) or BACKOFF_BASE_S * (2 ** tentativa + random.random()), ESPERA_MAXIMA)
+            print(f"  ⏳ Erro {status} da API ({api}), nova tentativa em {espera:.1f}s...")
+            contar(f"retentativas.{grupo}")
+            if status == 429 and cota is not None:
+                # A pausa vale para todas as threads da mesma API, não só para esta
+                cota.penalizar(espera)
+            else:
+                time.sleep(espera)
+            continue
+        if cota is not None:
+            cota.sucesso()
+        return resultado
@@ -0,0 +1,87 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+# ===================== Configurações =====================
+FORMATO_ISO = "%Y-%m-%d"
+# dd/mm/aaaa, aaaa-mm-dd ou valores já convertidos (format="mixed" com dayfirst, como o A6 sempre fez)
+MISTO = "mixed"
+# Valores distintos guardados por formato (o cache é zerado ao passar disso)
+DATAS_CACHE_MAX = int(os.getenv("DATAS_CACHE_MAX", "200000"))
+
+_NAT = np.iinfo(np.int64).min
+_caches = {}
+_trava = threading.Lock()
+
+
+def _interpretar(valores, formato, exato):
+    if formato == MISTO:
+        return pd.to_datetime(valores, format=MISTO, dayfirst=True, errors="coerce")
+    return pd.to_datetime(valores, format=formato, exact=exato, errors="coerce")
+
+
+# ===================== Texto → datetime64 =====================
+def converter_datas(serie, formato=FORMATO_ISO, exato=True):
+    """Converte ``serie`` para datetime64[us] interpretando cada valor distinto uma vez só.
+
+    O resultado de cada texto fica em cache por ``(formato, exato)`` durante o
+    processo inteiro: A1, A2, A6 e IA rodam no mesmo processo pelo Update_contas
+    e repetem as mesmas poucas milhares de datas. Valores inválidos viram NaT;
+    colunas que já são datetime64 voltam como estão.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    codigos, unicos = pd.factorize(serie)
+    unicos = list(unicos)
+
+    with _trava:
+        conhecidos = _caches.setdefault((formato, exato), {})
+        valores = [conhecidos.get(valor) for valor in unicos]
+    faltantes = [valor for valor, convertido in zip(unicos, valores) if convertido is None]
+    if faltantes:
+        convertidos = _interpretar(pd.Series(faltantes, dtype=object), formato, exato)
+        novos = dict(zip(faltantes, convertidos.astype("datetime64[us]").to_numpy().view("int64").tolist()))
+        with _trava:
+            if len(conhecidos) + len(novos) > DATAS_CACHE_MAX:
+                conhecidos.clear()
+            conhecidos.update(novos)
+        valores = [novos[valor] if convertido is None else convertido for valor, convertido in zip(unicos, valores)]
+
+    # O código -1 (valor ausente) cai na última posição, que guarda NaT
+    tabela = np.array(valores + [_NAT], dtype="int64")
+    return pd.Series(tabela[codigos].view("datetime64[us]"), index=serie.index, name=serie.name)
+
+
+def converter_inicio_iso(serie):
+    """Só texto cujo trecho até o terceiro "-" é exatamente AAAA-MM-DD (o ``str.extract`` antigo do IA).
+
+    O recorte e o parse rodam uma vez por valor distinto; o resto vira NaT.
+    """
+    codigos, unicos = pd.factorize(serie)
+    recortes = pd.Series(["-".join(valor.split("-")[:3]) if isinstance(valor, str) and valor.count("-") >= 2 else None
+                          for valor in unicos], dtype=object)
+    datas = np.append(converter_datas(recortes, FORMATO_ISO).to_numpy(), np.datetime64("NaT", "us"))
+    return pd.Series(datas[codigos], index=serie.index, name=serie.name)
+
+
+def limpar_cache():
+    """Esvazia o cache de datas interpretadas (ele já se limita a DATAS_CACHE_MAX; útil em medições)"""
+    with _trava:
+        _caches.clear()
+
+
+# ===================== datetime64 → texto (só na saída) =====================
+def formatar_datas(serie, formato, vazio=None):
+    """Texto no ``formato`` (strftime só dos valores distintos); NaT vira ``vazio``"""
+    if not pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    codigos, unicos = pd.factorize(serie)
+    tabela = np.append(unicos.strftime(formato).to_numpy(dtype=object), np.array([vazio], dtype=object))
+    return pd.Series(tabela[codigos], index=serie.index, name=serie.name, dtype=object)
+
+
+def formatar_colunas(df, colunas, formato, vazio=None):
+    """Cópia rasa de ``df`` com as ``colunas`` de data como texto (para gravar no destino)"""
+    return df.assign(**{coluna: formatar_datas(df[coluna], formato, vazio) for coluna in colunas if coluna in df.columns})
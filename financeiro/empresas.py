@@ -0,0 +1,199 @@
+"""Execução multiempresa: o fluxo completo (A0 → A1/A2 → A6) de várias contas do Conta Azul em paralelo.
+
+Cada empresa do arquivo de configuração (``empresas.json``, modelo em
+``empresas.exemplo.json``) roda o Update_contas num processo próprio, com o
+token do Conta Azul, a pasta do Drive, as planilhas, o diretório de cache e os
+limites de paralelismo dela. No máximo ``paralelo`` empresas rodam ao mesmo
+tempo. As cotas do Google (mesma service account) são um balde só, servido por
+este processo a todos os filhos (financeiro.cotas); a do Conta Azul é de cada
+token. A saída de cada empresa vai para ``.cache/empresas/<nome>/execucao.log``
+e o resumo para ``.cache/empresas/status.json``: uma empresa que falha, ou
+passa do tempo limite, não interrompe as outras.
+
+Uso: python -m financeiro.empresas [--arquivo empresas.json] [--paralelo 2] [--empresa nome ...]
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import importlib
+import subprocess
+from datetime import datetime
+
+from financeiro.armazenamento import CACHE_DIR, caminho_cache, ler_json, salvar_json
+from financeiro.cotas import servir_cotas
+
+# ===================== Configurações =====================
+ARQUIVO_EMPRESAS = os.getenv("EMPRESAS_ARQUIVO", "empresas.json")
+# Empresas rodando ao mesmo tempo (o arquivo pode definir "paralelo")
+PARALELO = int(os.getenv("EMPRESAS_PARALELO", "2"))
+# Tempo máximo de uma empresa antes de ser interrompida (0 = sem limite)
+TIMEOUT_MIN = float(os.getenv("EMPRESAS_TIMEOUT_MIN", "90"))
+INTERVALO_S = 0.5
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Processo de cada empresa (o ambiente dela é passado pelo executar_empresas)
+comando_fluxo = [sys.executable, "-m", "financeiro.empresas", "--fluxo"]
+
+# "paralelismo" no arquivo → variável lida pelos módulos no processo da empresa
+variaveis_paralelismo = {
+    "contaazul": "CONTAAZUL_MAX_WORKERS",
+    "upload": "UPLOAD_PARALELO",
+    "leitura": "SHEETS_LEITURA_PARALELO",
+}
+
+
+# ===================== Configuração das empresas =====================
+def ler_configuracao(caminho=ARQUIVO_EMPRESAS):
+    """Lê o arquivo de empresas; nomes ausentes, repetidos ou inválidos como pasta são erro de configuração"""
+    configuracao = ler_json(caminho)
+    if configuracao is None:
+        raise FileNotFoundError(f"Arquivo de empresas não encontrado: {caminho}")
+    nomes = [empresa.get("nome") or "" for empresa in configuracao.get("empresas", [])]
+    invalidos = [nome for nome in nomes if not re.fullmatch(r"[\w.-]+", nome)]
+    if invalidos or len(set(nomes)) != len(nomes):
+        raise ValueError(f"Cada empresa precisa de um \"nome\" único (letras, números, '.', '-', '_'): {nomes}")
+    return configuracao
+
+
+def _resolver(valor):
+    """"$VARIAVEL" → valor da variável de ambiente (segredos ficam fora do arquivo)"""
+    if isinstance(valor, str) and valor.startswith("$"):
+        if valor[1:] not in os.environ:
+            raise KeyError(f"variável de ambiente {valor[1:]} não definida")
+        return os.environ[valor[1:]]
+    return valor
+
+
+def pasta_empresa(nome):
+    # Absoluto: o processo da empresa roda a partir da raiz do repositório
+    return os.path.abspath(os.path.join(CACHE_DIR, "empresas", nome))
+
+
+def ambiente_da_empresa(empresa, paralelismo=None):
+    """Variáveis de ambiente do processo da empresa, por cima das deste processo"""
+    for chave in ("contaazul_token", "google_pasta_id"):
+        if not empresa.get(chave):
+            raise KeyError(f"\"{chave}\" não definido")
+    ambiente = {
+        "CONTAAZUL_TOKEN": _resolver(empresa["contaazul_token"]),
+        "GOOGLE_PASTA_ID": _resolver(empresa["google_pasta_id"]),
+        # As que faltarem são procuradas pelo nome na pasta da empresa, nunca nas de outra
+        "PLANILHAS_IDS": json.dumps(empresa.get("planilhas", {})),
+        # Estado local (marcas d'água, artefatos, métricas) separado por empresa
+        "FINANCEIRO_CACHE_DIR": pasta_empresa(empresa["nome"]),
+        # Sem banco próprio, nada de espelhar no DB_URL de outra empresa
+        "DB_URL": _resolver(empresa.get("db_url", "")),
+    }
+    if "google_credenciais" in empresa:
+        ambiente["GDRIVE_SERVICE_ACCOUNT"] = _resolver(empresa["google_credenciais"])
+    for chave, valor in {**(paralelismo or {}), **empresa.get("paralelismo", {})}.items():
+        ambiente[variaveis_paralelismo[chave]] = str(valor)
+    ambiente.update({chave: str(_resolver(valor)) for chave, valor in empresa.get("ambiente", {}).items()})
+    return ambiente
+
+
+# ===================== Execução =====================
+def _iniciar(empresa, base, execucao, paralelismo):
+    nome = empresa["nome"]
+    ambiente = {**base, **ambiente_da_empresa(empresa, paralelismo), "METRICAS_EXECUCAO": f"{execucao}-{nome}"}
+    os.makedirs(pasta_empresa(nome), exist_ok=True)
+    # Resultado da execução anterior não pode ser confundido com o desta
+    if os.path.exists(os.path.join(pasta_empresa(nome), "ultima_execucao.json")):
+        os.remove(os.path.join(pasta_empresa(nome), "ultima_execucao.json"))
+    caminho_log = os.path.join(pasta_empresa(nome), "execucao.log")
+    with open(caminho_log, "w", encoding="utf-8") as log:
+        processo = subprocess.Popen(comando_fluxo, cwd=RAIZ, env=ambiente, stdout=log, stderr=subprocess.STDOUT)
+    print(f"▶️ {nome}: iniciada (log em {caminho_log})")
+    return processo
+
+
+def _resultado(nome, processo, inicio, interrompida):
+    duracao = round(time.monotonic() - inicio, 1)
+    ultima = ler_json(os.path.join(pasta_empresa(nome), "ultima_execucao.json"), {})
+    if interrompida:
+        situacao, falhas = "tempo esgotado", []
+    elif processo.returncode == 0:
+        situacao, falhas = "ok", []
+    else:
+        # 1 = alguma etapa falhou (lista gravada pelo próprio processo); outro código = o processo morreu
+        falhas = ultima.get("falhas", []) if processo.returncode == 1 else []
+        situacao = "falhas" if falhas else f"erro (código {processo.returncode})"
+    simbolo = "✅" if situacao == "ok" else "❌"
+    print(f"{simbolo} {nome}: {situacao} em {duracao}s{' - ' + ', '.join(falhas) if falhas else ''}")
+    return {"situacao": situacao, "falhas": falhas, "duracao_s": duracao, "codigo": processo.returncode}
+
+
+def executar_empresas(configuracao, nomes=None, paralelo=None):
+    """Roda o fluxo de cada empresa em até ``paralelo`` processos; devolve o resultado por empresa"""
+    empresas = [empresa for empresa in configuracao.get("empresas", [])
+                if (not nomes or empresa["nome"] in nomes) and empresa.get("ativa", True)]
+    paralelo = max(1, paralelo or configuracao.get("paralelo") or PARALELO)
+    paralelismo = configuracao.get("paralelismo", {})
+    execucao = f"{datetime.now():%Y%m%dT%H%M%S}"
+    print(f"🏢 {len(empresas)} empresa(s), até {paralelo} ao mesmo tempo")
+
+    # Servidor de cotas compartilhado e os demais valores deste processo herdados por todos
+    base = {**os.environ, **servir_cotas()}
+    resultados, pendentes, ativos = {}, list(empresas), {}
+    try:
+        while pendentes or ativos:
+            while pendentes and len(ativos) < paralelo:
+                empresa = pendentes.pop(0)
+                try:
+                    ativos[empresa["nome"]] = (_iniciar(empresa, base, execucao, paralelismo), time.monotonic())
+                except Exception as e:
+                    print(f"❌ {empresa['nome']}: configuração inválida - {e}")
+                    resultados[empresa["nome"]] = {"situacao": "configuração inválida", "falhas": [str(e)]}
+
+            time.sleep(INTERVALO_S)
+            for nome, (processo, inicio) in list(ativos.items()):
+                interrompida = False
+                if processo.poll() is None:
+                    if not TIMEOUT_MIN or time.monotonic() - inicio < TIMEOUT_MIN * 60:
+                        continue
+                    processo.kill()
+                    processo.wait()
+                    interrompida = True
+                resultados[nome] = _resultado(nome, processo, inicio, interrompida)
+                del ativos[nome]
+    finally:
+        # Ctrl+C ou erro aqui: nenhum processo de empresa fica órfão
+        for processo, _ in ativos.values():
+            processo.kill()
+
+    salvar_json(caminho_cache("empresas", "status.json"), {"execucao": execucao, "empresas": resultados})
+    return resultados
+
+
+def executar_fluxo():
+    """Processo de uma empresa: roda o Update_contas e sai com código 1 se alguma etapa falhou"""
+    sys.path.insert(0, RAIZ)
+    update_contas = importlib.import_module("Update_contas")
+    falhas = update_contas.executar_scripts()
+    salvar_json(caminho_cache("ultima_execucao.json"), {"fim": datetime.now().isoformat(), "falhas": falhas})
+    sys.exit(1 if falhas else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--arquivo", default=ARQUIVO_EMPRESAS)
+    parser.add_argument("--paralelo", type=int, help="empresas ao mesmo tempo")
+    parser.add_argument("--empresa", nargs="+", help="só estas empresas")
+    parser.add_argument("--fluxo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.fluxo:
+        executar_fluxo()
+    resultados = executar_empresas(ler_configuracao(args.arquivo), args.empresa, args.paralelo)
+    falharam = [nome for nome, resultado in resultados.items() if resultado["situacao"] != "ok"]
+    print(f"\n🏁 {len(resultados) - len(falharam)}/{len(resultados)} empresa(s) concluídas sem falhas"
+          f"{' - com problemas: ' + ', '.join(falharam) if falharam else ''}")
+    sys.exit(1 if falharam else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from financeiro.contaazul import status_list
+from financeiro.datas import converter_datas, formatar_datas
+
+# ===================== Esquema da exportação financial-statement-view =====================
+# Nomes originais do XLSX e os nomes usados depois do rename (mesmo tipo)
+colunas_data = [
+    "Data original de vencimento", "dueDate",
+    "Data de competência", "financialEvent.competenceDate",
+    "Data movimento",
+    "Data do último pagamento", "lastAcquittanceDate",
+]
+colunas_valor = ["Valor (R$)", "paid", "categoriesRatio.value"]
+colunas_categoria = [
+    "Categoria 1", "categoriesRatio.category",
+    "Nome do fornecedor/cliente", "financialEvent.negotiator.name",
+    "Situação",
+]
+# Colunas repetidas por slot de centro de custo
+padrao_centro = re.compile(r"^Centro de Custo \d+$")
+padrao_valor_centro = re.compile(r"^Valor no Centro de Custo \d+$")
+
+FORMATO_DATA_EXPORTACAO = "%d/%m/%Y"
+FORMATO_DATA_PLANILHA = "%d/%m/%Y"
+
+
+def _manter_se_perder_valores(original, convertida, coluna):
+    # Não troca a coluna se a conversão transformar valores preenchidos em vazios
+    if convertida.isna().sum() > original.isna().sum():
+        print(f"  ⚠️ Coluna '{coluna}' com valores fora do esquema, mantida como está")
+        return original
+    return convertida
+
+
+def converter_data(serie, coluna="", estrito=True):
+    """Converte para datetime64; com ``estrito`` a coluna só é trocada se nenhum valor se perder"""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    convertida = converter_datas(serie, FORMATO_DATA_EXPORTACAO)
+    return _manter_se_perder_valores(serie, convertida, coluna) if estrito else convertida
+
+
+def converter_valor(serie, coluna=""):
+    if pd.api.types.is_float_dtype(serie):
+        return serie
+    convertida = pd.to_numeric(serie, errors="coerce").astype("float64")
+    return _manter_se_perder_valores(serie, convertida, coluna)
+
+
+def converter_categoria(serie, categorias=None):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie
+    if categorias is not None:
+        # Inclui os valores que ainda serão atribuídos (ex.: status ACQUITTED/OVERDUE)
+        categorias = list(dict.fromkeys(list(categorias) + serie.dropna().unique().tolist()))
+        return pd.Series(pd.Categorical(serie, categories=categorias), index=serie.index)
+    return serie.astype("category")
+
+
+def aplicar_esquema(df):
+    """Converte as colunas conhecidas para datetime64, float64 e category (in-place)"""
+    for coluna in df.columns:
+        if coluna in colunas_data:
+            df[coluna] = converter_data(df[coluna], coluna)
+        elif coluna in colunas_valor or padrao_valor_centro.match(coluna):
+            df[coluna] = converter_valor(df[coluna], coluna)
+        elif coluna == "status":
+            df[coluna] = converter_categoria(df[coluna], status_list)
+        elif coluna in colunas_categoria or padrao_centro.match(coluna):
+            df[coluna] = converter_categoria(df[coluna])
+    return df
+
+
+def para_texto(df):
+    """Cópia só com texto para o Sheets: datas em dd/mm/aaaa e demais colunas via astype(str)"""
+    texto = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            serie = formatar_datas(serie, FORMATO_DATA_PLANILHA, np.nan)
+        elif isinstance(serie.dtype, pd.CategoricalDtype):
+            # Converte só as categorias (poucos valores) e expande pelos códigos
+            serie = serie.cat.rename_categories(serie.cat.categories.astype(str)).astype(object)
+        texto[coluna] = serie.astype(str)
+    return pd.DataFrame(texto, index=df.index)
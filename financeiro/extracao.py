@@ -0,0 +1,293 @@
+import os
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from financeiro.clientes_google import garantir_token, sheets, id_planilha
+from financeiro.contaazul import status_list, criar_sessao, baixar_exportacoes, iterar_exportacoes
+from financeiro.incremental import INCREMENTAL, extrair_incremental
+from financeiro.sheets import DestinoApi
+from financeiro.sheets_sync import SYNC_DIFERENCIAL, sincronizar_aba
+from financeiro.uploader import enviar_em_blocos, enviar_em_fluxo
+from financeiro.artefatos import salvar_artefato, salvar_artefato_em_fluxo
+from financeiro.esquema import aplicar_esquema, converter_data, para_texto
+from financeiro.cache_exportacoes import hash_dataframe, ler_resultado, salvar_resultado, limpar_cache
+from financeiro.metricas import etapa, propagar
+
+# ===================== Configurações =====================
+# Processa e publica um status por vez, sem juntar todas as exportações em memória
+# (o modo incremental e a sincronização por diferença precisam do frame completo)
+EXTRACAO_FLUXO = os.getenv("EXTRACAO_FLUXO", "0") == "1"
+
+# Tipo de lançamento no Conta Azul → planilha de destino no Drive
+planilhas_por_tipo = {
+    "EXPENSE": "Financeiro_contas_a_pagar_Teste",
+    "REVENUE": "FInanceiro_contas_a_receber_Teste"
+}
+
+colunas_renomear = {
+    "Data original de vencimento": "dueDate",
+    "Data de competência": "financialEvent.competenceDate",
+    "Valor (R$)": "paid",
+    "Categoria 1": "categoriesRatio.category",
+    "Descrição": "description",
+    "Nome do fornecedor/cliente": "financialEvent.negotiator.name",
+    "Data do último pagamento": "lastAcquittanceDate"
+}
+
+# Colunas criadas pelo ``transformar`` (vão para o fim do cabeçalho, depois das colunas da exportação)
+colunas_derivadas = [colunas_renomear["Data do último pagamento"]]
+
+
+# ===================== Transformações =====================
+def _silencioso(*args, **kwargs):
+    pass
+
+
+def consolidar(all_dataframes):
+    """Concatena as exportações por status e remove duplicatas por id"""
+    if not all_dataframes:
+        raise Exception("❌ Nenhum dado foi baixado com sucesso!")
+
+    print(f"\n🔄 Consolidando {len(all_dataframes)} arquivos...")
+    df_consolidado = pd.concat(all_dataframes, ignore_index=True)
+
+    if 'id' in df_consolidado.columns:
+        df_consolidado = df_consolidado.drop_duplicates(subset=['id'], keep='first')
+        print(f"📋 Total de registros únicos após remoção de duplicatas: {len(df_consolidado)}")
+    else:
+        print(f"📋 Total de registros consolidados: {len(df_consolidado)}")
+    return df_consolidado
+
+
+def transformar(df_consolidado, verboso=True):
+    """Ajustes de status, datas e nomes de colunas sobre o frame tipado (o texto é gerado só no upload)"""
+    log = print if verboso else _silencioso
+
+    # ===================== Tipar colunas conforme o esquema da exportação =====================
+    log(f"\n🔄 Aplicando esquema (datas, valores e categorias)...")
+    aplicar_esquema(df_consolidado)
+
+    # ===================== MAPEAR CONCILIATED PARA ACQUITTED =====================
+    log(f"\n🔄 Mapeando status CONCILIATED para ACQUITTED...")
+    mask_conciliated = df_consolidado['status'] == 'CONCILIATED'
+    total_conciliated = mask_conciliated.sum()
+    df_consolidado.loc[mask_conciliated, 'status'] = 'ACQUITTED'
+    log(f"  ✅ {total_conciliated} registros CONCILIATED convertidos para ACQUITTED")
+
+    # ===================== Criar coluna "Data do último pagamento" =====================
+    log(f"\n🔄 Criando coluna 'Data do último pagamento' baseada em Situação e Data movimento...")
+
+    if 'Situação' in df_consolidado.columns and 'Data movimento' in df_consolidado.columns:
+        mask = df_consolidado['Situação'].isin(['Quitado', 'Conciliado'])
+        df_consolidado['Data do último pagamento'] = df_consolidado['Data movimento'].where(mask)
+
+        registros_preenchidos = mask.sum()
+        log(f"  ✅ Coluna 'Data do último pagamento' criada com {registros_preenchidos} registros preenchidos")
+    else:
+        log(f"  ⚠️ AVISO: Colunas 'Situação' e/ou 'Data movimento' não encontradas!")
+
+    # ===================== Atualizar status PENDING para OVERDUE =====================
+    log(f"\n🔄 Verificando status PENDING com data vencida...")
+
+    ontem = datetime.now() - timedelta(days=1)
+    ontem = ontem.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    col_vencimento = "Data do último pagamento"
+
+    if col_vencimento in df_consolidado.columns:
+        df_consolidado[col_vencimento] = converter_data(df_consolidado[col_vencimento], col_vencimento, estrito=False)
+        mask_update = (df_consolidado['status'] == 'PENDING') & (df_consolidado[col_vencimento] <= ontem)
+        total_atualizados = mask_update.sum()
+        df_consolidado.loc[mask_update, 'status'] = 'OVERDUE'
+        log(f"  ✅ {total_atualizados} registros PENDING atualizados para OVERDUE")
+    else:
+        log(f"  ⚠️ AVISO: Coluna '{col_vencimento}' não encontrada!")
+
+    # ===================== Renomear colunas conforme especificação =====================
+    log(f"\n🔄 Renomeando colunas...")
+
+    colunas_renomeadas = {}
+    for col_antiga, col_nova in colunas_renomear.items():
+        if col_antiga in df_consolidado.columns:
+            colunas_renomeadas[col_antiga] = col_nova
+            log(f"  ✅ '{col_antiga}' → '{col_nova}'")
+        else:
+            log(f"  ⚠️ Coluna '{col_antiga}' não encontrada")
+
+    df_consolidado.rename(columns=colunas_renomeadas, inplace=True)
+
+    return df_consolidado
+
+
+def converter_para_texto(df_consolidado):
+    """Cópia com todos os valores como string, para o Sheets não auto-formatar"""
+    print(f"\n🔄 Convertendo valores para string (datas em dd/mm/aaaa) para evitar auto-formatação...")
+    return para_texto(df_consolidado)
+
+
+# ===================== Publicar no Google Sheets =====================
+def publicar(df_consolidado, sheet_name):
+    # Cliente, token e ID da planilha vêm da fábrica compartilhada (sem busca no Drive para IDs conhecidos)
+    destino = DestinoApi(sheets(), id_planilha(sheet_name))
+
+    if SYNC_DIFERENCIAL:
+        # ===================== Enviar apenas as linhas alteradas =====================
+        print(f"\n🔁 Sincronizando planilha '{sheet_name}' por diferença ({len(df_consolidado)} registros)...")
+        sincronizar_aba(destino, df_consolidado, chave="id", value_input_option="RAW")
+    else:
+        # ===================== Limpar e reenviar em blocos com RAW =====================
+        print(f"\n🧹 Limpando planilha '{sheet_name}' e enviando {len(df_consolidado)} registros em blocos...")
+        enviar_em_blocos(destino, df_consolidado, value_input_option="RAW")  # RAW evita interpretação automática
+
+    print(f"\n✅ Planilha Google '{sheet_name}' atualizada com sucesso!")
+    print(f"📊 Total de registros: {len(df_consolidado)}")
+    print(f"📊 Registros por status (após ajustes):")
+    for status in ['ACQUITTED', 'PARTIAL', 'PENDING', 'LOST', 'RENEGOTIATED', 'OVERDUE']:
+        count = len(df_consolidado[df_consolidado['status'] == status])
+        if count > 0:
+            print(f"  - {status}: {count} registros")
+
+
+# ===================== Extração em fluxo =====================
+def deduplicar_em_fluxo(lotes):
+    """Descarta os ids já vistos em status anteriores (mesmo resultado do ``drop_duplicates(keep='first')`` após o concat)"""
+    vistos = set()
+    for status_atual, df in lotes:
+        if 'id' in df.columns:
+            df = df.drop_duplicates(subset=['id'], keep='first')
+            # Consulta direta ao set (o isin converte o set inteiro a cada lote)
+            novos = [valor not in vistos for valor in df['id'].tolist()]
+            if not all(novos):
+                df = df[novos]
+            vistos.update(df['id'].tolist())
+        yield status_atual, df
+
+
+def transformar_em_fluxo(lotes):
+    """Aplica esquema e ajustes de ``transformar`` a cada ``(status, DataFrame)`` sem duplicatas.
+
+    Sem nenhum status baixado levanta o mesmo erro do ``consolidar``, antes
+    que o artefato seja gravado ou a planilha limpa.
+    """
+    recebidos = 0
+    for status_atual, df in deduplicar_em_fluxo(lotes):
+        recebidos += 1
+        df = transformar(df.reset_index(drop=True), verboso=False)
+        print(f"  🔄 {status_atual}: {len(df)} registros únicos transformados")
+        yield df
+    if not recebidos:
+        raise Exception("❌ Nenhum dado foi baixado com sucesso!")
+
+
+def extrair_tipo_em_fluxo(tipo, sessao=None):
+    """Baixa, transforma e publica um status por vez; a memória fica limitada a poucos status.
+
+    O frame tipado vai para o artefato em partes, e cada parte é convertida
+    para texto e enviada ao Sheets antes do próximo status. Retorna o total de linhas.
+    """
+    sheet_name = planilhas_por_tipo[tipo]
+    por_status = {}
+
+    def em_texto(lotes):
+        for df in lotes:
+            for status, quantidade in df['status'].value_counts().items():
+                por_status[status] = por_status.get(status, 0) + int(quantidade)
+            yield para_texto(df)
+
+    with etapa("extracao", tipo=tipo) as medida:
+        print(f"🔄 [{tipo}] Baixando, transformando e publicando cada status em fluxo...")
+        destino = DestinoApi(sheets(), id_planilha(sheet_name))
+        lotes = transformar_em_fluxo(iterar_exportacoes(tipo, status_list, sessao=sessao))
+        lotes = salvar_artefato_em_fluxo(tipo, lotes, planilha=sheet_name)
+        total = enviar_em_fluxo(destino, em_texto(lotes), value_input_option="RAW", colunas_no_fim=colunas_derivadas)
+        medida.linhas_saida = total
+
+    print(f"\n✅ Planilha Google '{sheet_name}' atualizada com sucesso!")
+    print(f"📊 Total de registros: {total}")
+    print(f"📊 Registros por status (após ajustes):")
+    for status in ['ACQUITTED', 'PARTIAL', 'PENDING', 'LOST', 'RENEGOTIATED', 'OVERDUE']:
+        if por_status.get(status):
+            print(f"  - {status}: {por_status[status]} registros")
+    return total
+
+
+# ===================== Execução =====================
+def extrair_tipo(tipo, sessao=None):
+    """Baixa, transforma e publica um tipo (EXPENSE ou REVENUE) no processo atual"""
+    with etapa("extracao", tipo=tipo) as medida:
+        print(f"🔄 [{tipo}] Iniciando download dos arquivos XLSX para cada status...")
+        with etapa("download") as medida_download:
+            if INCREMENTAL:
+                all_dataframes = extrair_incremental(tipo, status_list, sessao=sessao)
+            else:
+                all_dataframes = baixar_exportacoes(tipo, status_list, sessao=sessao)
+            medida_download.linhas_saida = sum(len(df) for df in all_dataframes)
+
+        with etapa("transformacao") as medida_transformacao:
+            medida_transformacao.linhas_entrada = medida_download.linhas_saida
+            df_consolidado = consolidar(all_dataframes)
+
+            # Mesmo conteúdo bruto no mesmo dia (o OVERDUE depende da data) → reaproveita o resultado transformado
+            chave = hash_dataframe(df_consolidado, tipo, datetime.now().date())
+            df_transformado = ler_resultado(f"tipado_{tipo}", chave)
+            if df_transformado is not None:
+                print(f"\n♻️ Dados brutos inalterados, reaproveitando transformações em cache ({chave[:12]})")
+                df_consolidado = df_transformado
+            else:
+                df_consolidado = transformar(df_consolidado)
+                salvar_resultado(f"tipado_{tipo}", chave, df_consolidado)
+            medida_transformacao.linhas_saida = len(df_consolidado)
+
+        with etapa("publicacao") as medida_publicacao:
+            medida_publicacao.linhas_entrada = len(df_consolidado)
+            publicar(converter_para_texto(df_consolidado), planilhas_por_tipo[tipo])
+
+        # Entrega o frame tipado ao A6 sem a ida e volta pelo Sheets
+        salvar_artefato(tipo, df_consolidado, planilha=planilhas_por_tipo[tipo])
+        medida.linhas_saida = len(df_consolidado)
+    return df_consolidado
+
+
+def extrair_todos(tipos=None, concorrente=False):
+    """Executa a extração de todos os tipos compartilhando credenciais e sessão HTTP.
+
+    Com ``concorrente=True`` os tipos rodam em threads paralelas. Retorna
+    ``{tipo: DataFrame}`` dos tipos concluídos (com ``EXTRACAO_FLUXO``,
+    ``{tipo: linhas}``); o primeiro erro é relançado ao final, depois que os
+    demais tipos terminam.
+    """
+    tipos = tipos or list(planilhas_por_tipo)
+    em_fluxo = EXTRACAO_FLUXO and not INCREMENTAL and not SYNC_DIFERENCIAL
+    if EXTRACAO_FLUXO and not em_fluxo:
+        print("⚠️ Extração em fluxo ignorada: modo incremental/sincronização por diferença precisam do frame completo")
+    extrair = extrair_tipo_em_fluxo if em_fluxo else extrair_tipo
+    # Monta token e cliente do Sheets uma vez, antes das threads
+    garantir_token()
+    sheets()
+    sessao = criar_sessao(max_conexoes=len(status_list) * len(tipos))
+
+    resultados, erros = {}, []
+
+    def executar(tipo):
+        try:
+            resultados[tipo] = extrair(tipo, sessao)
+        except Exception as e:
+            print(f"❌ Erro na extração de {tipo}: {e}")
+            erros.append(e)
+
+    try:
+        if concorrente:
+            with ThreadPoolExecutor(max_workers=len(tipos)) as executor:
+                list(executor.map(propagar(executar), tipos))
+        else:
+            for tipo in tipos:
+                executar(tipo)
+    finally:
+        sessao.close()
+        limpar_cache()
+
+    if erros:
+        raise erros[0]
+    return resultados
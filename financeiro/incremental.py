@@ -0,0 +1,118 @@
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from financeiro.armazenamento import caminho_cache, ler_json, salvar_json, ler_parquet, salvar_parquet
+from financeiro.contaazul import status_list, baixar_exportacoes_por_status
+
+# ===================== Configurações =====================
+# Liga o modo incremental (0 = sempre baixa o histórico completo, como antes)
+INCREMENTAL = os.getenv("CONTAAZUL_INCREMENTAL", "0") == "1"
+# Dias retroativos a partir da última execução para capturar baixas/edições recentes
+JANELA_DIAS = int(os.getenv("CONTAAZUL_JANELA_DIAS", "60"))
+# A cada N dias força uma carga completa para capturar edições tardias
+DIAS_CARGA_COMPLETA = int(os.getenv("CONTAAZUL_DIAS_CARGA_COMPLETA", "7"))
+FORMATO_DATA_API = "%Y-%m-%d"
+
+# EXPENSE e REVENUE rodam em threads e dividem o arquivo de marcas d'água
+_trava_watermarks = threading.Lock()
+
+
+def _caminho_watermarks():
+    return caminho_cache("incremental", "watermarks.json")
+
+
+def _salvar_marcas(tipo, marcas_tipo):
+    """Grava só as marcas do ``tipo``, relendo o arquivo sob trava para não apagar as do outro tipo"""
+    with _trava_watermarks:
+        watermarks = ler_json(_caminho_watermarks(), {})
+        watermarks[tipo] = marcas_tipo
+        salvar_json(_caminho_watermarks(), watermarks)
+
+
+def _caminho_base(tipo):
+    return caminho_cache("incremental", f"base_{tipo}.parquet")
+
+
+def calcular_janelas(tipo, watermarks, agora, status=None):
+    """Define a janela (dateFrom, dateTo) de cada status a partir da marca d'água.
+
+    Status sem marca d'água ou com a última carga completa vencida recebem
+    ``(None, None)``, ou seja, o histórico completo.
+    """
+    janelas = {}
+    marcas_tipo = watermarks.get(tipo, {})
+    for status_atual in status or status_list:
+        marca = marcas_tipo.get(status_atual)
+        if not marca:
+            janelas[status_atual] = (None, None)
+            continue
+
+        ultima_completa = datetime.fromisoformat(marca["ultima_completa"])
+        if agora - ultima_completa >= timedelta(days=DIAS_CARGA_COMPLETA):
+            janelas[status_atual] = (None, None)
+            continue
+
+        ultima_execucao = datetime.fromisoformat(marca["ultima_execucao"])
+        inicio = ultima_execucao - timedelta(days=JANELA_DIAS)
+        janelas[status_atual] = (inicio.strftime(FORMATO_DATA_API), None)
+    return janelas
+
+
+def mesclar_por_id(base, novos, status_completos):
+    """Mescla as exportações novas no conjunto anterior usando ``id``.
+
+    Linhas dos status baixados por completo são substituídas inteiras; nos demais,
+    qualquer registro presente em ``novos`` (inclusive os que mudaram de status)
+    substitui a versão anterior.
+    """
+    if base is None or base.empty:
+        return novos
+    if novos.empty:
+        return base[~base["status"].isin(status_completos)]
+
+    base = base[~base["status"].isin(status_completos)]
+    if "id" in novos.columns and "id" in base.columns:
+        base = base[~base["id"].isin(novos["id"])]
+    return pd.concat([novos, base], ignore_index=True)
+
+
+def extrair_incremental(tipo, status=None, max_workers=None, sessao=None):
+    """Baixa apenas a janela alterada de cada status e mescla com a base local.
+
+    Retorna a lista de DataFrames por status (mesmo formato de
+    ``baixar_exportacoes``), já com o histórico anterior incorporado.
+    """
+    status = status or status_list
+    agora = datetime.now()
+    watermarks = ler_json(_caminho_watermarks(), {})
+    base = ler_parquet(_caminho_base(tipo))
+    janelas = calcular_janelas(tipo, watermarks, agora, status) if base is not None else {s: (None, None) for s in status}
+
+    completos = [s for s, (inicio, _) in janelas.items() if inicio is None]
+    print(f"🔄 Modo incremental: {len(completos)} status com carga completa, {len(status) - len(completos)} por janela")
+
+    resultados = baixar_exportacoes_por_status(tipo, status, janelas, max_workers, sessao)
+    baixados = {s: df for s, df in resultados.items() if df is not None}
+
+    novos = pd.concat(baixados.values(), ignore_index=True) if baixados else pd.DataFrame()
+    status_completos = [s for s in completos if s in baixados]
+    consolidado = mesclar_por_id(base, novos, status_completos)
+
+    if consolidado is None or consolidado.empty:
+        return []
+
+    salvar_parquet(consolidado, _caminho_base(tipo))
+
+    marcas_tipo = watermarks.setdefault(tipo, {})
+    for status_atual in baixados:
+        marca = marcas_tipo.setdefault(status_atual, {})
+        marca["ultima_execucao"] = agora.isoformat()
+        if status_atual in status_completos:
+            marca["ultima_completa"] = agora.isoformat()
+    _salvar_marcas(tipo, marcas_tipo)
+
+    # Mantém a ordem de status_list para o drop_duplicates(keep='first') posterior
+    return [consolidado[consolidado["status"] == s] for s in status if (consolidado["status"] == s).any()]
@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Colunas (já tipadas) que o cálculo usa
+colunas_kpis = ['paid', 'tipo', 'status', 'lastAcquittanceDate', 'dueDate', 'categoriesRatio.category']
+
+# Variação mês a mês acima da qual uma categoria é destacada no prompt
+LIMITE_ALTA = 0.3
+
+
+@dataclass
+class ResultadoKPIs:
+    """Métricas do ano corrente consumidas pelo prompt do IA.py"""
+    total_recebido: float
+    total_pago: float
+    total_pendente_receita: float
+    total_pendente_despesa: float
+    saldo_liquido: float
+    top_categorias: dict
+    resumo_trimestral: pd.DataFrame
+    categorias_com_alta: dict
+    fluxo_caixa: pd.DataFrame
+    rentabilidade: pd.DataFrame
+    inadimplencia: float
+    linhas: int
+
+
+def _periodos(ordinais, freq='M'):
+    return pd.PeriodIndex.from_ordinals(np.asarray(ordinais, dtype='int64'), freq='M').asfreq(freq)
+
+
+def _agregar(df, hoje):
+    """Única passada sobre as linhas: soma todas as medidas por mês × tipo × categoria"""
+    data = df['lastAcquittanceDate']
+    paid = pd.to_numeric(df['paid'], errors='coerce').to_numpy(dtype='float64')
+    receita = (df['tipo'] == 'Receita').to_numpy(dtype=bool)
+    atrasado = (df['status'] == 'OVERDUE').fillna(False).to_numpy(dtype=bool)
+    realizado = (data <= hoje).to_numpy(dtype=bool)
+    vencido = atrasado & (paid > 0) & (df['dueDate'] <= hoje).to_numpy(dtype=bool)
+    ajustado = np.where(receita, np.abs(paid), -np.abs(paid))
+
+    # NaN em ``paid`` continua NaN e é ignorado na soma, como no ``.sum()`` original
+    medidas = pd.DataFrame({
+        'mes': (data.dt.year.to_numpy() - 1970) * 12 + data.dt.month.to_numpy() - 1,
+        'tipo': df['tipo'].to_numpy(),
+        'categoria': df['categoriesRatio.category'].to_numpy(),
+        'paid': paid,
+        'pendente': np.where(atrasado, paid, 0.0),
+        'realizado': np.where(realizado, paid, 0.0),
+        'ajustado': np.where(realizado, ajustado, 0.0),
+        'vencido': np.where(vencido, paid, 0.0),
+        'n_realizado': realizado.astype('int64'),
+    })
+    return medidas.groupby(['mes', 'tipo', 'categoria'], dropna=False, sort=True).sum().reset_index()
+
+
+def calcular_kpis(df, ano=None, hoje=None):
+    """Calcula todas as métricas do IA.py para ``ano`` (padrão: ano de ``hoje``).
+
+    As linhas são percorridas uma única vez; resumos mensais, trimestrais e por
+    categoria saem do agregado (poucas centenas de linhas).
+    """
+    hoje = pd.Timestamp(hoje or datetime.today().date())
+    ano = hoje.year if ano is None else ano
+    df = df[df['lastAcquittanceDate'].dt.year == ano]
+    agregado = _agregar(df, hoje)
+
+    por_tipo = agregado.groupby('tipo').sum(numeric_only=True)
+
+    def total(coluna, tipo):
+        return float(por_tipo[coluna].get(tipo, 0.0))
+
+    total_recebido = total('paid', 'Receita')
+    total_pago = total('paid', 'Despesa')
+    total_vencido = total('vencido', 'Receita')
+
+    # value_counts desempata pela ordem de aparição, como no IA.py original
+    top_categorias = df['categoriesRatio.category'].value_counts().head(3).to_dict()
+
+    # Resumo trimestral: valores pagos por tipo
+    trimestral = agregado.assign(Trimestre=_periodos(agregado['mes'], 'Q'))
+    resumo_trimestral = trimestral.groupby(['Trimestre', 'tipo'])[['paid']].sum().unstack(fill_value=0)
+
+    # Variação mensal por categoria
+    mensal_categoria = (
+        agregado.dropna(subset=['categoria'])
+                .groupby(['mes', 'categoria'])['paid'].sum()
+                .unstack(fill_value=0)
+    )
+    mensal_categoria.index = _periodos(mensal_categoria.index).rename('AnoMes')
+    variacao = mensal_categoria.pct_change().fillna(0)
+    categorias_com_alta = {
+        mes: linha[linha > LIMITE_ALTA].round(4).to_dict() for mes, linha in variacao.iterrows()
+    }
+
+    # Fluxo de caixa e rentabilidade consideram só as transações já realizadas
+    # Sem tipo entra no caixa como saída (-abs), como no original
+    por_mes_tipo = agregado.groupby(['mes', 'tipo'], dropna=False)[['realizado', 'ajustado', 'n_realizado']].sum()
+    por_mes = por_mes_tipo.groupby(level='mes').sum()
+    por_mes = por_mes[por_mes['n_realizado'] > 0]
+
+    fluxo_caixa = pd.DataFrame({
+        'AnoMes_Caixa': _periodos(por_mes.index),
+        'valor_ajustado': por_mes['ajustado'].to_numpy(),
+    })
+    fluxo_caixa['saldo_acumulado'] = fluxo_caixa['valor_ajustado'].cumsum()
+
+    # Rentabilidade: só meses com Receita ou Despesa realizada (merge outer do original)
+    tipos = por_mes_tipo[por_mes_tipo.index.get_level_values('tipo').isin(['Receita', 'Despesa'])]
+    tipos = tipos[tipos['n_realizado'] > 0]
+    realizado = tipos['realizado'].unstack(fill_value=0).reindex(columns=['Receita', 'Despesa'], fill_value=0)
+    rentabilidade = pd.DataFrame({
+        'AnoMes': _periodos(realizado.index),
+        'paid_receita': realizado['Receita'].to_numpy(dtype='float64'),
+        'paid_despesa': realizado['Despesa'].to_numpy(dtype='float64'),
+    })
+    rentabilidade['lucro'] = rentabilidade['paid_receita'] - rentabilidade['paid_despesa']
+    rentabilidade['margem_lucro'] = rentabilidade['lucro'] / rentabilidade['paid_receita'].replace(0, np.nan)
+
+    return ResultadoKPIs(
+        total_recebido=total_recebido,
+        total_pago=total_pago,
+        total_pendente_receita=total('pendente', 'Receita'),
+        total_pendente_despesa=total('pendente', 'Despesa'),
+        saldo_liquido=total_recebido - total_pago,
+        top_categorias=top_categorias,
+        resumo_trimestral=resumo_trimestral,
+        categorias_com_alta=categorias_com_alta,
+        fluxo_caixa=fluxo_caixa,
+        rentabilidade=rentabilidade,
+        inadimplencia=total_vencido / total_recebido if total_recebido else 0,
+        linhas=len(df),
+    )
@@ -0,0 +1,93 @@
+import os
+from io import BytesIO
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+# ===================== Configurações =====================
+# auto = calamine se instalado, senão openpyxl em streaming
+XLSX_ENGINE = os.getenv("XLSX_ENGINE", "auto")
+
+
+def calamine_disponivel():
+    try:
+        import python_calamine  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _converter_valor(valor, codigos_erro):
+    # Mesmas regras do leitor openpyxl do pandas: vazio → "", erro → NaN, float inteiro → int
+    if valor is None:
+        return ""
+    tipo = type(valor)
+    if tipo is float:
+        return int(valor) if valor.is_integer() else valor
+    if tipo is str and valor in codigos_erro:
+        return float("nan")
+    return valor
+
+
+def ler_openpyxl_streaming(buffer):
+    """Lê a primeira aba em modo read-only, linha a linha, e infere os tipos como o pd.read_excel"""
+    from openpyxl import load_workbook
+    from openpyxl.cell.cell import ERROR_CODES
+
+    codigos_erro = frozenset(ERROR_CODES)
+    workbook = load_workbook(buffer, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook.worksheets[0]
+        sheet.reset_dimensions()
+
+        dados = []
+        ultima_com_dados = -1
+        for numero, linha in enumerate(sheet.iter_rows(values_only=True)):
+            convertida = [_converter_valor(v, codigos_erro) for v in linha]
+            while convertida and convertida[-1] == "":
+                convertida.pop()
+            if convertida:
+                ultima_com_dados = numero
+            dados.append(convertida)
+    finally:
+        workbook.close()
+
+    dados = dados[: ultima_com_dados + 1]
+    if not dados:
+        return pd.DataFrame()
+
+    largura = max(len(linha) for linha in dados)
+    dados = [linha + [""] * (largura - len(linha)) if len(linha) < largura else linha for linha in dados]
+
+    with TextParser(dados, header=0) as parser:
+        return parser.read()
+
+
+def ler_calamine(buffer):
+    return pd.read_excel(buffer, engine="calamine")
+
+
+def ler_openpyxl(buffer):
+    return pd.read_excel(buffer, engine="openpyxl")
+
+
+engines = {
+    "calamine": ler_calamine,
+    "openpyxl_streaming": ler_openpyxl_streaming,
+    "openpyxl": ler_openpyxl,
+}
+
+
+def escolher_engine(engine=None):
+    engine = engine or XLSX_ENGINE
+    if engine == "auto":
+        return "calamine" if calamine_disponivel() else "openpyxl_streaming"
+    if engine not in engines:
+        raise ValueError(f"Engine XLSX desconhecida: {engine} (opções: auto, {', '.join(engines)})")
+    return engine
+
+
+def ler_xlsx(conteudo, engine=None):
+    """Converte os bytes (ou buffer) de uma exportação XLSX em DataFrame com a engine escolhida"""
+    buffer = BytesIO(conteudo) if isinstance(conteudo, (bytes, bytearray)) else conteudo
+    return engines[escolher_engine(engine)](buffer)
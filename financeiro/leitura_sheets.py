@@ -0,0 +1,113 @@
+import os
+from itertools import zip_longest
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from financeiro.clientes_google import abrir_planilha, garantir_token
+from financeiro.datas import converter_datas
+from financeiro.esquema import FORMATO_DATA_PLANILHA, aplicar_esquema, colunas_data, colunas_valor, padrao_valor_centro
+from financeiro.metricas import propagar
+from financeiro.sheets import letra_coluna
+from financeiro.transformacoes import aplicar_em_unicos
+from financeiro.uploader import com_retry
+
+# ===================== Configurações =====================
+# Linhas por chamada values.batchGet (abas grandes são lidas em janelas paralelas)
+LEITURA_MAX_LINHAS = int(os.getenv("SHEETS_LEITURA_MAX_LINHAS", "50000"))
+LEITURA_PARALELO = int(os.getenv("SHEETS_LEITURA_PARALELO", "4"))
+
+# Dia zero dos números de série de data do Sheets
+EPOCA_SHEETS = pd.Timestamp("1899-12-30")
+
+# O que o astype(str) dos envios com RAW grava no lugar de células vazias
+TEXTOS_VAZIOS = ["", "nan", "None"]
+
+
+# ===================== Chamadas =====================
+def _primeira_aba(spreadsheet_id):
+    """Planilha do gspread e título e tamanho da grade da primeira aba (uma chamada de metadados)"""
+    planilha = com_retry(abrir_planilha, spreadsheet_id, api="sheets_leitura")
+    aba = planilha.primeira_aba
+    return planilha, aba.title, aba.row_count, aba.col_count
+
+
+def _ler_janela(planilha, intervalo):
+    """Colunas (listas de células) do intervalo, com valores crus e datas como número de série"""
+    resposta = com_retry(planilha.values_batch_get, [intervalo], {
+        "majorDimension": "COLUMNS",
+        "valueRenderOption": "UNFORMATTED_VALUE",
+        "dateTimeRenderOption": "SERIAL_NUMBER",
+    }, api="sheets_leitura")
+    faixas = resposta.get("valueRanges", [])
+    return faixas[0].get("values", []) if faixas else []
+
+
+# ===================== Montagem =====================
+def _montar(janelas):
+    """DataFrame a partir das janelas em colunas; a primeira linha da primeira janela é o cabeçalho"""
+    cabecalho = [str(coluna[0]) if coluna else "" for coluna in janelas[0]]
+    colunas = {nome: [] for nome in cabecalho}
+    for indice, janela in enumerate(janelas):
+        dados = [coluna[1:] for coluna in janela] if indice == 0 else janela
+        # O Sheets corta as células vazias no fim de cada coluna
+        altura = max((len(coluna) for coluna in dados), default=0)
+        for nome, celulas in zip_longest(cabecalho, dados[:len(cabecalho)], fillvalue=[]):
+            colunas[nome].extend(celulas)
+            colunas[nome].extend([None] * (altura - len(celulas)))
+    df = pd.DataFrame(colunas, dtype=object).replace("", None)
+    return df.dropna(how="all").reset_index(drop=True)
+
+
+def _datas(valores):
+    numeros = pd.to_numeric(valores, errors="coerce")
+    por_serie = EPOCA_SHEETS + pd.to_timedelta(numeros, unit="D")
+    por_texto = converter_datas(valores.where(numeros.isna()), FORMATO_DATA_PLANILHA)
+    return por_serie.where(numeros.notna(), por_texto)
+
+
+def tipar(df):
+    """Aplica o esquema conhecido: datas (série ou dd/mm/aaaa), valores numéricos, texto e categorias.
+
+    Células vazias e os "nan"/"None" gravados pelo astype(str) voltam como NaN.
+    """
+    for coluna in df.columns:
+        serie = df[coluna]
+        if coluna in colunas_data:
+            df[coluna] = aplicar_em_unicos(serie, _datas)
+        elif coluna in colunas_valor or padrao_valor_centro.match(coluna):
+            df[coluna] = pd.to_numeric(serie, errors="coerce").astype("float64")
+        else:
+            serie = serie.mask(serie.isna() | serie.isin(TEXTOS_VAZIOS))
+            df[coluna] = serie.where(serie.isna(), serie.astype(str))
+    return aplicar_esquema(df)
+
+
+# ===================== Leitura =====================
+def ler_planilhas(ids):
+    """Lê a primeira aba de cada planilha de ``ids`` ({nome: spreadsheet_id}) em paralelo.
+
+    Cada aba é dividida em janelas de ``LEITURA_MAX_LINHAS`` linhas e todas as
+    janelas, de todas as planilhas, são pedidas ao mesmo tempo. Retorna
+    ``{nome: DataFrame}`` já tipado, sem inferência de tipos nem formatação local.
+    """
+    garantir_token()
+    with ThreadPoolExecutor(max_workers=LEITURA_PARALELO) as executor:
+        abas = dict(zip(ids, executor.map(propagar(_primeira_aba), ids.values())))
+
+        pedidos = {}
+        for nome, (planilha, titulo, linhas, colunas) in abas.items():
+            ultima = letra_coluna(max(colunas, 1))
+            titulo = titulo.replace("'", "''")
+            pedidos[nome] = [
+                executor.submit(propagar(_ler_janela), planilha,
+                                f"'{titulo}'!A{inicio}:{ultima}{min(inicio + LEITURA_MAX_LINHAS - 1, max(linhas, 1))}")
+                for inicio in range(1, max(linhas, 1) + 1, LEITURA_MAX_LINHAS)
+            ]
+
+        resultado = {}
+        for nome, futuros in pedidos.items():
+            df = tipar(_montar([futuro.result() for futuro in futuros]))
+            print(f"  📥 {nome}: {len(df)} registros lidos do Sheets ({len(futuros)} janelas)")
+            resultado[nome] = df
+    return resultado
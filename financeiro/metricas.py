@@ -0,0 +1,247 @@
+import os
+import sys
+import json
+import time
+import uuid
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+
+from financeiro.armazenamento import CACHE_DIR
+
+# ===================== Configurações =====================
+# Log JSON-lines com uma linha por etapa concluída (persistido no .cache entre execuções;
+# as pastas só são criadas na primeira gravação)
+METRICAS_LOG = os.getenv("METRICAS_LOG") or os.path.join(CACHE_DIR, "metricas", "execucoes.jsonl")
+# Arquivo no formato textfile do Prometheus (node_exporter --collector.textfile.directory)
+METRICAS_PROM_DIR = os.getenv("METRICAS_PROM_DIR") or os.path.dirname(METRICAS_LOG)
+METRICAS_LOG_MAX_MB = float(os.getenv("METRICAS_LOG_MAX_MB", "20"))
+# Intervalo da amostragem de memória (RSS) enquanto alguma etapa está aberta
+AMOSTRA_MEMORIA_S = float(os.getenv("METRICAS_AMOSTRA_MS", "50")) / 1000
+
+# Identificador compartilhado por todas as etapas do mesmo processo
+EXECUCAO = os.getenv("METRICAS_EXECUCAO") or f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+SCRIPT = os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0] or "python"
+
+_etapa_atual = contextvars.ContextVar("etapa_atual", default=None)
+_trava = threading.Lock()
+_ultimas = {}
+
+
+def nova_execucao(prefixo=None):
+    """Troca o identificador de execução (processos longos, como o agendador, medem várias execuções)"""
+    global EXECUCAO
+    EXECUCAO = f"{prefixo + '-' if prefixo else ''}{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+    return EXECUCAO
+
+
+class Etapa:
+    """Medidas de uma etapa; contadores somados também nas etapas externas"""
+
+    def __init__(self, nome, pai=None, **rotulos):
+        self.nome = nome
+        self.pai = pai
+        self.rotulos = {k: str(v) for k, v in rotulos.items()}
+        self.linhas_entrada = None
+        self.linhas_saida = None
+        self.contadores = {}
+        # RSS (bytes) no início da etapa e o maior valor amostrado enquanto ela esteve aberta
+        self.rss_inicio = None
+        self.rss_pico = None
+        self._trava = threading.Lock()
+
+    def contar(self, nome, valor=1):
+        etapa = self
+        while etapa is not None:
+            with etapa._trava:
+                etapa.contadores[nome] = etapa.contadores.get(nome, 0) + valor
+            etapa = etapa.pai
+
+
+def contar(nome, valor=1):
+    """Soma ``valor`` ao contador ``nome`` da etapa em andamento (sem etapa, não faz nada)"""
+    etapa = _etapa_atual.get()
+    if etapa is not None:
+        etapa.contar(nome, valor)
+
+
+def propagar(funcao):
+    """Envolve ``funcao`` para rodar em outra thread dentro da etapa atual (para executor.map/submit)"""
+    contexto = contextvars.copy_context()
+    return lambda *args, **kwargs: contexto.copy().run(funcao, *args, **kwargs)
+
+
+# ===================== Memória por etapa =====================
+_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _rss_bytes():
+    """RSS atual do processo (Linux); ``None`` onde /proc não existe"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGINA
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _Amostrador:
+    """Lê o RSS numa thread enquanto há etapas abertas e guarda o pico de cada uma.
+
+    O ru_maxrss é o pico do processo inteiro: com A0, A1/A2 e A6 no mesmo
+    processo, toda etapa herdaria o pico das anteriores. Aqui cada etapa
+    registra o quanto o RSS subiu acima do valor que tinha quando ela começou.
+    """
+
+    def __init__(self):
+        self.abertas = set()
+        self._thread = None
+        self._trava = threading.Lock()
+
+    def abrir(self, medida):
+        medida.rss_inicio = medida.rss_pico = _rss_bytes()
+        if medida.rss_inicio is None:
+            return
+        with self._trava:
+            self.abertas.add(medida)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._rodar, name="metricas-memoria", daemon=True)
+                self._thread.start()
+
+    def fechar(self, medida):
+        """Pico da etapa acima do RSS inicial, em MB (``None`` sem medida de RSS)"""
+        self._amostrar()
+        with self._trava:
+            self.abertas.discard(medida)
+        if medida.rss_inicio is None:
+            return None
+        return round(max(medida.rss_pico - medida.rss_inicio, 0) / 1024 / 1024, 1)
+
+    def _amostrar(self):
+        rss = _rss_bytes()
+        if rss is None:
+            return
+        with self._trava:
+            for medida in self.abertas:
+                medida.rss_pico = max(medida.rss_pico, rss)
+
+    def _rodar(self):
+        while True:
+            with self._trava:
+                # Sem etapas abertas a thread termina; a próxima etapa inicia outra
+                if not self.abertas:
+                    self._thread = None
+                    return
+            self._amostrar()
+            time.sleep(AMOSTRA_MEMORIA_S)
+
+
+_amostrador = _Amostrador()
+
+
+def _mb(valor):
+    return round(valor / 1024 / 1024, 1) if valor is not None else None
+
+
+@contextmanager
+def etapa(nome, **rotulos):
+    """Mede uma etapa: ``with etapa("transformacao", tipo="EXPENSE") as m: m.linhas_saida = len(df)``"""
+    pai = _etapa_atual.get()
+    if pai is not None:
+        nome = f"{pai.nome}.{nome}"
+        rotulos = {**pai.rotulos, **rotulos}
+    medida = Etapa(nome, pai, **rotulos)
+    token = _etapa_atual.set(medida)
+    _amostrador.abrir(medida)
+    inicio, relogio = datetime.now(), time.perf_counter()
+    erro = None
+    try:
+        yield medida
+    except BaseException as e:
+        erro = e
+        raise
+    finally:
+        _etapa_atual.reset(token)
+        pico = _amostrador.fechar(medida)
+        registrar({
+            "execucao": EXECUCAO,
+            "script": SCRIPT,
+            "etapa": medida.nome,
+            "rotulos": medida.rotulos,
+            "inicio": inicio.isoformat(timespec="seconds"),
+            "fim": datetime.now().isoformat(timespec="seconds"),
+            "duracao_s": round(time.perf_counter() - relogio, 3),
+            "linhas_entrada": medida.linhas_entrada,
+            "linhas_saida": medida.linhas_saida,
+            "contadores": dict(medida.contadores),
+            "memoria_inicio_mb": _mb(medida.rss_inicio),
+            "pico_memoria_mb": pico,
+            "sucesso": erro is None,
+            "erro": f"{type(erro).__name__}: {erro}" if erro is not None else None,
+        }, raiz=pai is None)
+
+
+def _limitar_log():
+    # Descarta a metade mais antiga quando o log passa do limite
+    if os.path.getsize(METRICAS_LOG) <= METRICAS_LOG_MAX_MB * 1024 * 1024:
+        return
+    with open(METRICAS_LOG, encoding="utf-8") as f:
+        linhas = f.readlines()
+    with open(METRICAS_LOG, "w", encoding="utf-8") as f:
+        f.writelines(linhas[len(linhas) // 2:])
+
+
+def registrar(registro, raiz=True):
+    """Acrescenta o registro ao log JSON-lines e, ao fim de uma etapa externa, regrava o textfile"""
+    try:
+        with _trava:
+            os.makedirs(os.path.dirname(os.path.abspath(METRICAS_LOG)), exist_ok=True)
+            with open(METRICAS_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+            _ultimas[(registro["etapa"], tuple(sorted(registro["rotulos"].items())))] = registro
+            _limitar_log()
+            if raiz:
+                _escrever_prometheus()
+    except OSError as e:
+        # Métricas nunca devem derrubar a execução
+        print(f"  ⚠️ Não foi possível gravar métricas: {e}")
+
+
+def _rotulos_prom(rotulos):
+    def escapar(valor):
+        return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escapar(v)}"' for k, v in rotulos.items()) + "}"
+
+
+def _escrever_prometheus():
+    series = {}
+
+    def adicionar(metrica, rotulos, valor):
+        if valor is not None:
+            series.setdefault(metrica, []).append(f"{metrica}{_rotulos_prom(rotulos)} {valor}")
+
+    for registro in _ultimas.values():
+        base = {"script": registro["script"], "etapa": registro["etapa"], **registro["rotulos"]}
+        adicionar("financeiro_etapa_duracao_segundos", base, registro["duracao_s"])
+        adicionar("financeiro_etapa_linhas_entrada", base, registro["linhas_entrada"])
+        adicionar("financeiro_etapa_linhas_saida", base, registro["linhas_saida"])
+        if registro["pico_memoria_mb"] is not None:
+            adicionar("financeiro_etapa_pico_memoria_bytes", base, int(registro["pico_memoria_mb"] * 1024 * 1024))
+        adicionar("financeiro_etapa_sucesso", base, int(registro["sucesso"]))
+        adicionar("financeiro_etapa_fim_timestamp_segundos", base, round(datetime.fromisoformat(registro["fim"]).timestamp()))
+        for contador, valor in registro["contadores"].items():
+            # "chamadas_api.sheets" → financeiro_etapa_chamadas_api{api="sheets"}
+            nome, _, api = contador.partition(".")
+            adicionar(f"financeiro_etapa_{nome}", {**base, "api": api} if api else base, valor)
+
+    linhas = []
+    for metrica, valores in sorted(series.items()):
+        linhas.append(f"# TYPE {metrica} gauge")
+        linhas.extend(valores)
+
+    caminho = os.path.join(METRICAS_PROM_DIR, f"financeiro_{SCRIPT}.prom")
+    os.makedirs(METRICAS_PROM_DIR, exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write("\n".join(linhas) + "\n")
+    os.replace(temporario, caminho)
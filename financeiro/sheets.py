@@ -0,0 +1,184 @@
+import json
+import numbers
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from financeiro.clientes_google import executar
+from financeiro.metricas import contar
+
+
+def letra_coluna(numero):
+    """1 → A, 27 → AA"""
+    letras = ""
+    while numero > 0:
+        numero, resto = divmod(numero - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def _valor_celula(valor):
+    # Mesma representação do set_with_dataframe: vazio → "", números mantidos, resto como texto
+    if valor is None or (not isinstance(valor, (list, tuple, np.ndarray)) and pd.isna(valor)):
+        return ""
+    if isinstance(valor, (bool, np.bool_)):
+        return bool(valor)
+    if isinstance(valor, numbers.Integral):
+        return int(valor)
+    if isinstance(valor, numbers.Real):
+        return float(valor)
+    if isinstance(valor, (datetime, date)):
+        return str(valor)
+    return str(valor)
+
+
+def valores_celula(df):
+    """DataFrame de objetos Python serializáveis em JSON, prontos para a API do Sheets"""
+    return df.astype(object).map(_valor_celula)
+
+
+def pedido_inserir_colunas(sheet_id, posicao, quantidade):
+    """insertDimension que abre ``quantidade`` colunas vazias na ``posicao`` (base 0), deslocando as seguintes"""
+    return {"insertDimension": {
+        "range": {"sheetId": sheet_id, "dimension": "COLUMNS", "startIndex": posicao, "endIndex": posicao + quantidade},
+        "inheritFromBefore": posicao > 0,
+    }}
+
+
+# ===================== Destinos =====================
+class DestinoApi:
+    """Aba de uma planilha acessada pelo cliente googleapiclient (sheets v4).
+
+    Os pedidos passam por ``clientes_google.executar``: cada thread usa o
+    próprio transporte HTTP autenticado (o httplib2 não é thread-safe), com o
+    timeout de GOOGLE_TIMEOUT, o que permite enviar blocos em paralelo.
+    """
+
+    # Um transporte por thread, criado pela fábrica compartilhada
+    thread_safe = True
+
+    def __init__(self, sheets_service, spreadsheet_id, aba=None):
+        self.service = sheets_service
+        self.spreadsheet_id = spreadsheet_id
+        self._aba = aba
+        self._propriedades = None
+
+    def _executar(self, pedido):
+        if pedido.body:
+            contar("bytes_enviados", len(pedido.body))
+        return executar(pedido)
+
+    def _carregar_propriedades(self):
+        if self._propriedades is None:
+            resposta = self._executar(self.service.spreadsheets().get(
+                spreadsheetId=self.spreadsheet_id, fields="sheets.properties"
+            ))
+            abas = [s["properties"] for s in resposta["sheets"]]
+            self._propriedades = next((p for p in abas if p["title"] == self._aba), abas[0])
+        return self._propriedades
+
+    @property
+    def titulo(self):
+        return self._aba or self._carregar_propriedades()["title"]
+
+    @property
+    def chave_snapshot(self):
+        return f"{self.spreadsheet_id}_{self._aba or 'primeira_aba'}"
+
+    def intervalo(self, a1):
+        return f"'{self.titulo}'!{a1}"
+
+    def ler(self, a1, valores_crus=False):
+        opcoes = {"valueRenderOption": "UNFORMATTED_VALUE"} if valores_crus else {}
+        resposta = self._executar(self.service.spreadsheets().values().get(
+            spreadsheetId=self.spreadsheet_id, range=self.intervalo(a1), **opcoes
+        ))
+        return resposta.get("values", [])
+
+    def atualizar_lote(self, dados, value_input_option):
+        self._executar(self.service.spreadsheets().values().batchUpdate(
+            spreadsheetId=self.spreadsheet_id,
+            body={"valueInputOption": value_input_option, "data": dados}
+        ))
+
+    def limpar_lote(self, intervalos):
+        self._executar(self.service.spreadsheets().values().batchClear(
+            spreadsheetId=self.spreadsheet_id, body={"ranges": intervalos}
+        ))
+
+    def garantir_grade(self, linhas, colunas):
+        propriedades = self._carregar_propriedades()
+        grade = propriedades.get("gridProperties", {})
+        pedidos = []
+        for dimensao, atual, necessario in [("ROWS", grade.get("rowCount", 0), linhas),
+                                             ("COLUMNS", grade.get("columnCount", 0), colunas)]:
+            if necessario > atual:
+                pedidos.append({"appendDimension": {
+                    "sheetId": propriedades["sheetId"], "dimension": dimensao, "length": necessario - atual
+                }})
+        if pedidos:
+            self._executar(self.service.spreadsheets().batchUpdate(
+                spreadsheetId=self.spreadsheet_id, body={"requests": pedidos}
+            ))
+            grade["rowCount"] = max(grade.get("rowCount", 0), linhas)
+            grade["columnCount"] = max(grade.get("columnCount", 0), colunas)
+
+    def inserir_colunas(self, posicao, quantidade):
+        propriedades = self._carregar_propriedades()
+        self._executar(self.service.spreadsheets().batchUpdate(
+            spreadsheetId=self.spreadsheet_id,
+            body={"requests": [pedido_inserir_colunas(propriedades["sheetId"], posicao, quantidade)]}
+        ))
+        grade = propriedades.setdefault("gridProperties", {})
+        grade["columnCount"] = grade.get("columnCount", 0) + quantidade
+
+    def limpar_tudo(self):
+        self._executar(self.service.spreadsheets().values().clear(
+            spreadsheetId=self.spreadsheet_id, range=f"'{self.titulo}'"
+        ))
+
+
+class DestinoGspread:
+    """Aba acessada pelo gspread (usado no A6)"""
+
+    # A sessão requests do gspread pode ser compartilhada entre threads
+    thread_safe = True
+
+    def __init__(self, worksheet):
+        self.worksheet = worksheet
+        self.planilha = worksheet.spreadsheet
+        # Colunas inseridas por aqui (o col_count do worksheet não é atualizado pelo batch_update)
+        self._colunas_inseridas = 0
+
+    @property
+    def chave_snapshot(self):
+        return f"{self.planilha.id}_{self.worksheet.title}"
+
+    def intervalo(self, a1):
+        return f"'{self.worksheet.title}'!{a1}"
+
+    def ler(self, a1, valores_crus=False):
+        parametros = {"valueRenderOption": "UNFORMATTED_VALUE"} if valores_crus else None
+        return self.planilha.values_get(self.intervalo(a1), params=parametros).get("values", [])
+
+    def atualizar_lote(self, dados, value_input_option):
+        # O gspread serializa internamente; o tamanho é estimado com o mesmo JSON
+        contar("bytes_enviados", len(json.dumps(dados, ensure_ascii=False).encode("utf-8")))
+        self.planilha.values_batch_update({"valueInputOption": value_input_option, "data": dados})
+
+    def limpar_lote(self, intervalos):
+        self.planilha.values_batch_clear(body={"ranges": intervalos})
+
+    def garantir_grade(self, linhas, colunas):
+        colunas_atuais = self.worksheet.col_count + self._colunas_inseridas
+        if linhas > self.worksheet.row_count or colunas > colunas_atuais:
+            self.worksheet.resize(rows=max(linhas, self.worksheet.row_count), cols=max(colunas, colunas_atuais))
+            self._colunas_inseridas = 0
+
+    def inserir_colunas(self, posicao, quantidade):
+        self.planilha.batch_update({"requests": [pedido_inserir_colunas(self.worksheet.id, posicao, quantidade)]})
+        self._colunas_inseridas += quantidade
+
+    def limpar_tudo(self):
+        self.worksheet.clear()
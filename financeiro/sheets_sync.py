@@ -0,0 +1,175 @@
+import os
+import math
+
+import pandas as pd
+
+from financeiro.armazenamento import caminho_cache, ler_parquet, salvar_parquet
+from financeiro.sheets import letra_coluna, valores_celula
+from financeiro.uploader import com_retry, enviar_em_blocos
+
+# ===================== Configurações =====================
+# Liga a sincronização por diferença (0 = limpa e reescreve a aba inteira, como antes)
+SYNC_DIFERENCIAL = os.getenv("SHEETS_SYNC_DIFERENCIAL", "0") == "1"
+# Limites de cada chamada values.batchUpdate
+MAX_INTERVALOS_POR_LOTE = 500
+MAX_LINHAS_POR_LOTE = 5000
+
+
+# ===================== Sincronização =====================
+def _chaves(texto, colunas):
+    """Chave única por linha; repetições da mesma chave recebem um sufixo de ocorrência"""
+    chave = texto[colunas[0]]
+    for col in colunas[1:]:
+        chave = chave + "|" + texto[col]
+    return chave + "#" + chave.groupby(chave).cumcount().astype(str)
+
+
+def _texto_chave(valor):
+    """Texto comparável de uma célula da chave: números sem formatação (``123``, ``"123"`` e ``"123.0"`` iguais).
+
+    Com USER_ENTERED o Sheets guarda textos numéricos como número, que voltam
+    diferentes do texto do snapshot.
+    """
+    texto = str(valor)
+    try:
+        numero = float(texto)
+    except ValueError:
+        return texto
+    if not math.isfinite(numero):
+        return texto
+    return str(int(numero)) if numero.is_integer() else repr(numero)
+
+
+def _caminho_snapshot(destino):
+    return caminho_cache("sheets", f"{destino.chave_snapshot}.parquet")
+
+
+def _enviar_em_lotes(destino, dados, value_input_option):
+    lote, linhas = [], 0
+    for item in dados:
+        if lote and (len(lote) >= MAX_INTERVALOS_POR_LOTE or linhas + len(item["values"]) > MAX_LINHAS_POR_LOTE):
+            com_retry(destino.atualizar_lote, lote, value_input_option)
+            lote, linhas = [], 0
+        lote.append(item)
+        linhas += len(item["values"])
+    if lote:
+        com_retry(destino.atualizar_lote, lote, value_input_option)
+
+
+def sincronizar_aba(destino, df, chave="id", value_input_option="RAW"):
+    """Publica ``df`` na aba enviando só as linhas alteradas, inseridas e removidas.
+
+    Compara com o último snapshot publicado (salvo em ``.cache/sheets``) usando
+    ``chave`` (coluna ou lista de colunas). Linhas novas ocupam as posições das
+    removidas, e as últimas linhas são movidas para fechar buracos, então a
+    ordem na planilha pode diferir da ordem do DataFrame. Se não houver
+    snapshot, se as colunas mudarem ou se a coluna-chave da planilha não bater
+    com o snapshot (ex.: aba limpa por fora), faz a gravação completa.
+    Retorna um resumo com a quantidade de linhas enviadas.
+    """
+    colunas_chave = [chave] if isinstance(chave, str) else list(chave)
+    celulas = valores_celula(df).reset_index(drop=True)
+    texto = celulas.astype(str)
+    caminho = _caminho_snapshot(destino)
+
+    def completo(motivo):
+        print(f"  📝 Gravação completa ({motivo})")
+        enviar_em_blocos(destino, df, value_input_option)
+        salvar_parquet(texto, caminho)
+        return {"modo": "completo", "linhas_enviadas": len(df)}
+
+    if any(col not in texto.columns for col in colunas_chave):
+        return completo(f"coluna-chave {colunas_chave} ausente")
+
+    snapshot = ler_parquet(caminho)
+    if snapshot is None:
+        return completo("sem snapshot anterior")
+    if list(snapshot.columns) != list(texto.columns):
+        return completo("colunas alteradas")
+
+    # Confere se a planilha ainda está como deixamos (lê só a primeira coluna-chave)
+    posicao_chave = texto.columns.get_loc(colunas_chave[0]) + 1
+    letra_chave = letra_coluna(posicao_chave)
+    # Valores crus (sem a formatação da planilha), comparados com o snapshot pela mesma normalização
+    coluna_planilha = com_retry(destino.ler, f"{letra_chave}1:{letra_chave}", True, api="sheets_leitura")
+    coluna_planilha = [_texto_chave(linha[0]) if linha else "" for linha in coluna_planilha]
+    while coluna_planilha and coluna_planilha[-1] == "":
+        coluna_planilha.pop()
+    esperado = [_texto_chave(valor) for valor in [colunas_chave[0]] + snapshot[colunas_chave[0]].tolist()]
+    if coluna_planilha != esperado:
+        return completo("planilha diferente do último snapshot")
+
+    chaves_novas = _chaves(texto, colunas_chave)
+    chaves_antigas = _chaves(snapshot, colunas_chave)
+    novas_por_chave = pd.Series(range(len(chaves_novas)), index=chaves_novas.values)
+    posicao_antiga = {c: i for i, c in enumerate(chaves_antigas)}
+
+    # Alteradas: mesma chave, algum valor diferente
+    comuns = chaves_novas[chaves_novas.isin(chaves_antigas)]
+    antigas_alinhadas = snapshot.iloc[[posicao_antiga[c] for c in comuns]].reset_index(drop=True)
+    novas_alinhadas = texto.iloc[novas_por_chave[comuns.values].values].reset_index(drop=True)
+    diferentes = (antigas_alinhadas.values != novas_alinhadas.values).any(axis=1)
+    alteradas = comuns.values[diferentes]
+
+    conjunto_novas = set(chaves_novas)
+    layout = list(chaves_antigas)
+    buracos = sorted(i for i, c in enumerate(layout) if c not in conjunto_novas)
+    for i in buracos:
+        layout[i] = None
+    escritas = {posicao_antiga[c] for c in alteradas}
+
+    # Inseridas ocupam os buracos primeiro; o resto vai para o final
+    for c in chaves_novas[~chaves_novas.isin(chaves_antigas)]:
+        if buracos:
+            posicao = buracos.pop(0)
+            layout[posicao] = c
+        else:
+            posicao = len(layout)
+            layout.append(c)
+        escritas.add(posicao)
+
+    # Buracos restantes são fechados movendo as últimas linhas para cima
+    buracos_restantes = set(buracos)
+    while buracos_restantes:
+        ultima = len(layout) - 1
+        if ultima in buracos_restantes:
+            buracos_restantes.discard(ultima)
+            layout.pop()
+            continue
+        destino_linha = min(buracos_restantes)
+        buracos_restantes.discard(destino_linha)
+        layout[destino_linha] = layout.pop()
+        escritas.discard(ultima)
+        escritas.add(destino_linha)
+
+    n_antigo, n_novo = len(chaves_antigas), len(layout)
+    ultima_coluna = letra_coluna(len(texto.columns))
+    if n_novo > n_antigo:
+        com_retry(destino.garantir_grade, n_novo + 1, len(texto.columns))
+
+    # Agrupa posições contíguas em intervalos A{i}:{ultima}{j}
+    dados, sequencia = [], []
+    for posicao in sorted(escritas):
+        if sequencia and posicao != sequencia[-1] + 1:
+            dados.append(sequencia)
+            sequencia = []
+        sequencia.append(posicao)
+    if sequencia:
+        dados.append(sequencia)
+    dados = [{
+        "range": destino.intervalo(f"A{s[0] + 2}:{ultima_coluna}{s[-1] + 2}"),
+        "values": celulas.iloc[novas_por_chave[[layout[p] for p in s]].values].values.tolist()
+    } for s in dados]
+
+    if dados:
+        _enviar_em_lotes(destino, dados, value_input_option)
+    if n_novo < n_antigo:
+        com_retry(destino.limpar_lote, [destino.intervalo(f"A{n_novo + 2}:{ultima_coluna}{n_antigo + 1}")])
+
+    salvar_parquet(texto.iloc[novas_por_chave[layout].values].reset_index(drop=True), caminho)
+
+    inseridas = int((~chaves_novas.isin(chaves_antigas)).sum())
+    removidas = len(chaves_antigas) - len(comuns)
+    print(f"  🔁 Sincronização por diferença: {len(alteradas)} alteradas, {inseridas} inseridas, "
+          f"{removidas} removidas ({len(escritas)} linhas enviadas)")
+    return {"modo": "diferencial", "linhas_enviadas": len(escritas)}
@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+from financeiro.datas import FORMATO_ISO, MISTO, converter_datas, formatar_colunas
+from financeiro.esquema import FORMATO_DATA_PLANILHA
+
+# Campos de data do consolidado (gravados como YYYY-MM-DD nas planilhas do A6)
+campos_data = ['lastAcquittanceDate', 'financialEvent.competenceDate', 'dueDate']
+
+
+def aplicar_em_unicos(serie, funcao):
+    """Aplica ``funcao`` (vetorizada) só nos valores distintos e espalha o resultado.
+
+    Colunas de data e categoria têm poucos valores distintos em relação ao número
+    de linhas, então o parse custa proporcional aos distintos, não às linhas.
+    """
+    codigos, unicos = pd.factorize(serie)
+    convertidos = funcao(pd.Series(unicos, dtype=object))
+    vazio = funcao(pd.Series([np.nan], dtype=object)).iloc[0]
+    # O código -1 (valor ausente) cai na última posição, que guarda o resultado para vazio
+    tabela = np.append(convertidos.to_numpy(dtype=object), np.array([vazio], dtype=object))
+    return pd.Series(tabela[codigos], index=serie.index).astype(convertidos.dtype)
+
+
+def normalizar_datas(df, campos=None):
+    """Converte os campos de data (dd/mm/aaaa ou mistos) para datetime64; o formato fica para a gravação"""
+    print("📅 Convertendo campos de data para datetime...")
+    for campo in campos or campos_data:
+        if campo in df.columns:
+            df[campo] = converter_datas(df[campo], MISTO)
+    return df
+
+
+def corrigir_valor_categoria(df):
+    """Limita categoriesRatio.value ao valor pago quando o rateio passa do total"""
+    if 'categoriesRatio.value' in df.columns and 'paid' in df.columns:
+        print("💰 Corrigindo valores de categoriesRatio.value...")
+        valor, pago = df['categoriesRatio.value'], df['paid']
+        excedente = valor.notna() & pago.notna() & (valor > pago)
+        df['categoriesRatio.value'] = valor.where(~excedente, pago)
+    return df
+
+
+def colunas_centro_de_custo(df):
+    """Colunas 'Centro de Custo N' e 'Valor no Centro de Custo N' na ordem da planilha"""
+    centros = [col for col in df.columns if col.startswith("Centro de Custo ") and not col.startswith("Valor no Centro de Custo ")]
+    valores = [col for col in df.columns if col.startswith("Valor no Centro de Custo ")]
+    return centros, valores
+
+
+def tratar_centros_de_custo(df):
+    """Preenche 'Sem Centro de Custo' nos registros sem centro (e o valor, no Centro 1)"""
+    print("\n🔍 Verificando registros sem centro de custo...")
+
+    colunas_centro_custo, _ = colunas_centro_de_custo(df)
+    print(f"  Encontradas {len(colunas_centro_custo)} colunas de centro de custo para processar")
+
+    if not colunas_centro_custo or 'paid' not in df.columns:
+        print("  ⚠️ Colunas necessárias não encontradas para tratamento de centro de custo")
+        return df
+
+    total_registros_com_valor = 0
+    total_apenas_cc_preenchido = 0
+
+    for i, col_centro in enumerate(colunas_centro_custo, start=1):
+        col_valor = f"Valor no Centro de Custo {i}"
+        if col_valor not in df.columns:
+            print(f"  ⚠️ Coluna '{col_valor}' não encontrada, pulando...")
+            continue
+
+        # Normaliza a coluna de centro de custo (dependendo da versão do pandas, NaN vira 'nan')
+        centro = df[col_centro].astype(str).str.strip()
+        mask_centro_vazio = centro.isna() | (centro == '') | (centro == 'nan')
+
+        valor = df[col_valor]
+        mask_valor_vazio = valor.isna() | (valor == '') | (valor == 0)
+
+        # Caso 1 (apenas Centro 1): centro e valor vazios → centro + valor copiado de 'paid'
+        if i == 1:
+            mask_ambos_vazios = mask_centro_vazio & mask_valor_vazio
+            registros_ambos = int(mask_ambos_vazios.sum())
+            if registros_ambos > 0:
+                centro = centro.mask(mask_ambos_vazios, 'Sem Centro de Custo')
+                df[col_valor] = valor.mask(mask_ambos_vazios, df['paid'])
+                total_registros_com_valor += registros_ambos
+                print(f"  ✅ '{col_centro}': {registros_ambos} registros preenchidos (centro + valor copiado de 'paid')")
+
+        # Caso 2: centro vazio mas valor existe → preenche apenas o centro
+        mask_so_centro_vazio = mask_centro_vazio & ~mask_valor_vazio
+        registros_so_centro = int(mask_so_centro_vazio.sum())
+        if registros_so_centro > 0:
+            centro = centro.mask(mask_so_centro_vazio, 'Sem Centro de Custo')
+            total_apenas_cc_preenchido += registros_so_centro
+            print(f"  ✅ '{col_centro}': {registros_so_centro} registros preenchidos (apenas centro, valor mantido)")
+
+        df[col_centro] = centro
+
+    print(f"\n  📊 Resumo do tratamento:")
+    print(f"    Registros com centro + valor preenchidos (apenas Centro 1): {total_registros_com_valor}")
+    print(f"    Registros com apenas centro preenchido (todos os centros): {total_apenas_cc_preenchido}")
+    return df
+
+
+def limpar_consolidado(df):
+    """Etapa de limpeza do A6: datas, rateio de categoria e centros de custo"""
+    normalizar_datas(df)
+    corrigir_valor_categoria(df)
+    tratar_centros_de_custo(df)
+    return df
+
+
+def formatar_para_gravacao(df):
+    """Cópia rasa com as datas em texto para o Sheets.
+
+    Os ``campos_data`` saem em AAAA-MM-DD (normalizados pelo A6); as demais
+    colunas datetime64 (ex.: 'Data movimento', tipada no artefato ou na
+    leitura) voltam ao dd/mm/aaaa em que as planilhas de contas as gravaram.
+    """
+    outras = [coluna for coluna in df.columns
+              if coluna not in campos_data and pd.api.types.is_datetime64_any_dtype(df[coluna])]
+    saida = formatar_colunas(df, campos_data, FORMATO_ISO, np.nan)
+    return formatar_colunas(saida, outras, FORMATO_DATA_PLANILHA, np.nan)
+
+
+def _numero_slot(coluna):
+    return int(coluna.rsplit(" ", 1)[-1])
+
+
+def despivotar_centros_de_custo(df):
+    """Transforma os pares 'Centro de Custo N' / 'Valor no Centro de Custo N' em linhas.
+
+    Equivale ao melt duplo + merge por row_id/num que o A6 fazia, mas em uma
+    passada: os slots vazios são descartados antes de montar o DataFrame longo e
+    as colunas de identificação são copiadas uma única vez (um ``take`` só das
+    linhas mantidas), sem o join. Saída: colunas de identificação +
+    ``Centro_de_Custo_Unificado`` + ``paid_new`` (valor absoluto), com as linhas
+    agrupadas por slot como no melt.
+    """
+    colunas_centro_custo, colunas_valor = colunas_centro_de_custo(df)
+    valor_por_slot = {_numero_slot(col): col for col in colunas_valor}
+    colunas_id = [col for col in df.columns if col not in colunas_centro_custo + colunas_valor]
+    n = len(df)
+
+    posicoes, rotulos, centros, valores = [], [], [], []
+    for ordem, col_centro in enumerate(colunas_centro_custo):
+        centro = df[col_centro]
+        texto = centro.astype(str).str.strip()
+        preenchido = (centro.notna() & (texto != '') & (texto != 'nan')).to_numpy()
+        linhas = np.flatnonzero(preenchido)
+        if not len(linhas):
+            continue
+
+        col_valor = valor_por_slot.get(_numero_slot(col_centro))
+        if col_valor is not None:
+            valor = pd.to_numeric(df[col_valor].iloc[linhas], errors='coerce').abs().to_numpy()
+        else:
+            valor = np.full(len(linhas), np.nan)
+
+        posicoes.append(linhas)
+        rotulos.append(ordem * n + linhas)  # mesmo índice que o melt produziria
+        centros.append(centro.iloc[linhas])
+        valores.append(valor)
+
+    if not posicoes:
+        df_final = df[colunas_id].iloc[0:0].copy()
+        df_final['Centro_de_Custo_Unificado'] = pd.Series(dtype=object)
+        df_final['paid_new'] = pd.Series(dtype=float)
+        return df_final
+
+    posicoes = np.concatenate(posicoes)
+    df_final = df[colunas_id].take(posicoes)
+    df_final.index = pd.Index(np.concatenate(rotulos))
+    df_final['Centro_de_Custo_Unificado'] = pd.concat(centros, ignore_index=True).to_numpy()
+    df_final['paid_new'] = np.concatenate(valores)
+    return df_final
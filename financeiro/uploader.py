@@ -0,0 +1,187 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from financeiro.armazenamento import caminho_cache, ler_json, salvar_json
+from financeiro.cache_exportacoes import hash_dataframe
+from financeiro.cotas import chamar
+from financeiro.metricas import propagar
+from financeiro.sheets import letra_coluna, valores_celula
+
+# ===================== Configurações =====================
+UPLOAD_MAX_LINHAS = int(os.getenv("UPLOAD_MAX_LINHAS", "5000"))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(4 * 1024 * 1024)))
+# Escritas simultâneas por aba (a cota de escrita do Sheets é por minuto e por usuário)
+UPLOAD_PARALELO = int(os.getenv("UPLOAD_PARALELO", "3"))
+
+
+def com_retry(funcao, *args, api="sheets_escrita"):
+    """Executa a chamada dentro da cota da ``api`` (financeiro.cotas), repetindo em 429/5xx com backoff"""
+    return chamar(api, funcao, *args)
+
+
+def gerar_blocos(df, max_linhas=None, max_bytes=None):
+    """Gera ``(linha_inicial, valores)`` sem montar a lista completa de linhas.
+
+    Cada bloco tem no máximo ``max_linhas`` linhas; blocos cujo JSON passa de
+    ``max_bytes`` são divididos ao meio até caber. ``linha_inicial`` é o índice
+    (base 0) da primeira linha do bloco dentro do DataFrame.
+    """
+    max_linhas = max_linhas or UPLOAD_MAX_LINHAS
+    max_bytes = max_bytes or UPLOAD_MAX_BYTES
+
+    pendentes = [(inicio, min(inicio + max_linhas, len(df))) for inicio in range(0, len(df), max_linhas)]
+    pendentes.reverse()
+    while pendentes:
+        inicio, fim = pendentes.pop()
+        valores = valores_celula(df.iloc[inicio:fim]).values.tolist()
+        if fim - inicio > 1 and len(json.dumps(valores, ensure_ascii=False).encode("utf-8")) > max_bytes:
+            meio = (inicio + fim) // 2
+            pendentes += [(meio, fim), (inicio, meio)]
+            continue
+        yield inicio, valores
+
+
+def _caminho_progresso(chave_snapshot):
+    return caminho_cache("uploads", f"{chave_snapshot}.json")
+
+
+def envio_pendente(chave_snapshot):
+    """A aba tem um envio interrompido a retomar? (o A0 não a limpa, senão a retomada nunca acontece)"""
+    return os.path.exists(_caminho_progresso(chave_snapshot))
+
+
+def enviar_em_blocos(destino, df, value_input_option="RAW", max_linhas=None, max_bytes=None,
+                     paralelo=None, retomar=True):
+    """Limpa a aba e grava ``df`` em blocos, com escritas paralelas e retomada após falha.
+
+    O progresso (blocos já confirmados) fica em ``.cache/uploads``. Se a execução
+    anterior falhou no meio do envio do mesmo DataFrame e o cabeçalho ainda está
+    na planilha (o A0 mantém as abas com ``envio_pendente``), só os blocos que
+    faltam são enviados; senão a aba é limpa aqui e o envio recomeça.
+    """
+    max_linhas = max_linhas or UPLOAD_MAX_LINHAS
+    paralelo = paralelo or UPLOAD_PARALELO
+    if not getattr(destino, "thread_safe", False):
+        paralelo = 1
+
+    colunas = list(map(str, df.columns))
+    ultima_coluna = letra_coluna(max(len(colunas), 1))
+    caminho = _caminho_progresso(destino.chave_snapshot)
+    assinatura = hash_dataframe(df, value_input_option, max_linhas, max_bytes)
+
+    progresso = ler_json(caminho, {}) if retomar else {}
+    concluidos = set()
+    if progresso.get("assinatura") == assinatura:
+        cabecalho = com_retry(destino.ler, f"A1:{ultima_coluna}1", api="sheets_leitura")
+        if cabecalho and cabecalho[0] == colunas:
+            concluidos = set(progresso.get("concluidos", []))
+            print(f"  ↩️ Retomando envio: {len(concluidos)} blocos já confirmados")
+
+    if not concluidos:
+        com_retry(destino.limpar_tudo)
+        com_retry(destino.garantir_grade, len(df) + 1, len(colunas))
+        com_retry(destino.atualizar_lote, [{"range": destino.intervalo(f"A1:{ultima_coluna}1"), "values": [colunas]}],
+                   value_input_option)
+        progresso = {"assinatura": assinatura, "concluidos": []}
+        salvar_json(caminho, progresso)
+
+    def enviar(inicio, valores):
+        intervalo = destino.intervalo(f"A{inicio + 2}:{ultima_coluna}{inicio + 1 + len(valores)}")
+        com_retry(destino.atualizar_lote, [{"range": intervalo, "values": valores}], value_input_option)
+        return inicio
+
+    def confirmar(inicio):
+        concluidos.add(inicio)
+        progresso["concluidos"] = sorted(concluidos)
+        salvar_json(caminho, progresso)
+
+    enviados = 0
+    # No máximo 2x ``paralelo`` blocos em memória ao mesmo tempo
+    with ThreadPoolExecutor(max_workers=paralelo) as executor:
+        em_voo = set()
+        for inicio, valores in gerar_blocos(df, max_linhas, max_bytes):
+            if inicio in concluidos:
+                continue
+            em_voo.add(executor.submit(propagar(enviar), inicio, valores))
+            enviados += 1
+            if len(em_voo) >= paralelo * 2:
+                prontos, em_voo = wait(em_voo, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    confirmar(futuro.result())
+        for futuro in em_voo:
+            confirmar(futuro.result())
+
+    os.remove(caminho)
+    print(f"  📤 {len(df)} linhas enviadas em {enviados} blocos ({paralelo} em paralelo)")
+    return enviados
+
+
+def enviar_em_fluxo(destino, lotes, value_input_option="RAW", max_linhas=None, max_bytes=None, paralelo=None,
+                    colunas_no_fim=()):
+    """Limpa a aba e grava os DataFrames de ``lotes`` um após o outro, sem juntá-los.
+
+    A aba só é limpa quando o primeiro lote chega: sem nenhum lote ela fica
+    como estava e a função levanta erro. As colunas seguem a ordem do
+    ``pd.concat`` dos lotes antes da transformação: uma coluna nova num lote
+    posterior entra no fim do cabeçalho, mas antes das ``colunas_no_fim``
+    (criadas pela transformação de cada lote); se já houver linhas gravadas, a
+    coluna é inserida na planilha e fica vazia nelas. A grade cresce a cada
+    lote. Sem retomada: o conteúdo total só é conhecido no fim. Retorna o
+    total de linhas gravadas.
+    """
+    paralelo = paralelo or UPLOAD_PARALELO
+    if not getattr(destino, "thread_safe", False):
+        paralelo = 1
+
+    colunas, linhas, enviados, recebidos = [], 0, 0, 0
+
+    def enviar(inicio, valores, ultima_coluna):
+        intervalo = destino.intervalo(f"A{inicio + 2}:{ultima_coluna}{inicio + 1 + len(valores)}")
+        com_retry(destino.atualizar_lote, [{"range": intervalo, "values": valores}], value_input_option)
+
+    with ThreadPoolExecutor(max_workers=paralelo) as executor:
+        em_voo = set()
+        for lote in lotes:
+            lote = lote.set_axis(list(map(str, lote.columns)), axis=1)
+            if not recebidos:
+                com_retry(destino.limpar_tudo)
+            recebidos += 1
+
+            novas = [c for c in lote.columns if c not in colunas]
+            if novas:
+                meio = [c for c in novas if c not in colunas_no_fim]
+                posicao = next((i for i, c in enumerate(colunas) if c in colunas_no_fim), len(colunas))
+                if meio and posicao < len(colunas):
+                    # As linhas já gravadas mudam de layout: espera os blocos em voo antes de deslocar as colunas
+                    for futuro in em_voo:
+                        futuro.result()
+                    em_voo = set()
+                    com_retry(destino.inserir_colunas, posicao, len(meio))
+                colunas[posicao:posicao] = meio
+                colunas += [c for c in novas if c in colunas_no_fim]
+
+            ultima_coluna = letra_coluna(max(len(colunas), 1))
+            com_retry(destino.garantir_grade, linhas + len(lote) + 1, len(colunas))
+            if novas:
+                com_retry(destino.atualizar_lote, [{"range": destino.intervalo(f"A1:{ultima_coluna}1"),
+                                                    "values": [colunas]}], value_input_option)
+
+            lote = lote.reindex(columns=colunas)
+            for inicio, valores in gerar_blocos(lote, max_linhas, max_bytes):
+                em_voo.add(executor.submit(propagar(enviar), linhas + inicio, valores, ultima_coluna))
+                enviados += 1
+                # No máximo 2x ``paralelo`` blocos em memória ao mesmo tempo
+                if len(em_voo) >= paralelo * 2:
+                    prontos, em_voo = wait(em_voo, return_when=FIRST_COMPLETED)
+                    for futuro in prontos:
+                        futuro.result()
+            linhas += len(lote)
+            del lote
+        for futuro in em_voo:
+            futuro.result()
+
+    if not recebidos:
+        raise Exception("❌ Nenhum lote recebido para gravar; a planilha foi mantida como estava.")
+    print(f"  📤 {linhas} linhas enviadas em {enviados} blocos ({paralelo} em paralelo)")
+    return linhas
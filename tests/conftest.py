@@ -0,0 +1,14 @@
+import pytest
+
+from financeiro import cotas
+
+
+@pytest.fixture(autouse=True)
+def sem_cotas():
+    """Destinos em memória: sem a espera das cotas do Sheets entre as chamadas"""
+    for api in ("sheets_leitura", "sheets_escrita"):
+        cotas.definir_cota(api, 0)
+    yield
+    with cotas._trava:
+        for api in ("sheets_leitura", "sheets_escrita"):
+            cotas._baldes.pop(api, None)
@@ -0,0 +1,97 @@
+"""Destino do uploader em memória para os testes, com a conversão do USER_ENTERED do Sheets."""
+import re
+import threading
+
+from financeiro.sheets import letra_coluna
+
+
+def _numero_coluna(letras):
+    numero = 0
+    for letra in letras:
+        numero = numero * 26 + ord(letra) - 64
+    return numero
+
+
+def _intervalo(a1):
+    """``A2:K100`` → (linha, coluna, linha final ou None, coluna final)"""
+    m = re.fullmatch(r"([A-Z]+)(\d*)(?::([A-Z]+)(\d*))?", a1.rpartition("!")[2])
+    coluna, linha, coluna_final, linha_final = m.groups()
+    return (int(linha or 1), _numero_coluna(coluna), int(linha_final) if linha_final else None,
+            _numero_coluna(coluna_final or coluna))
+
+
+def _entrada_usuario(valor):
+    # USER_ENTERED: texto numérico vira número, como o Sheets faz
+    if isinstance(valor, str):
+        try:
+            return float(valor)
+        except ValueError:
+            return valor
+    return valor
+
+
+def _formatado(valor):
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+class DestinoMemoria:
+    thread_safe = True
+
+    def __init__(self, chave_snapshot="teste", falhar_apos=None):
+        self.chave_snapshot = chave_snapshot
+        self.celulas = {}
+        self.chamadas = []
+        # Levanta erro na gravação de número ``falhar_apos`` + 1 (simula uma queda no meio do envio)
+        self.falhar_apos = falhar_apos
+        self._trava = threading.Lock()
+
+    def intervalo(self, a1):
+        return f"'Dados'!{a1}"
+
+    def ler(self, a1, valores_crus=False):
+        linha, coluna, linha_final, coluna_final = _intervalo(a1)
+        linha_final = linha_final or max([l for l, _ in self.celulas] + [linha])
+        linhas = []
+        for numero in range(linha, linha_final + 1):
+            valores = [self.celulas.get((numero, c), "") for c in range(coluna, coluna_final + 1)]
+            while valores and valores[-1] == "":
+                valores.pop()
+            linhas.append(valores if valores_crus else [_formatado(v) for v in valores])
+        while linhas and not linhas[-1]:
+            linhas.pop()
+        return linhas
+
+    def atualizar_lote(self, dados, value_input_option):
+        with self._trava:
+            if self.falhar_apos is not None and len(self.chamadas) >= self.falhar_apos:
+                raise ConnectionError("queda simulada")
+            for item in dados:
+                linha, coluna, _, _ = _intervalo(item["range"])
+                self.chamadas.append(item["range"])
+                for i, valores in enumerate(item["values"]):
+                    for j, valor in enumerate(valores):
+                        if value_input_option == "USER_ENTERED":
+                            valor = _entrada_usuario(valor)
+                        self.celulas[(linha + i, coluna + j)] = valor
+
+    def limpar_lote(self, intervalos):
+        for a1 in intervalos:
+            linha, coluna, linha_final, coluna_final = _intervalo(a1)
+            for chave in [k for k in self.celulas if linha <= k[0] <= (linha_final or k[0])
+                          and coluna <= k[1] <= coluna_final]:
+                del self.celulas[chave]
+
+    def limpar_tudo(self):
+        self.celulas.clear()
+
+    def garantir_grade(self, linhas, colunas):
+        pass
+
+    def grade(self):
+        """Linhas com valor (cabeçalho incluído), até a última coluna usada"""
+        if not self.celulas:
+            return []
+        colunas = max(c for _, c in self.celulas)
+        return self.ler(f"A1:{letra_coluna(colunas)}", valores_crus=True)
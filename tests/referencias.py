@@ -0,0 +1,69 @@
+"""Código anterior às otimizações, copiado como referência para os testes de equivalência.
+
+Cada função reproduz o trecho original (pd.to_datetime, .dt.strftime, apply
+linha a linha) do script indicado na docstring; não usar fora dos testes.
+"""
+import pandas as pd
+
+from financeiro.esquema import FORMATO_DATA_EXPORTACAO, FORMATO_DATA_PLANILHA
+
+
+# ===================== Datas =====================
+def exportacao_original(serie):
+    """esquema.converter_data"""
+    return pd.to_datetime(serie, format=FORMATO_DATA_EXPORTACAO, errors="coerce")
+
+
+def texto_original(serie):
+    """esquema.para_texto"""
+    return serie.dt.strftime(FORMATO_DATA_PLANILHA).astype(str)
+
+
+def limpeza_a6_original(serie):
+    """transformacoes.normalizar_datas (antes da gravação)"""
+    datas = pd.to_datetime(serie, format='mixed', dayfirst=True, errors='coerce')
+    return datas.dt.strftime('%Y-%m-%d').replace('NaT', '')
+
+
+def ia_original(serie):
+    """IA.parse_data_segura"""
+    texto = serie.where(serie.map(lambda x: isinstance(x, str)))
+    return pd.to_datetime(texto.str.extract(r'^([^-]*-[^-]*-[^-]*)', expand=False), format='%Y-%m-%d', errors='coerce')
+
+
+# ===================== Limpeza do A6 =====================
+def limpeza_original(df_completo):
+    """A6_Pivot.py: limpeza antes da vetorização (apply linha a linha)"""
+    campos_data = ['lastAcquittanceDate', 'financialEvent.competenceDate', 'dueDate']
+    for campo in campos_data:
+        if campo in df_completo.columns:
+            df_completo[campo] = pd.to_datetime(df_completo[campo], format='mixed', dayfirst=True, errors='coerce')
+            df_completo[campo] = df_completo[campo].dt.strftime('%Y-%m-%d')
+            df_completo[campo] = df_completo[campo].replace('NaT', '')
+
+    if 'categoriesRatio.value' in df_completo.columns and 'paid' in df_completo.columns:
+        df_completo['categoriesRatio.value'] = df_completo.apply(
+            lambda row: row['paid'] if pd.notna(row['categoriesRatio.value']) and pd.notna(row['paid']) and row['categoriesRatio.value'] > row['paid'] else row['categoriesRatio.value'],
+            axis=1
+        )
+
+    colunas_centro_custo = [col for col in df_completo.columns if col.startswith("Centro de Custo ") and not col.startswith("Valor no Centro de Custo ")]
+    if len(colunas_centro_custo) > 0 and 'paid' in df_completo.columns:
+        linhas_com_valor_preenchido = pd.Series([False] * len(df_completo), index=df_completo.index)
+        for i, col_centro in enumerate(colunas_centro_custo, start=1):
+            col_valor = f"Valor no Centro de Custo {i}"
+            if col_valor not in df_completo.columns:
+                continue
+            df_completo[col_centro] = df_completo[col_centro].astype(str).str.strip()
+            mask_centro_vazio = (df_completo[col_centro].isna()) | (df_completo[col_centro] == '') | (df_completo[col_centro] == 'nan')
+            mask_valor_vazio = (df_completo[col_valor].isna()) | (df_completo[col_valor] == '') | (df_completo[col_valor] == 0)
+            if i == 1:
+                mask_ambos_vazios = mask_centro_vazio & mask_valor_vazio & (~linhas_com_valor_preenchido)
+                if mask_ambos_vazios.sum() > 0:
+                    df_completo.loc[mask_ambos_vazios, col_centro] = 'Sem Centro de Custo'
+                    df_completo.loc[mask_ambos_vazios, col_valor] = df_completo.loc[mask_ambos_vazios, 'paid']
+                    linhas_com_valor_preenchido = linhas_com_valor_preenchido | mask_ambos_vazios
+            mask_so_centro_vazio = mask_centro_vazio & (~mask_valor_vazio)
+            if mask_so_centro_vazio.sum() > 0:
+                df_completo.loc[mask_so_centro_vazio, col_centro] = 'Sem Centro de Custo'
+    return df_completo
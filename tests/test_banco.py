@@ -0,0 +1,104 @@
+"""Espelhamento dos lançamentos no banco: ida e volta no SQLite e o CSV enviado ao COPY do Postgres."""
+import numpy as np
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+from financeiro import banco
+
+
+@pytest.fixture
+def sqlite(tmp_path, monkeypatch):
+    monkeypatch.setattr(banco, "DB_URL", f"sqlite:///{tmp_path / 'financeiro.db'}")
+    yield banco.motor()
+    banco.motor().dispose()
+
+
+def lancamentos(**colunas):
+    base = {
+        "id": ["a", "b", "c"],
+        "dueDate": ["2024-01-10", "2024-02-15", ""],
+        "lastAcquittanceDate": ["2024-01-12", np.nan, "2023-12-30"],
+        "paid": [100.0, np.nan, 30.5],
+        "description": ["Aluguel", "", np.nan],
+        "Centro de Custo 1": ["TI", "Comercial", np.nan],
+        "Valor no Centro de Custo 1": [100.0, 50.0, np.nan],
+    }
+    base.update(colunas)
+    return pd.DataFrame(base)
+
+
+def tabela(motor):
+    with motor.connect() as conexao:
+        df = pd.read_sql(sa.text(f'SELECT * FROM "{banco.TABELA_LANCAMENTOS}" ORDER BY id'), conexao)
+    return df.set_index("id")
+
+
+def test_insercao(sqlite):
+    assert banco.gravar_lancamentos(lancamentos()) == 3
+    df = tabela(sqlite)
+    assert list(df.index) == ["a", "b", "c"]
+    assert df.loc["a", "paid"] == 100.0 and pd.isna(df.loc["b", "paid"])
+    assert df.loc["a", "dueDate"] == "2024-01-10" and pd.isna(df.loc["c", "dueDate"])
+    # Texto vazio continua vazio; ausente vira NULL
+    assert df.loc["b", "description"] == "" and pd.isna(df.loc["c", "description"])
+
+
+def test_coluna_nova_atualizacao_e_remocao(sqlite):
+    banco.gravar_lancamentos(lancamentos())
+    segunda = lancamentos(**{
+        "paid": [120.0, 75.0, 30.5],
+        "Centro de Custo 2": ["RH", np.nan, np.nan],
+        "Valor no Centro de Custo 2": [20.0, np.nan, np.nan],
+    }).iloc[:2]
+    assert banco.gravar_lancamentos(segunda) == 2
+
+    df = tabela(sqlite)
+    assert list(df.index) == ["a", "b"]
+    assert df["paid"].tolist() == [120.0, 75.0]
+    assert df.loc["a", "Centro de Custo 2"] == "RH" and df.loc["a", "Valor no Centro de Custo 2"] == 20.0
+    assert pd.isna(df.loc["b", "Centro de Custo 2"])
+
+
+def test_ids_repetidos_e_sem_chave(sqlite):
+    df = lancamentos(id=["a", "a", None])
+    assert banco.gravar_lancamentos(df) == 1
+    assert tabela(sqlite).loc["a", "paid"] == 100.0
+
+
+def test_leitura_do_ano(sqlite):
+    banco.gravar_lancamentos(lancamentos())
+    df = banco.ler_lancamentos(["id", "paid", "lastAcquittanceDate"], 2024)
+    assert df["id"].tolist() == ["a"]
+    assert df["lastAcquittanceDate"].tolist() == [pd.Timestamp("2024-01-12")]
+
+
+def test_leitura_sem_banco(monkeypatch):
+    monkeypatch.setattr(banco, "DB_URL", "")
+    assert banco.ler_lancamentos(["id"], 2024) is None
+
+
+class CursorFalso:
+    def __init__(self):
+        self.sql, self.conteudo = None, None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def copy_expert(self, sql, buffer):
+        self.sql, self.conteudo = sql, buffer.read()
+
+
+def test_copy_distingue_vazio_de_nulo():
+    cursor = CursorFalso()
+    conexao = type("Conexao", (), {"connection": type("Bruta", (), {"cursor": lambda self: cursor})()})()
+    tabela_carga = sa.Table("carga", sa.MetaData())
+    banco._copiar_postgres(tabela_carga, conexao, ["id", "description", "paid"],
+                           [("a", "", 1.5), ("b", None, None), ("c", 'com "aspas", vírgula', 2.0)])
+
+    assert f"NULL '{banco.MARCA_NULO}'" in cursor.sql
+    # Só o \N é NULL para o COPY; o campo vazio sem aspas é texto vazio
+    assert cursor.conteudo.splitlines() == ["a,,1.5", "b,\\N,\\N", 'c,"com ""aspas"", vírgula",2.0']
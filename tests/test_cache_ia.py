@@ -0,0 +1,95 @@
+"""Cache de respostas da IA com um cliente falso no lugar do OpenAI/DeepSeek."""
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from financeiro import armazenamento, cache_ia
+from financeiro.cache_ia import gerar_resposta
+
+
+class ClienteFalso:
+    def __init__(self):
+        self.pedidos = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, temperature):
+        self.pedidos.append((model, messages, temperature))
+        conteudo = f"resposta {len(self.pedidos)}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=conteudo))])
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(armazenamento, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(cache_ia, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(cache_ia, "CACHE_IA_DESATIVADO", False)
+    return tmp_path
+
+
+def mensagens(texto="agregados A"):
+    return [{"role": "system", "content": "analista"}, {"role": "user", "content": texto}]
+
+
+def envelhecer(cache, horas):
+    """Recua em ``horas`` a data de modificação de todas as respostas guardadas"""
+    pasta = cache / cache_ia.PASTA
+    for nome in os.listdir(pasta):
+        mtime = os.path.getmtime(pasta / nome) - horas * 3600
+        os.utime(pasta / nome, (mtime, mtime))
+
+
+def test_pedido_repetido_nao_chama_o_cliente():
+    cliente = ClienteFalso()
+    primeira = gerar_resposta(cliente, "deepseek-chat", mensagens())
+    segunda = gerar_resposta(cliente, "deepseek-chat", mensagens())
+    assert primeira == segunda == "resposta 1"
+    assert len(cliente.pedidos) == 1
+
+
+@pytest.mark.parametrize("mudanca", [
+    {"modelo": "deepseek-reasoner"},
+    {"temperatura": 0.5},
+    {"mensagens": mensagens("agregados B")},
+    {"mensagens": mensagens()[1:]},
+], ids=["modelo", "temperatura", "prompt", "sem mensagem de sistema"])
+def test_qualquer_mudanca_no_pedido_chama_o_cliente(mudanca):
+    cliente = ClienteFalso()
+    base = {"modelo": "deepseek-chat", "mensagens": mensagens(), "temperatura": 1.0}
+    gerar_resposta(cliente, base["modelo"], base["mensagens"], base["temperatura"])
+    pedido = {**base, **mudanca}
+    assert gerar_resposta(cliente, pedido["modelo"], pedido["mensagens"], pedido["temperatura"]) == "resposta 2"
+    assert len(cliente.pedidos) == 2
+
+
+def test_resposta_vencida_e_buscada_de_novo(cache, monkeypatch):
+    monkeypatch.setattr(cache_ia, "CACHE_IA_TTL_HORAS", 24)
+    cliente = ClienteFalso()
+    gerar_resposta(cliente, "deepseek-chat", mensagens())
+    envelhecer(cache, 23)
+    assert gerar_resposta(cliente, "deepseek-chat", mensagens()) == "resposta 1"
+    envelhecer(cache, 2)
+    assert gerar_resposta(cliente, "deepseek-chat", mensagens()) == "resposta 2"
+    assert len(cliente.pedidos) == 2
+
+
+def test_mais_antigas_saem_alem_do_maximo(cache, monkeypatch):
+    monkeypatch.setattr(cache_ia, "CACHE_IA_MAX_ITENS", 2)
+    cliente = ClienteFalso()
+    for texto in ["A", "B", "C"]:
+        gerar_resposta(cliente, "deepseek-chat", mensagens(texto))
+        # Datas distintas: a mais antiga é a primeira gerada
+        envelhecer(cache, 1)
+    assert len(os.listdir(cache / cache_ia.PASTA)) == 2
+
+    gerar_resposta(cliente, "deepseek-chat", mensagens("A"))
+    gerar_resposta(cliente, "deepseek-chat", mensagens("C"))
+    assert [m[1]["content"] for _, m, _ in cliente.pedidos] == ["A", "B", "C", "A"]
+
+
+def test_cache_desativado(monkeypatch):
+    monkeypatch.setattr(cache_ia, "CACHE_IA_DESATIVADO", True)
+    cliente = ClienteFalso()
+    gerar_resposta(cliente, "deepseek-chat", mensagens())
+    gerar_resposta(cliente, "deepseek-chat", mensagens())
+    assert len(cliente.pedidos) == 2
@@ -0,0 +1,37 @@
+"""Retentativas do financeiro.cotas para erros HTTP fora dos clientes do Google."""
+import io
+import urllib.error
+
+import pytest
+
+from financeiro.cotas import chamar
+
+
+def erro_http(status, retry_after="0.01"):
+    return urllib.error.HTTPError("https://docs.google.com/export?format=csv", status, "erro",
+                                  {"Retry-After": retry_after}, io.BytesIO())
+
+
+def test_429_da_exportacao_csv_e_repetido():
+    tentativas = []
+
+    def ler_csv(url):
+        tentativas.append(url)
+        if len(tentativas) < 3:
+            raise erro_http(429)
+        return "dados"
+
+    assert chamar("sheets_leitura", ler_csv, "url") == "dados"
+    assert len(tentativas) == 3
+
+
+def test_erro_permanente_nao_e_repetido():
+    tentativas = []
+
+    def ler_csv(url):
+        tentativas.append(url)
+        raise erro_http(404)
+
+    with pytest.raises(urllib.error.HTTPError):
+        chamar("sheets_leitura", ler_csv, "url")
+    assert len(tentativas) == 1
@@ -0,0 +1,106 @@
+"""Conversões de financeiro.datas iguais às antigas (pd.to_datetime / .dt.strftime de cada script).
+
+As referências são as cópias do código anterior em tests/referencias.py.
+Cada conversão roda duas vezes: a primeira interpreta os valores, a segunda
+vem do cache.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from financeiro.datas import FORMATO_ISO, MISTO, converter_datas, converter_inicio_iso, formatar_datas, limpar_cache
+from financeiro.esquema import FORMATO_DATA_EXPORTACAO, FORMATO_DATA_PLANILHA
+from tests.referencias import exportacao_original, ia_original, limpeza_a6_original, texto_original
+
+
+@pytest.fixture(autouse=True)
+def cache_vazio():
+    limpar_cache()
+    yield
+    limpar_cache()
+
+
+def exportacao_atual(serie):
+    return converter_datas(serie, FORMATO_DATA_EXPORTACAO)
+
+
+def texto_atual(serie):
+    return formatar_datas(serie, FORMATO_DATA_PLANILHA, np.nan).astype(str)
+
+
+def limpeza_a6_atual(serie):
+    return formatar_datas(converter_datas(serie, MISTO), FORMATO_ISO, np.nan)
+
+
+def serie(valores):
+    return pd.Series(valores, dtype=object, index=range(10, 10 + len(valores)), name="dueDate")
+
+
+dd_mm = serie(["03/04/2020", "03/04/2020", "31/12/2019", "29/02/2024", None, np.nan, ""])
+invalidas = serie(["31/02/2020", "sem data", "32/01/2021", "2020-13-01", "00/00/0000", "nan", "NaT"])
+iso = serie(["2020-04-03", "2019-12-31", "2024-02-29", "2020-04-03", None, np.nan])
+misturadas = serie(["03/04/2020", "2020-04-05", pd.Timestamp("2021-06-07"), "2020-04-05 10:30:00",
+                    "15/01/2021", None, "", "sem data"])
+
+
+@pytest.mark.parametrize("valores", [dd_mm, invalidas, misturadas], ids=["dd/mm", "inválidas", "misturadas"])
+def test_exportacao(valores):
+    for _ in range(2):
+        pd.testing.assert_series_equal(exportacao_atual(valores), exportacao_original(valores), check_dtype=False)
+
+
+@pytest.mark.parametrize("valores", [dd_mm, iso, invalidas, misturadas],
+                         ids=["dd/mm", "iso", "inválidas", "misturadas"])
+def test_limpeza_a6(valores):
+    esperado = limpeza_a6_original(valores).astype(object)
+    for _ in range(2):
+        pd.testing.assert_series_equal(limpeza_a6_atual(valores), esperado, check_dtype=False)
+
+
+com_sufixo = serie(["2020-04-03T10:00:00", "2020-04-03 extra", "2020-04-03-extra", "2020-04-03 00:00:00", "2020-04"])
+
+
+@pytest.mark.parametrize("valores", [iso, invalidas, misturadas, com_sufixo],
+                         ids=["iso", "inválidas", "misturadas", "com sufixo"])
+def test_ia(valores):
+    for _ in range(2):
+        pd.testing.assert_series_equal(converter_inicio_iso(valores), ia_original(valores), check_dtype=False)
+
+
+@pytest.mark.parametrize("formato", [FORMATO_DATA_PLANILHA, FORMATO_ISO], ids=["dd/mm/aaaa", "iso"])
+def test_texto(formato):
+    datas = pd.Series(pd.to_datetime(["2020-04-03", None, "2019-12-31", "2020-04-03", None]), name="dueDate")
+    esperado = datas.dt.strftime(formato)
+    atual = formatar_datas(datas, formato)
+    assert atual.tolist() == [None if pd.isna(valor) else valor for valor in esperado]
+    # Como no esquema.para_texto antigo
+    pd.testing.assert_series_equal(texto_atual(datas), texto_original(datas), check_dtype=False)
+
+
+def test_saida_dd_mm_e_iso():
+    datas = converter_datas(serie(["03/04/2020", "31/12/2019", None]), MISTO)
+    assert formatar_datas(datas, FORMATO_DATA_PLANILHA, "").tolist() == ["03/04/2020", "31/12/2019", ""]
+    assert formatar_datas(datas, FORMATO_ISO, "").tolist() == ["2020-04-03", "2019-12-31", ""]
+    # Com dayfirst, o misto lê AAAA-DD-MM quando o dia cabe no mês, como o pd.to_datetime antigo do A6
+    assert converter_datas(serie(["2020-04-05"]), MISTO).iloc[0] == pd.Timestamp("2020-05-04")
+
+
+def test_cache_separado_por_formato():
+    valores = serie(["03/04/2020"])
+    assert converter_datas(valores, MISTO).iloc[0] == pd.Timestamp("2020-04-03")
+    assert pd.isna(converter_datas(valores, FORMATO_ISO).iloc[0])
+    assert converter_datas(valores, "%m/%d/%Y").iloc[0] == pd.Timestamp("2020-03-04")
+
+
+def test_tudo_ausente_e_vazio():
+    for valores in (serie([None, np.nan, pd.NaT]), serie([])):
+        convertido = converter_datas(valores, MISTO)
+        assert convertido.isna().all() and list(convertido.index) == list(valores.index)
+        assert formatar_datas(convertido, FORMATO_ISO, "").tolist() == [""] * len(valores)
+
+
+def test_datetime_passa_direto():
+    datas = pd.Series(pd.to_datetime(["2020-04-03", None]))
+    assert converter_datas(datas, FORMATO_ISO) is datas
+    texto = serie(["2020-04-03"])
+    assert formatar_datas(texto, FORMATO_ISO) is texto
@@ -0,0 +1,67 @@
+"""Extração incremental com EXPENSE e REVENUE em threads, como no Update_contas (EXTRACAO_CONCORRENTE=1)."""
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from financeiro import armazenamento, incremental
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(armazenamento, "CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_tipos_em_paralelo_guardam_as_duas_marcas(cache, monkeypatch):
+    # Os dois tipos leem as marcas antes de qualquer um gravar
+    barreira = threading.Barrier(2, timeout=10)
+
+    def baixar(tipo, status, janelas, max_workers, sessao):
+        barreira.wait()
+        return {s: pd.DataFrame({"id": [f"{tipo}-{s}"], "status": [s]}) for s in status}
+
+    monkeypatch.setattr(incremental, "baixar_exportacoes_por_status", baixar)
+    erros = []
+
+    def extrair(tipo):
+        try:
+            incremental.extrair_incremental(tipo, status=["ACQUITTED", "PENDING"])
+        except Exception as e:
+            erros.append(e)
+
+    threads = [threading.Thread(target=extrair, args=(tipo,)) for tipo in ("EXPENSE", "REVENUE")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not erros
+    marcas = armazenamento.ler_json(incremental._caminho_watermarks())
+    assert sorted(marcas) == ["EXPENSE", "REVENUE"]
+    assert all(sorted(marcas[tipo]) == ["ACQUITTED", "PENDING"] for tipo in marcas)
+    # Nenhum temporário sobrando
+    assert not [nome for nome in os.listdir(cache / "incremental") if nome.endswith(".tmp")]
+
+
+def test_gravacoes_simultaneas_do_mesmo_arquivo(cache):
+    caminho = armazenamento.caminho_cache("teste", "dados.json")
+    erros = []
+
+    def gravar(i):
+        try:
+            for _ in range(50):
+                armazenamento.salvar_json(caminho, {"thread": i})
+        except Exception as e:
+            erros.append(e)
+
+    threads = [threading.Thread(target=gravar, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not erros
+    assert armazenamento.ler_json(caminho)["thread"] in range(4)
+    assert os.listdir(cache / "teste") == ["dados.json"]
@@ -0,0 +1,147 @@
+"""financeiro.kpis contra os cálculos originais do IA.py, com as diferenças intencionais explícitas.
+
+Diferenças em relação ao código antigo (todas chegam ao prompt):
+
+- ``rentabilidade``: o original comparava ``tipo.str.lower()`` com 'Receita' e
+  'Despesa' e nunca encontrava linhas, então a tabela saía sempre vazia; agora
+  é a do cálculo pretendido (mesmo código, sem o ``.str.lower()``);
+- ``categorias_com_alta``: cada categoria destacada traz a variação do mês
+  (arredondada em 4 casas) em vez de ``True``.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from financeiro.kpis import LIMITE_ALTA, calcular_kpis
+
+HOJE = pd.Timestamp("2024-07-15")
+
+
+# ===================== Referência: IA.py antes do financeiro.kpis =====================
+def kpis_originais(df, ano, hoje, corrigir_rentabilidade=False):
+    df = df[df['lastAcquittanceDate'].dt.year == ano].copy()
+    df['AnoMes'] = df['lastAcquittanceDate'].dt.to_period('M')
+    df['Trimestre'] = df['lastAcquittanceDate'].dt.to_period('Q')
+    df['AnoMes_Caixa'] = df['lastAcquittanceDate'].dt.to_period('M')
+
+    resumo_trimestral = df.groupby(['Trimestre', 'tipo'])[['paid']].sum().unstack(fill_value=0)
+
+    resumo_mensal_categoria = df.groupby(['AnoMes', 'categoriesRatio.category'])['paid'].sum().unstack(fill_value=0)
+    variacao_mensal_pct = resumo_mensal_categoria.pct_change().fillna(0)
+    categorias_com_alta = (variacao_mensal_pct > 0.3).apply(lambda row: row[row > 0.3].to_dict(), axis=1).to_dict()
+
+    total_recebido = df[df['tipo'] == 'Receita']['paid'].sum()
+    total_pago = df[df['tipo'] == 'Despesa']['paid'].sum()
+    total_pendente_despesa = df[(df['tipo'] == 'Despesa') & (df['status'] == 'OVERDUE')]['paid'].sum()
+    total_pendente_receita = df[(df['tipo'] == 'Receita') & (df['status'] == 'OVERDUE')]['paid'].sum()
+    top_categorias = df['categoriesRatio.category'].value_counts().head(3).to_dict()
+
+    df_realizadas = df[df['lastAcquittanceDate'] <= hoje].copy()
+    df_realizadas['valor_ajustado'] = df_realizadas.apply(
+        lambda row: abs(row['paid']) if row['tipo'] == 'Receita' else -abs(row['paid']), axis=1)
+    fluxo_caixa = df_realizadas.groupby('AnoMes_Caixa')['valor_ajustado'].sum().reset_index()
+    fluxo_caixa['saldo_acumulado'] = fluxo_caixa['valor_ajustado'].cumsum()
+
+    tipo = df_realizadas['tipo'] if corrigir_rentabilidade else df_realizadas['tipo'].str.lower()
+    receitas_mensais = df_realizadas[tipo == 'Receita'].groupby('AnoMes')['paid'].sum().reset_index()
+    despesas_mensais = df_realizadas[tipo == 'Despesa'].groupby('AnoMes')['paid'].sum().reset_index()
+    rentabilidade = pd.merge(receitas_mensais, despesas_mensais, on='AnoMes', how='outer',
+                             suffixes=('_receita', '_despesa')).fillna(0)
+    rentabilidade['lucro'] = rentabilidade['paid_receita'] - rentabilidade['paid_despesa']
+    rentabilidade['margem_lucro'] = rentabilidade['lucro'] / rentabilidade['paid_receita'].replace(0, pd.NA)
+
+    df_pendentes = df[(df['paid'] > 0) & (df['dueDate'] <= hoje) & (df['status'] == 'OVERDUE')]
+    total_vencido = df_pendentes[df_pendentes['tipo'] == 'Receita']['paid'].sum()
+    return {
+        "total_recebido": total_recebido, "total_pago": total_pago,
+        "total_pendente_receita": total_pendente_receita, "total_pendente_despesa": total_pendente_despesa,
+        "saldo_liquido": total_recebido - total_pago, "top_categorias": top_categorias,
+        "resumo_trimestral": resumo_trimestral, "categorias_com_alta": categorias_com_alta,
+        "fluxo_caixa": fluxo_caixa, "rentabilidade": rentabilidade,
+        "inadimplencia": total_vencido / total_recebido if total_recebido else 0,
+    }
+
+
+# ===================== Dados =====================
+def lancamentos(n=400, seed=7):
+    """Ano anterior, datas futuras, pagamentos vazios, tipos/categorias ausentes e empates de categoria"""
+    rng = np.random.default_rng(seed)
+    datas = pd.Timestamp("2023-11-01") + pd.to_timedelta(rng.integers(0, 420, n), unit="D")
+    df = pd.DataFrame({
+        "paid": rng.choice([0.0, 10.0, 99.9, 250.0, -30.0, np.nan], n),
+        "tipo": rng.choice(["Receita", "Despesa", "Receita", "Despesa", None], n),
+        "status": rng.choice(["ACQUITTED", "OVERDUE", "PENDING", None], n),
+        "lastAcquittanceDate": pd.Series(datas).where(rng.random(n) > 0.05),
+        "dueDate": pd.Series(datas - pd.to_timedelta(rng.integers(-30, 30, n), unit="D")),
+        "categoriesRatio.category": rng.choice(["Vendas", "Aluguel", "Salários", "Impostos", None], n),
+    })
+    # Empate no top 3 com ordem de aparição diferente da alfabética
+    extra = pd.DataFrame({
+        "paid": 1.0, "tipo": "Receita", "status": "ACQUITTED",
+        "lastAcquittanceDate": pd.Timestamp("2024-03-01"), "dueDate": pd.Timestamp("2024-03-01"),
+        "categoriesRatio.category": ["Zeta", "Beta", "Zeta", "Beta", "Alfa", "Alfa"] * 40,
+    })
+    return pd.concat([extra, df], ignore_index=True)
+
+
+@pytest.fixture(scope="module")
+def resultados():
+    df = lancamentos()
+    return (calcular_kpis(df, ano=2024, hoje=HOJE), kpis_originais(df, 2024, HOJE),
+            kpis_originais(df, 2024, HOJE, corrigir_rentabilidade=True))
+
+
+# ===================== Iguais ao original =====================
+@pytest.mark.parametrize("campo", ["total_recebido", "total_pago", "total_pendente_receita",
+                                   "total_pendente_despesa", "saldo_liquido", "inadimplencia"])
+def test_totais(resultados, campo):
+    atual, original, _ = resultados
+    assert getattr(atual, campo) == pytest.approx(original[campo])
+
+
+def test_top_categorias_com_empate(resultados):
+    atual, original, _ = resultados
+    assert atual.top_categorias == original["top_categorias"]
+    assert list(atual.top_categorias) == list(original["top_categorias"])
+
+
+def test_resumo_trimestral(resultados):
+    atual, original, _ = resultados
+    pd.testing.assert_frame_equal(atual.resumo_trimestral, original["resumo_trimestral"], check_dtype=False,
+                                  check_names=False)
+
+
+def test_fluxo_caixa(resultados):
+    atual, original, _ = resultados
+    pd.testing.assert_frame_equal(atual.fluxo_caixa, original["fluxo_caixa"], check_dtype=False)
+
+
+def test_linhas_do_ano(resultados):
+    atual, _, _ = resultados
+    assert atual.linhas == (lancamentos()["lastAcquittanceDate"].dt.year == 2024).sum()
+
+
+# ===================== Diferenças intencionais =====================
+def test_rentabilidade_calculada_de_verdade(resultados):
+    atual, original, corrigida = resultados
+    # O original saía sempre vazio por causa do .str.lower()
+    assert original["rentabilidade"].empty
+    assert not atual.rentabilidade.empty
+    esperado = corrigida["rentabilidade"].astype({"margem_lucro": "float64"})
+    pd.testing.assert_frame_equal(atual.rentabilidade, esperado, check_dtype=False)
+
+
+def test_categorias_com_alta_trazem_a_variacao(resultados):
+    atual, original, _ = resultados
+    # Mesmos meses e categorias destacados; o valor é a variação em vez de True
+    assert {mes: set(c) for mes, c in atual.categorias_com_alta.items()} == \
+           {mes: set(c) for mes, c in original["categorias_com_alta"].items()}
+    destacadas = [v for categorias in atual.categorias_com_alta.values() for v in categorias.values()]
+    assert destacadas and all(v > LIMITE_ALTA for v in destacadas)
+    assert all(v is True for c in original["categorias_com_alta"].values() for v in c.values())
+
+
+def test_ano_sem_lancamentos():
+    kpis = calcular_kpis(lancamentos(), ano=2030, hoje=HOJE)
+    assert kpis.linhas == 0 and kpis.total_recebido == 0 and kpis.inadimplencia == 0
+    assert kpis.top_categorias == {} and kpis.fluxo_caixa.empty and kpis.rentabilidade.empty
@@ -0,0 +1,55 @@
+"""Ida e volta pelo Sheets: o que os envios com RAW gravam volta com os mesmos tipos e vazios."""
+import numpy as np
+import pandas as pd
+
+from financeiro.esquema import aplicar_esquema, para_texto
+from financeiro.leitura_sheets import _montar, tipar
+
+
+def lancamentos():
+    df = pd.DataFrame({
+        "id": ["a1", "a2", "a3", "a4"],
+        "description": ["Aluguel", np.nan, None, "Luz"],
+        "paid": [10.5, np.nan, 0.0, -3.0],
+        "dueDate": pd.to_datetime(["2024-01-31", None, "2024-03-01", None]),
+        "categoriesRatio.category": ["Moradia", None, "Moradia", np.nan],
+        "Centro de Custo 1": [np.nan, "Matriz", None, "Filial"],
+        "status": ["ACQUITTED", "OVERDUE", None, "ACQUITTED"],
+    })
+    return aplicar_esquema(df)
+
+
+def gravado_com_raw(df):
+    """Texto que o A1/A2 gravam: no pandas < 3 o astype(str) escreve as células vazias como "nan"."""
+    return para_texto(df).astype(object).fillna("nan")
+
+
+def como_o_sheets_devolve(texto):
+    """Colunas da grade gravada com RAW, como o values.batchGet (COLUMNS) as devolve"""
+    colunas = []
+    for nome in texto.columns:
+        celulas = [nome] + texto[nome].tolist()
+        while celulas and celulas[-1] == "":
+            celulas.pop()
+        colunas.append(celulas)
+    return colunas
+
+
+def test_celulas_vazias_voltam_como_nan():
+    original = lancamentos()
+    texto = gravado_com_raw(original)
+    texto.loc[2, "description"] = "None"
+
+    lido = tipar(_montar([como_o_sheets_devolve(texto)]))
+    pd.testing.assert_frame_equal(lido, original, check_categorical=False, check_dtype=False)
+    assert lido["description"].isna().tolist() == [False, True, True, False]
+    assert "nan" not in lido["Centro de Custo 1"].cat.categories
+
+
+def test_celulas_em_branco_no_sheets():
+    original = lancamentos()
+    # Célula apagada à mão no Sheets volta como "" (no meio) ou some (no fim da coluna)
+    texto = gravado_com_raw(original).replace("nan", "")
+
+    lido = tipar(_montar([como_o_sheets_devolve(texto)]))
+    pd.testing.assert_frame_equal(lido, original, check_categorical=False, check_dtype=False)
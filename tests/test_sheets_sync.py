@@ -0,0 +1,45 @@
+"""Sincronização por diferença: a conferência da coluna-chave não pode forçar regravação à toa."""
+import pandas as pd
+import pytest
+
+from financeiro import armazenamento
+from financeiro.sheets_sync import sincronizar_aba
+from tests.destino_memoria import DestinoMemoria
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(armazenamento, "CACHE_DIR", str(tmp_path))
+
+
+def dados(ids, valores):
+    return pd.DataFrame({"id": ids, "paid": valores, "description": ["x"] * len(ids)})
+
+
+@pytest.mark.parametrize("ids", [[123.0, 456.0, 789.0], [123, 456, 789], ["123", "456", "789"], ["a1", "b2", "c3"]],
+                         ids=["float", "int", "texto numérico", "texto"])
+@pytest.mark.parametrize("modo", ["RAW", "USER_ENTERED"])
+def test_segunda_gravacao_envia_so_a_diferenca(ids, modo):
+    destino = DestinoMemoria()
+    assert sincronizar_aba(destino, dados(ids, [1.5, 2.0, 3.0]), value_input_option=modo)["modo"] == "completo"
+
+    resumo = sincronizar_aba(destino, dados(ids, [1.5, 9.0, 3.0]), value_input_option=modo)
+    assert resumo == {"modo": "diferencial", "linhas_enviadas": 1}
+    assert destino.grade()[2][1] == 9.0
+
+
+def test_planilha_alterada_por_fora_regrava_tudo():
+    destino = DestinoMemoria()
+    sincronizar_aba(destino, dados([1, 2, 3], [1.0, 2.0, 3.0]), value_input_option="USER_ENTERED")
+    destino.limpar_tudo()
+    resumo = sincronizar_aba(destino, dados([1, 2, 3], [1.0, 2.0, 3.0]), value_input_option="USER_ENTERED")
+    assert resumo["modo"] == "completo"
+    assert len(destino.grade()) == 4
+
+
+def test_insercao_e_remocao():
+    destino = DestinoMemoria()
+    sincronizar_aba(destino, dados([1, 2, 3], [1.0, 2.0, 3.0]), value_input_option="USER_ENTERED")
+    resumo = sincronizar_aba(destino, dados([1, 3, 4], [1.0, 3.0, 4.0]), value_input_option="USER_ENTERED")
+    assert resumo["modo"] == "diferencial"
+    assert sorted(linha[0] for linha in destino.grade()[1:]) == [1.0, 3.0, 4.0]
@@ -0,0 +1,86 @@
+"""Equivalência da limpeza vetorizada do A6 com a versão original (apply linha a linha).
+
+A referência é a cópia da limpeza antiga em tests/referencias.py;
+os quadros aqui são pequenos e cobrem os casos de borda das planilhas.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from financeiro.esquema import aplicar_esquema
+from financeiro.sheets import valores_celula
+from financeiro.transformacoes import formatar_para_gravacao, limpar_consolidado
+from tests.referencias import limpeza_original
+
+
+def celulas_gravadas(df):
+    """Células enviadas ao Sheets, sem depender do dtype de cada coluna"""
+    return valores_celula(df.reset_index(drop=True))
+
+
+def consolidado(**colunas):
+    base = {
+        "id": ["a", "b", "c", "d", "e"],
+        "dueDate": ["03/04/2020", "2020-04-05", "", np.nan, "31/02/2020"],
+        "financialEvent.competenceDate": ["01/01/2021", "15/01/2021", "sem data", "10/12/2020", np.nan],
+        "Data movimento": ["03/04/2020", np.nan, "05/04/2020", np.nan, "06/04/2020"],
+        "lastAcquittanceDate": ["03/04/2020", np.nan, "05/04/2020", np.nan, "06/04/2020"],
+        "paid": [100.0, 250.5, np.nan, 0.0, 80.0],
+        "categoriesRatio.value": [150.0, 200.0, 10.0, np.nan, 80.0],
+        "tipo": ["Receita", "Despesa", "Receita", "Despesa", "Receita"],
+        "Centro de Custo 1": ["TI", np.nan, "", "  ", "nan"],
+        "Valor no Centro de Custo 1": [100.0, np.nan, 5.0, 0.0, np.nan],
+        "Centro de Custo 2": [np.nan, "Comercial", np.nan, "", np.nan],
+        "Valor no Centro de Custo 2": [np.nan, 250.5, 3.0, np.nan, np.nan],
+    }
+    base.update(colunas)
+    return pd.DataFrame({nome: valores for nome, valores in base.items() if valores is not None})
+
+
+casos = {
+    "padrão": {},
+    # Valores de texto vindos do Sheets misturados com números
+    "tipos misturados": {
+        "Valor no Centro de Custo 1": [100.0, "", "5", 0, None],
+        "Centro de Custo 1": ["TI", 3, "", None, " Comercial "],
+        "dueDate": ["03/04/2020", pd.Timestamp("2020-04-05"), "", None, "2020-04-07"],
+    },
+    "tudo vazio": {
+        "dueDate": [np.nan] * 5,
+        "Centro de Custo 1": [np.nan] * 5,
+        "Valor no Centro de Custo 1": [np.nan] * 5,
+        "Centro de Custo 2": [""] * 5,
+    },
+    # Slot sem coluna de valor: o centro não é tratado
+    "sem coluna de valor": {"Valor no Centro de Custo 2": None},
+    "sem centros de custo": {
+        "Centro de Custo 1": None, "Valor no Centro de Custo 1": None,
+        "Centro de Custo 2": None, "Valor no Centro de Custo 2": None,
+    },
+    "sem paid": {"paid": None},
+    "sem campos de data": {"dueDate": None, "financialEvent.competenceDate": None, "lastAcquittanceDate": None},
+}
+
+
+@pytest.mark.parametrize("caso", casos)
+def test_limpeza_igual_a_original(caso):
+    df = consolidado(**casos[caso])
+    antes = limpeza_original(df.copy())
+    depois = formatar_para_gravacao(limpar_consolidado(df.copy()))
+    pd.testing.assert_frame_equal(antes, depois, check_dtype=False)
+    pd.testing.assert_frame_equal(celulas_gravadas(antes), celulas_gravadas(depois))
+
+
+@pytest.mark.parametrize("caso", ["padrão", "tudo vazio", "sem coluna de valor", "sem paid"])
+def test_celulas_iguais_com_frame_tipado(caso):
+    """Artefato da extração: datas, valores e categorias já convertidos antes da limpeza"""
+    df = consolidado(**casos[caso])
+    antes = celulas_gravadas(limpeza_original(df.copy()))
+    depois = celulas_gravadas(formatar_para_gravacao(limpar_consolidado(aplicar_esquema(df.copy()))))
+    pd.testing.assert_frame_equal(antes, depois)
+
+
+def test_frame_vazio():
+    df = consolidado().iloc[0:0]
+    pd.testing.assert_frame_equal(limpeza_original(df.copy()), formatar_para_gravacao(limpar_consolidado(df.copy())),
+                                  check_dtype=False)
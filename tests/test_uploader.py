@@ -0,0 +1,62 @@
+"""Envio em blocos interrompido no meio e retomado na execução seguinte."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from financeiro import armazenamento
+from financeiro.uploader import enviar_em_blocos, envio_pendente
+from tests.destino_memoria import DestinoMemoria
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(armazenamento, "CACHE_DIR", str(tmp_path))
+
+
+def dados(n=50):
+    return pd.DataFrame({"id": [f"id{i}" for i in range(n)], "paid": np.arange(n) * 1.5, "description": "x"})
+
+
+def grade_esperada(df):
+    return [list(df.columns)] + df.values.tolist()
+
+
+def test_retoma_so_os_blocos_que_faltam():
+    df = dados()
+    destino = DestinoMemoria(falhar_apos=4)
+    with pytest.raises(ConnectionError):
+        enviar_em_blocos(destino, df, max_linhas=5, paralelo=1)
+    # Cabeçalho + 3 blocos confirmados antes da queda
+    assert envio_pendente(destino.chave_snapshot)
+
+    destino.falhar_apos, destino.chamadas = None, []
+    enviados = enviar_em_blocos(destino, df, max_linhas=5, paralelo=1)
+    assert enviados == 7 and len(destino.chamadas) == 7
+    assert "'Dados'!A1:C1" not in destino.chamadas
+    assert destino.grade() == grade_esperada(df)
+    assert not envio_pendente(destino.chave_snapshot)
+
+
+def test_dados_diferentes_recomecam_do_zero():
+    destino = DestinoMemoria(falhar_apos=4)
+    with pytest.raises(ConnectionError):
+        enviar_em_blocos(destino, dados(), max_linhas=5, paralelo=1)
+
+    outro = dados(30)
+    destino.falhar_apos, destino.chamadas = None, []
+    assert enviar_em_blocos(destino, outro, max_linhas=5, paralelo=1) == 6
+    assert destino.chamadas[0] == "'Dados'!A1:C1"
+    # Linhas da tentativa anterior além do novo tamanho foram limpas
+    assert destino.grade() == grade_esperada(outro)
+
+
+def test_aba_limpa_por_fora_recomeca_do_zero():
+    df = dados()
+    destino = DestinoMemoria(falhar_apos=4)
+    with pytest.raises(ConnectionError):
+        enviar_em_blocos(destino, df, max_linhas=5, paralelo=1)
+
+    destino.limpar_tudo()
+    destino.falhar_apos, destino.chamadas = None, []
+    assert enviar_em_blocos(destino, df, max_linhas=5, paralelo=1) == 10
+    assert destino.grade() == grade_esperada(df)